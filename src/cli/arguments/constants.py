@@ -15,14 +15,25 @@ DATASET_DEFAULT = DATASETS[0]
 """
 Filters available
 """
-FILTERS = ["none","remove-unknown-rows"]
+FILTERS = ["none","remove-unknown-rows","mask-unknown-values"]
 FILTERS_DEFAULT = FILTERS[0]
 
+# Dataset caching
+"""
+Caches the datasets once read into binary files, so next times they are not parsed again
+"""
+DATASET_CACHE_DEFAULT = True
+
+"""
+Memory-maps the cached datasets instead of reading them
+"""
+DATASET_MMAP_DEFAULT = False
+
 # Tree caching
 """
-Caches the generated tree into the following file
+Caches the generated tree into the following folder (see DecisionTree.save)
 """
-TREE_CACHE_FILE = ".cached-trees.json"
+TREE_CACHE_FOLDER = ".cached-trees"
 
 # Random forest
 """
@@ -30,6 +41,17 @@ Random (corre) forest algorithm enabled by default
 """
 RANDOM_FOREST_DEFAULT = False
 
+"""
+Number of trees of a random forest
+"""
+FOREST_TREES_DEFAULT = 10
+FOREST_TREES_MIN = 1
+
+"""
+Number of features picked randomly to split each node of the trees of a random forest. 0 picks the square root of the number of features
+"""
+FOREST_FEATURES_DEFAULT = 0
+
 # Printing control
 """
 Enables or disables showing information about the dataset
@@ -48,6 +70,24 @@ Sets the algorithms available to use
 ALGORITHMS = ["id3","c4.5","dummy"]
 ALGORITHM_DEFAULT = ALGORITHMS[1]
 
+"""
+Number of bins to bin continuous features into when searching thresholds using histograms. 0 searches thresholds among all the values of the features
+"""
+HISTOGRAM_BINS_DEFAULT = 0
+HISTOGRAM_BINS_MIN = 2
+
+"""
+Number of processes to parse the dataset files with and to score the features with when generating a tree
+"""
+JOBS_DEFAULT = 1
+JOBS_MIN = 1
+
+"""
+Memory budget (in MB) for the temporary arrays of the samples read at once when generating a tree. 0 doesn't bound it. If bounded, the datasets (and the binned features) are memory-mapped from files, to train out of core. The arrays with an element per sample of a level of the tree aren't bounded by it
+"""
+MEMORY_BUDGET_DEFAULT = 0
+MEMORY_BUDGET_MIN = 1
+
 """
 Sets the algorithm to use to split a dataset into a dataset and training set if no training set is available
 """
@@ -60,6 +100,12 @@ validation set is specified, when holdout method is specified
 """
 HOLDOUT_PERCENT_DEFAULT = 0.75
 
+"""
+Seed of the random generator used to split the dataset (None for a random seed) and whether the splits are stratified by the classes of the classifier
+"""
+SEED_DEFAULT = None
+STRATIFY_DEFAULT = False
+
 """
 Number of groups to create to use the cross-validation method to split the dataset into training and validation sets
 """
@@ -67,10 +113,10 @@ CROSSVALID_K = 4
 CROSSVALID_K_MIN = 2
 
 """
-Sets the variable of the dataset to use as the classifier for the decision tree
-It has to bee a column from the training set
+Sets the variable of each dataset to use as the classifier for the decision tree by default
+It has to bee a column from the training set whose values are not continuous
 """
-TARGET_DEFAULT = 0
+TARGET_DEFAULT = {"mushroom": 0, "adult": 14}
 
 # Profiling
 """
@@ -78,6 +124,11 @@ Show timers
 """
 TIMERS_DEFAULT = 0
 
+"""
+File to write the timings into as JSON (None to just show them)
+"""
+TIMERS_FILE_DEFAULT = None
+
 """
 Default log level
 """
@@ -33,11 +33,26 @@ DEFAULT_PARSER.add_argument("-d","--dataset",
 )
 DEFAULT_PARSER.add_argument("-f","--filter",
 	action="store",
-	help="""specifies the filter that will be applied to the loaded data in order to clean it or remove unwanted samples. Default is %s"""%(FILTERS_DEFAULT),
+	help="""specifies the filter that will be applied to the loaded data in order to clean it or remove unwanted samples: remove-unknown-rows removes the samples with unknown values, and mask-unknown-values keeps them but leaves their unknown values out when scoring the features (the samples go with the most of the samples when their node is split by a feature whose value they don't know). The dataset is cached unfiltered, so changing the filter doesn't read the dataset again. Default is %s"""%(FILTERS_DEFAULT),
 	choices=FILTERS,
 	type=str,
 	default=FILTERS_DEFAULT
 )
+DEFAULT_PARSER.add_argument("--dataset-cache",
+	metavar="true|false",
+	action="store",
+	nargs="?",
+	help="""enables or disables caching the dataset once read, encoded and filtered into binary files inside the %s folder of the dataset, so next executions load it from there instead of reading the dataset files again while they don't change (%s by default)"""%(DATASET_CACHE_FOLDER, "enabled" if DATASET_CACHE_DEFAULT else "disabled"),
+	type=evalTF,
+	const=True,
+	default=DATASET_CACHE_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--mmap-dataset",
+	action="store_const",
+	help="""memory-maps the cached dataset files instead of reading them""",
+	const=True,
+	default=DATASET_MMAP_DEFAULT
+)
 DEFAULT_PARSER.add_argument("--show-dataset",
 	metavar="true|false",
 	action="store",
@@ -70,10 +85,31 @@ DEFAULT_PARSER.add_argument("-c","--classifier",
 	metavar="variable",
 	action="store",
 	help="""sets the classifier variable to use to generate the decision tree.
-	It has to be a column from the dataset, either as a number or if the dataset has the feature names, by its name. By default, we use the column %d
-	of the dataset)"""%TARGET_DEFAULT,
+	It has to be a column from the dataset whose values are not continuous, either as a number or if the dataset has the feature names, by its name. By default, we use the column %s
+	of the dataset)"""%", ".join("%d for %s"%(TARGET_DEFAULT[dataset], dataset) for dataset in DATASETS),
 	type=str,
-	default=TARGET_DEFAULT
+	default=None
+)
+DEFAULT_PARSER.add_argument("--histogram-bins",
+	metavar="bins",
+	action="store",
+	help="""searches the thresholds of continuous features only at the edges of quantile bins, binning each continuous feature once into the number of bins specified (between %d and %d), instead of searching among all its values. This is faster but approximate. The bins take a byte per sample and continuous feature on top of the continuous columns, which are kept to classify samples, so it saves time, not memory. Default is %d (search among all values)"""%(HISTOGRAM_BINS_MIN, DATASET_MAX_BINS, HISTOGRAM_BINS_DEFAULT),
+	type=int,
+	default=HISTOGRAM_BINS_DEFAULT
+)
+DEFAULT_PARSER.add_argument("-j","--jobs",
+	metavar="workers",
+	action="store",
+	help="""sets the number of processes to use to parse the dataset files (splitting them into parts) and to score the features when generating a decision tree. The dataset read and the generated tree are the same whatever number of processes is used. Default is %d"""%JOBS_DEFAULT,
+	type=int,
+	default=JOBS_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--memory-budget",
+	metavar="MB",
+	action="store",
+	help="""trains out of core with the memory budget specified (in MB, minimum %d) for the samples read at once: the cached dataset, the training and validation sets and the binned features are memory-mapped from files, and the columns are read in blocks of samples that fit in the budget. The generated tree is the same whatever budget is used. The budget doesn't bound the arrays with an element per sample of a level of the tree (the samples, their nodes and the values they're split by), which take up to about 80 bytes per training sample, nor the predictions (8 bytes per validation sample). Searching thresholds among all the values of continuous features sorts the samples of each level in memory too, taking about 40 bytes more per training sample (more with more classes), so use it with --histogram-bins. Default is %d (the whole data is kept in memory)"""%(MEMORY_BUDGET_MIN, MEMORY_BUDGET_DEFAULT),
+	type=int,
+	default=MEMORY_BUDGET_DEFAULT
 )
 DEFAULT_PARSER.add_argument("-s","--splitter",
 	action="store",
@@ -90,6 +126,19 @@ DEFAULT_PARSER.add_argument("-p","--percent",
 	type=float,
 	default=HOLDOUT_PERCENT_DEFAULT
 )
+DEFAULT_PARSER.add_argument("--seed",
+	metavar="seed",
+	action="store",
+	help="""sets the seed of the random generator used by the splitter to pick the samples of the training and validation sets, so the splits can be reproduced. By default, a random seed is used""",
+	type=int,
+	default=SEED_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--stratify",
+	action="store_const",
+	help="""stratifies the splits by the classes of the classifier variable, so the training and validation sets keep the proportion of samples of each class of the dataset""",
+	const=True,
+	default=STRATIFY_DEFAULT
+)
 DEFAULT_PARSER.add_argument("-k","--cross-validation-k",
 	metavar="groups",
 	action="store",
@@ -101,11 +150,25 @@ DEFAULT_PARSER.add_argument("-r","--random-forest",
 	metavar="true|false",
 	action="store",
 	nargs="?",
-	help="""enables or disables the random forest generation in order to get more accuracy and avoid overfitting (%s by default)"""%("enabled" if RANDOM_FOREST_DEFAULT else "disabled"),
+	help="""enables or disables the random forest generation in order to get more accuracy and avoid overfitting (%s by default). Each tree of the forest is generated with the algorithm selected from a bootstrap resample of the training set, splitting each node by the best of some features picked randomly, and the samples are classified to the class most of the trees vote. The trees are generated in parallel with the number of processes set by --jobs"""%("enabled" if RANDOM_FOREST_DEFAULT else "disabled"),
 	type=evalTF,
 	const=True,
 	default=RANDOM_FOREST_DEFAULT
 )
+DEFAULT_PARSER.add_argument("--forest-trees",
+	metavar="trees",
+	action="store",
+	help="""sets the number of trees of the random forest (minimum %d). Default is %d"""%(FOREST_TREES_MIN, FOREST_TREES_DEFAULT),
+	type=int,
+	default=FOREST_TREES_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--forest-features",
+	metavar="features",
+	action="store",
+	help="""sets the number of features picked randomly to split each node of the trees of the random forest. Default is %d (the square root of the number of features)"""%FOREST_FEATURES_DEFAULT,
+	type=int,
+	default=FOREST_FEATURES_DEFAULT
+)
 DEFAULT_PARSER.add_argument("-o","--output",
 	metavar="filename",
 	action="store",
@@ -115,23 +178,35 @@ DEFAULT_PARSER.add_argument("-o","--output",
 )
 DEFAULT_PARSER.add_argument("--enable-cache",
 	action="store_const",
-	help="""stores the generated trees into a file, so when using the --from-cache option, the trees will not be calculated, they will be loaded from the file of the last caching""",
+	help="""stores the generated trees into a folder, so when using the --from-cache option, the trees will not be calculated, they will be loaded from the folder of the last caching""",
 	const=True,
 	default=False
 )
 DEFAULT_PARSER.add_argument("--from-cache",
 	action="store_const",
-	help="""reads the cache file to get the trees from the last execution, instead of calculating the trees again""",
+	help="""reads the cache folder to get the trees from the last execution, instead of calculating the trees again. The trees have to be cached with the same dataset, filter and classifier""",
 	const=True,
 	default=False
 )
 DEFAULT_PARSER.add_argument("-t",
 	action="count",
 	help="""records the algorithm's computation time and shows them. You can
-	add levels of timings by specifying repeating argument. Default timing
+	add levels of timings by specifying repeating argument: level 1 times the
+	read, filter, encode, split, train, validate and render phases, level 2
+	adds the nodes grown per depth and the time spent counting classes,
+	evaluating splits and partitioning the samples while growing trees, and
+	level 3 adds the time spent scoring each feature. Work done by worker
+	processes is timed as the time spent waiting for them. Default timing
 	level is %d"""%TIMERS_DEFAULT,
 	default = TIMERS_DEFAULT
 )
+DEFAULT_PARSER.add_argument("--timings-file",
+	metavar="filename",
+	action="store",
+	help="""writes the timings recorded with -t into a JSON file, so they can be compared across versions""",
+	type=str,
+	default=TIMERS_FILE_DEFAULT
+)
 DEFAULT_PARSER.add_argument("-l","--log-level",
 	metavar="level",
 	action="store",
@@ -1,47 +1,45 @@
 from .ID3 import *
-import math
 
 class C45Algorithm(ID3Algorithm):
-	def _splitCriterion(self, trainingSet, featureSet):
+	"""
+	Given the stacked contingency tables of some features for each node, returns the score of each feature for each node as a split criterion: the gain ratio
+
+	@param 	featureTables 	stacked contingency tables of each node
+	@param 	featureStarts 	row where each feature table starts
+	@param 	classCounts 	class counts of each node
+	@return score of each feature (columns) for each node (rows)
+	"""
+	def _scoreFeatures(self, featureTables, featureStarts, classCounts):
 		#create count-list for every feature remaining in featureSet
-		entropy_general = self._H(self._countTargetClasses(trainingSet))
-		featureDatas, featureValues, featureEntropies, featureThresholds = self._calculateFeatures(trainingSet, featureSet)
+		entropy_general = self._H(classCounts)
+		total = classCounts.sum(axis=1)
+		featureEntropies = self._entropyOfFeatures(featureTables, featureStarts, total)
 
 		#return the attribute with the maximum gain (minimum entropy) if any
-		gain_list = self._gain(featureEntropies, entropy_general)
-		split_list = self._splitInfoOfFeatures(trainingSet, featureSet, featureValues, featureDatas)
-		gain_ratio = C45Algorithm._gainRatio(gain_list, split_list)
-		feature_index = gain_ratio.index(max(gain_ratio))
-		feature = featureSet[feature_index]
-
-		# Create node
-		featureNode = Node(feature)
-		featureNode.featureValues = featureValues[feature_index]
-		featureNode.featureData = featureDatas[feature_index]
-		featureNode.isContinuous = self._continuous[feature]
-		featureNode.threshold = featureThresholds[feature_index]
-		return featureNode
+		gain_list = self._gain(featureEntropies, entropy_general) if self._masked is None else self._knownGain(featureTables, featureStarts, classCounts, featureEntropies)
+		split_list = self._splitInfoOfFeatures(featureTables, featureStarts, total)
+		return C45Algorithm._gainRatio(gain_list, split_list)
 
 	def _gainRatio(gain_list,split_list):
-		return [gain_list[i]/split_list[i] if split_list[i] else 0.
-			for i in range(len(gain_list))]
+		with np.errstate(divide="ignore", invalid="ignore"):
+			return np.where(split_list != 0, gain_list/split_list, 0.)
 
 	"""
-	Returns the list of entropies of the possible features to classify
-	as the next node of the tree
+	Returns the split information of the possible features to classify
+	as the next node of the tree for each node, given their stacked contingency tables. It's the entropy of the distribution of the samples among the feature values, calculated for every feature of every node at once
+
+	@param 	featureTables 	stacked contingency tables of each node
+	@param 	featureStarts 	row where each feature table starts
+	@param 	total 			number of samples of each node
+	@return split information of each feature (columns) for each node (rows)
 	"""
-	def _splitInfoOfFeatures(self, trainingSet, featureSet, featureValues, featureDatas):
-		splitInfo_list = []
-		card_s = np.sum(trainingSet)
-		for feature_index in range(len(featureSet)):
-			#calculate entropy for the next assigment
-			acc = 0.0
-			feature = featureSet[feature_index]
-			for value in featureValues[feature_index]:
-				s_v = trainingSet * self._filterByFeatureValue(feature,value,featureDatas[feature_index])
-				card_s_v = np.sum(s_v)
-				x = card_s_v / card_s
-				if x:
-					acc += x * math.log(x,2)
-			splitInfo_list.append(-acc)
-		return splitInfo_list
+	def _splitInfoOfFeatures(self, featureTables, featureStarts, total):
+		x = featureTables.sum(axis=2)/total[:, np.newaxis]
+		with np.errstate(divide="ignore", invalid="ignore"):
+			acc = np.where(x != 0, x * np.log2(x), 0.)
+			split = -np.add.reduceat(acc, featureStarts, axis=1)
+			if self._masked is not None:
+				# the samples of masked values are one more part of the split, as C4.5 does with unknown values
+				masked = (total[:, np.newaxis] - np.add.reduceat(featureTables.sum(axis=2), featureStarts, axis=1))/total[:, np.newaxis]
+				split -= np.where(masked > 0, masked * np.log2(masked), 0.)
+		return split
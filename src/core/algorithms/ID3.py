@@ -1,122 +1,399 @@
 from .treegrowing import *
-from anytree import *
-import math
+from core.helpers.math import H
+from time import perf_counter
+
+"""
+Maximum number of (node, candidate threshold) pairs to evaluate at once when looking for the threshold of a continuous feature
+"""
+THRESHOLDS_BLOCK = 1 << 20
+
+"""
+Maximum difference between the scores of two features to take them as tied, so the first feature is selected. Equal scores may be calculated from tables added up in different orders, so they can differ in their last bits
+"""
+SCORE_TOLERANCE = 1e-12
 
 #Basic ID3 algorithm version
 class ID3Algorithm(BasicTreeGrowingAlgorithm):
-	def _splitCriterion(self, trainingSet, featureSet):
+	scoresFeatures = True
+
+	def _splitCriterion(self, trainingSet, nodes, classCounts, available):
 		#create count-list for every attribute remaining in featureSet
-		entropy_general = self._H(self._countTargetClasses(trainingSet))
-		#entropy_list = self._entropyOfFeatures(trainingSet, featureSet)
-		featureDatas, featureValues, featureEntropies, featureThresholds = self._calculateFeatures(trainingSet, featureSet)
+		if self._pool is not None:
+			# score features in parallel
+			scores, featureThresholds = self._pool.scoreFeatures(trainingSet, nodes, classCounts, available)
+		elif TIMERS.isEnabled(3):
+			# score features one by one, to time each of them
+			scores, featureThresholds = self._scoreFeaturesTimed(trainingSet, nodes, classCounts, available)
+		else:
+			featureTables, featureStarts, featureThresholds = self._calculateFeatures(trainingSet, nodes, available)
+			scores = self._scoreFeatures(featureTables, featureStarts, classCounts)
 		#return the attribute with the maximum gain (minimum entropy) if any
-		gain_list = self._gain(featureEntropies, entropy_general)
-		feature_index = gain_list.index(max(gain_list))
-		feature = featureSet[feature_index]
-
-		# Node for the feature
-		featureNode = Node(feature)
-		featureNode.featureValues = featureValues[feature_index]
-		featureNode.featureData = featureDatas[feature_index]
-		featureNode.isContinuous = self._continuous[feature]
-		featureNode.threshold = featureThresholds[feature_index]
-		featureNode.entropy = featureEntropies[feature_index]
-		return featureNode
-
-	"""
-	"""
-	def _calculateFeatures(self, trainingSet, featureSet):
-		featureDatas = []
-		featureValues = []
-		featureEntropies = []
-		featureThresholds = []
-		for feature in featureSet:
+		return self._selectFeatures(scores, available, featureThresholds)
+
+	"""
+	Selects the feature to split the node of each sample left out by, as if the sample wasn't in the node. The contingency tables of each node are built once, and the ones of each sample are the ones of its node with the sample taken out of its cell. For continuous features, the best threshold without the sample is found for every sample at once (see _continuousFeatureWithout). The tables are scored as when growing, so the same feature and threshold are selected as when growing the node from its samples but the one left out
+	"""
+	def _splitCriterionWithout(self, trainingSet, nodes, classCounts, available, leftOut, leftOutNodes):
+		nodesCount = len(available)
+		classes = self._columns[self._target][leftOut]
+		counts = classCounts[leftOutNodes]
+		counts[np.arange(len(leftOut)), classes] -= 1
+		available = available[leftOutNodes]
+		categorical = [feature for feature in self._candidates if not self._continuous[feature]]
+		categoricalTables, categoricalStarts = self._contingencyTables(trainingSet, nodes, nodesCount, categorical)
+		featureThresholds = np.full((len(leftOut), len(self._candidates)), np.nan)
+		continuousTables = {}
+		for candidate, feature in enumerate(self._candidates):
+			if self._continuous[feature]:
+				continuousTables[feature], featureThresholds[:, candidate] = self._continuousFeatureWithout(trainingSet, nodes, nodesCount, available[:, candidate], feature, leftOut, leftOutNodes)
+		# score the tables of the samples in blocks, to bound the memory used
+		scores = np.empty((len(leftOut), len(self._candidates)))
+		block = max(1, THRESHOLDS_BLOCK // (categoricalTables.shape[1] + 2*len(continuousTables) + 1) // classCounts.shape[1])
+		for first in range(0, len(leftOut), block):
+			samples = np.arange(first, min(first+block, len(leftOut)))
+			tables = categoricalTables[leftOutNodes[samples]]
+			for column, feature in enumerate(categorical):
+				tables[np.arange(len(samples)), categoricalStarts[column] + self._columns[feature][leftOut[samples]], classes[samples]] -= 1
+			tables = iter(np.split(tables, categoricalStarts[1:], axis=1))
+			featureTables = [continuousTables[feature][samples] if self._continuous[feature] else next(tables) for feature in self._candidates]
+			featureStarts = np.cumsum([0] + [table.shape[1] for table in featureTables[:-1]])
+			scores[samples] = self._scoreFeatures(np.concatenate(featureTables, axis=1), featureStarts, counts[samples])
+		return self._selectFeatures(scores, available, featureThresholds)
+
+	"""
+	Given a continuous feature, the samples of some nodes and some of them to leave out one at a time, finds for each sample left out the threshold that partitions the samples of its node but the sample with the minimum entropy, and returns the contingency table of that partition
+
+	Leaving a sample out only changes the class counts of the partition it's in: it's below the thresholds greater than its value and above the rest. So the entropy of every threshold is calculated once for every node and class left out from each partition, the entropies of each node and class are ranked, and the thresholds are sorted so that the ones a sample is above are a prefix: the best threshold of a sample is the minimum rank between the prefix (from the entropies leaving the class out of the part above) and the suffix (from the entropies leaving it out of the part below). Ties are resolved in favour of the first threshold, as when growing
+
+	@param 	trainingSet		samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	nodesCount 		number of nodes
+	@param 	available 		whether each sample left out has the feature available in its node
+	@param 	feature			continous feature
+	@param 	leftOut 		samples to leave out
+	@param 	leftOutNodes 	node of each sample left out
+	@return contingency table of the best partition (< threshold, >= threshold) for each sample left out (empty if not available) and its threshold (NaN if not available)
+	"""
+	def _continuousFeatureWithout(self, trainingSet, nodes, nodesCount, available, feature, leftOut, leftOutNodes):
+		classes = len(self._features[self._target])
+		table = np.zeros((len(leftOut), 2, classes), dtype=np.int64)
+		thresholds = np.full(len(leftOut), np.nan)
+		if not available.any():
+			return table, thresholds
+		# nodes of the samples left out that have the feature available
+		leftOut, leftOutNodes, samples = leftOut[available], leftOutNodes[available], np.flatnonzero(available)
+		used = np.unique(leftOutNodes)
+		inUsed = np.isin(nodes, used)
+		trainingSet, nodes = trainingSet[inUsed], np.searchsorted(used, nodes[inUsed])
+		leftOutNodes = np.searchsorted(used, leftOutNodes)
+		leftOutClasses = self._columns[self._target][leftOut]
+		# sort samples once and accumulate their classes
+		featureData = self._columns[feature][trainingSet]
+		order = np.lexsort((featureData, nodes))
+		featureData, nodes = featureData[order], nodes[order]
+		targetData = self._columns[self._target][trainingSet[order]]
+		cumulative = np.zeros((len(featureData)+1, classes), dtype=np.int64)
+		for targetClass in range(classes):
+			np.cumsum(targetData == targetClass, out=cumulative[1:,targetClass])
+		starts = np.searchsorted(nodes, np.arange(len(used)+1))
+		totals = cumulative[starts[1:]] - cumulative[starts[:-1]]
+		# candidate thresholds
+		values = np.asarray(self._features[feature], dtype=float)
+		if len(values) < 2:
+			# nothing to split, all samples are >= than the unique value
+			table[samples, 1] = totals[leftOutNodes]
+			table[samples, 1, leftOutClasses] -= 1
+			thresholds[samples] = values[0]
+			return table, thresholds
+		featureThresholds = (values[:-1] + values[1:])/2.
+		sortedValues = np.sort(values)
+		keys = nodes * (len(values)+1) + np.searchsorted(sortedValues, featureData)
+		limits = np.searchsorted(sortedValues, featureThresholds, side="left")
+		# thresholds sorted by limit: a sample is above the ones whose limit is not greater than the rank of its value
+		byLimit = np.argsort(limits, kind="stable")
+		ranks = np.searchsorted(sortedValues, self._columns[feature][leftOut])
+		above = np.searchsorted(limits[byLimit], ranks, side="right")
+		candidates = np.arange(len(featureThresholds))
+		block = max(1, THRESHOLDS_BLOCK // len(featureThresholds))
+		for first in range(0, len(used), block):
+			block_nodes = np.arange(first, min(first+block, len(used)))
+			positions = np.searchsorted(keys, block_nodes[:, np.newaxis] * (len(values)+1) + limits)
+			below = cumulative[positions] - cumulative[starts[block_nodes]][:, np.newaxis]
+			aboveCounts = totals[block_nodes][:, np.newaxis] - below
+			total = (starts[block_nodes+1] - starts[block_nodes] - 1)[:, np.newaxis]
+			inBlock = np.flatnonzero((leftOutNodes >= first) & (leftOutNodes < first+len(block_nodes)))
+			for targetClass in range(classes):
+				sampling = inBlock[leftOutClasses[inBlock] == targetClass]
+				if not len(sampling):
+					continue
+				# entropies leaving the class out of the part above and out of the part below
+				removed = np.zeros(classes, dtype=np.int64)
+				removed[targetClass] = 1
+				with np.errstate(divide="ignore", invalid="ignore"):
+					entropiesAbove = below.sum(axis=2)/total * H(below) + (aboveCounts-removed).sum(axis=2)/total * H(aboveCounts-removed)
+					entropiesBelow = (below-removed).sum(axis=2)/total * H(below-removed) + aboveCounts.sum(axis=2)/total * H(aboveCounts)
+				entropies = np.concatenate((entropiesAbove, entropiesBelow), axis=1)
+				# rank of each entropy in its node (ties by threshold) and best rank of the prefixes and suffixes
+				ranking = np.lexsort((np.tile(candidates, 2)[np.newaxis].repeat(len(block_nodes), axis=0), entropies), axis=1)
+				rank = np.empty_like(ranking)
+				np.put_along_axis(rank, ranking, np.arange(ranking.shape[1])[np.newaxis], axis=1)
+				prefix = np.minimum.accumulate(rank[:, :len(featureThresholds)][:, byLimit], axis=1)
+				suffix = np.minimum.accumulate(rank[:, len(featureThresholds):][:, byLimit[::-1]], axis=1)[:, ::-1]
+				prefix = np.concatenate((np.full((len(block_nodes), 1), ranking.shape[1]), prefix), axis=1)
+				suffix = np.concatenate((suffix, np.full((len(block_nodes), 1), ranking.shape[1])), axis=1)
+				rows = leftOutNodes[sampling] - first
+				best = ranking[rows, np.minimum(prefix[rows, above[sampling]], suffix[rows, above[sampling]])]
+				isBelow = best >= len(featureThresholds)
+				best = best % len(featureThresholds)
+				table[samples[sampling], 0] = below[rows, best]
+				table[samples[sampling], 1] = aboveCounts[rows, best]
+				table[samples[sampling], (~isBelow).astype(np.int64), targetClass] -= 1
+				thresholds[samples[sampling]] = featureThresholds[best]
+		return table, thresholds
+
+	"""
+	Given the stacked contingency tables of some features for each node, returns the score of each feature for each node as a split criterion: the gain
+
+	@param 	featureTables 	stacked contingency tables of each node
+	@param 	featureStarts 	row where each feature table starts
+	@param 	classCounts 	class counts of each node
+	@return score of each feature (columns) for each node (rows)
+	"""
+	def _scoreFeatures(self, featureTables, featureStarts, classCounts):
+		entropy_general = self._H(classCounts)
+		featureEntropies = self._entropyOfFeatures(featureTables, featureStarts, classCounts.sum(axis=1))
+		if self._masked is not None:
+			return self._knownGain(featureTables, featureStarts, classCounts, featureEntropies)
+		return self._gain(featureEntropies, entropy_general)
+
+	"""
+	Scores a single candidate feature for each node that has it available. This is the unit of work of the feature-parallel split evaluation
+
+	@param 	trainingSet 	samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	classCounts 	class counts of each node
+	@param 	available 		nodes that have the feature available
+	@param 	candidate 		candidate feature to score
+	@return score of the feature for each node (-inf if not available) and its threshold (NaN if not continuous)
+	"""
+	def _scoreFeature(self, trainingSet, nodes, classCounts, available, candidate):
+		feature = self._candidates[candidate]
+		if self._continuous[feature]:
+			table, thresholds = self._calculateContinuousFeature(trainingSet, nodes, available, feature)
+		else:
+			table, _ = self._contingencyTables(trainingSet, nodes, len(available), [feature])
+			thresholds = np.full(len(available), np.nan)
+		scores = self._scoreFeatures(table, np.zeros(1, dtype=np.int64), classCounts)[:, 0]
+		return np.where(available, scores, -np.inf), thresholds
+
+	"""
+	Scores every candidate feature for each node one by one, as the pool of processes does, timing the scoring of each feature
+
+	@param 	trainingSet 	samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	classCounts 	class counts of each node
+	@param 	available 		features available for each node
+	@return score of each candidate feature (columns) for each node (rows) and its threshold
+	"""
+	def _scoreFeaturesTimed(self, trainingSet, nodes, classCounts, available):
+		scores = np.full(available.shape, -np.inf)
+		thresholds = np.full(available.shape, np.nan)
+		for candidate in np.flatnonzero(available.any(axis=0)):
+			start = perf_counter()
+			scores[:, candidate], thresholds[:, candidate] = self._scoreFeature(trainingSet, nodes, classCounts, available[:, candidate], candidate)
+			TIMERS.add("feature %d"%self._candidates[candidate], perf_counter() - start, 3)
+		return scores, thresholds
+
+	"""
+	Given the score of every candidate feature for each node, selects the available feature with the maximum score of each node (the first one if there are ties, being tied the scores within SCORE_TOLERANCE of the maximum)
+
+	@param 	scores 		score of each candidate feature (columns) for each node (rows)
+	@param 	available 	features available for each node
+	@param 	thresholds 	threshold of each candidate feature for each node
+	@return candidate feature selected for each node and its threshold
+	"""
+	def _selectFeatures(self, scores, available, thresholds):
+		scores = np.where(available, scores, -np.inf)
+		feature_index = (scores >= scores.max(axis=1)[:, np.newaxis] - SCORE_TOLERANCE).argmax(axis=1)
+		nodes = np.arange(len(available))
+		return feature_index, thresholds[nodes, feature_index]
+
+	"""
+	Calculates for every candidate feature the contingency table (feature values x target classes counts) of each node. Continuous features are discretized using the best threshold found for each node, so their values are 0 (< threshold) and 1 (>= threshold)
+
+	@param 	trainingSet 	samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	available 		features available for each node
+	@return stacked contingency tables of each node, the row where each feature table starts and the threshold of each feature for each node (NaN if not continuous)
+	"""
+	def _calculateFeatures(self, trainingSet, nodes, available):
+		nodesCount = len(available)
+		# count all the non continuous features at once
+		categorical = [feature for feature in self._candidates if not self._continuous[feature]]
+		categoricalTables, categoricalStarts = self._contingencyTables(trainingSet, nodes, nodesCount, categorical)
+		categoricalTables = iter(np.split(categoricalTables, categoricalStarts[1:], axis=1))
+		featureTables = []
+		featureThresholds = np.full((nodesCount, len(self._candidates)), np.nan)
+		for candidate, feature in enumerate(self._candidates):
 			# Continuous feature?
 			if self._continuous[feature]:
-				# Discretize and append
-				entropy, threshold = self._entropyOfContinuousFeature(trainingSet, feature)
-				featureDatas.append(np.where(self._data[:,feature] < threshold, 0, 1))
-				featureValues.append([0,1])
-				featureThresholds.append(threshold)
-				featureEntropies.append(entropy)
+				table, featureThresholds[:, candidate] = self._calculateContinuousFeature(trainingSet, nodes, available[:, candidate], feature)
 			else:
-				# Append feature
-				featureDatas.append(self._data[:,feature])
-				featureValues.append(self._features[feature])
-				featureThresholds.append(None)
-				featureEntropies.append(self._entropyOfFeature(trainingSet, feature, self._features[feature], self._data[:,feature]))
-		return featureDatas, featureValues, featureEntropies, featureThresholds
+				table = next(categoricalTables)
+			featureTables.append(table)
+		featureStarts = np.cumsum([0] + [table.shape[1] for table in featureTables[:-1]])
+		return np.concatenate(featureTables, axis=1), featureStarts, featureThresholds
 
 	"""
-	Returns the list of entropies of the possible attributes to classify
-	as the next node of the tree
+	Calculates the contingency table of a continuous feature for each node that has it available, discretizing it with the best threshold found for the node
+
+	@param 	trainingSet 	samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	available 		nodes that have the feature available
+	@param 	feature 		continuous feature
+	@return contingency table of each node (empty if not available) and its threshold (NaN if not available)
 	"""
-	def _entropyOfFeatures(self, trainingSet, featureSet):
-		entropy_list = []
-		for feature in featureSet:
-			#calculate entropy for the next assigment
-			if self._continuous[feature]:
-				print("Evaluating feature %d"%feature)
-				print(self._entropyOfContinuousFeature(trainingSet, feature))
-			#else:
-			entropy_list.append(self._entropyOfFeature(trainingSet,feature,self._features[feature],self._data[:,feature]))
-		return entropy_list
+	def _calculateContinuousFeature(self, trainingSet, nodes, available, feature):
+		table = self._zeroCounts(len(available)*2*len(self._features[self._target])).reshape(len(available), 2, -1)
+		thresholds = np.full(len(available), np.nan)
+		if available.any():
+			samples = available[nodes]
+			table[available], thresholds[available] = self._contingencyOfContinuousFeature(
+				trainingSet[samples], (np.cumsum(available)-1)[nodes[samples]],
+				np.count_nonzero(available), feature)
+		return table, thresholds
 
 	"""
-	Calculates the entropy for a specific feature
+	Returns the entropies of the possible attributes to classify
+	as the next node of the tree for each node, given their stacked contingency tables. The entropy of all the values of all the features of all the nodes is calculated at once and then added up per feature, weighted by the samples taking each value
+
+	@param 	featureTables 	stacked contingency tables of each node
+	@param 	featureStarts 	row where each feature table starts
+	@param 	total 			number of samples of each node
+	@return entropy of each feature (columns) for each node (rows)
 	"""
-	def _entropyOfFeature(self, trainingSet, feature, feature_values, feature_data):
-		acc = 0.0
-		for value in feature_values:
-			new_ts = trainingSet * np.where(feature_data == value,True,False)
-			tr = self._countTargetClasses(new_ts)
-			acc += np.sum(new_ts)/np.sum(trainingSet) * self._H(tr)
-		return acc
+	def _entropyOfFeatures(self, featureTables, featureStarts, total):
+		samples = featureTables.sum(axis=2)
+		return np.add.reduceat(samples/total[:, np.newaxis] * H(featureTables), featureStarts, axis=1)
 
 	"""
 	Returns the gain given a list of entropies and the general entropy
 
-	@param 	general_entropy		entropy of the current classification
-	@param 	entropies	 		list of entropies if we classify with some feature
+	@param 	general_entropy		entropy of the current classification of each node
+	@param 	entropies	 		entropies of each node if we classify with some feature
 	@return gain for each entropy
 	"""
 	def _gain(self, entropies,general_entropy):
-		return list(map(lambda e: general_entropy-e,entropies))
+		return general_entropy[:, np.newaxis] - entropies
+
+	"""
+	Returns the information gain of each feature when some values are masked, as C4.5 does with unknown values: the gain over the samples whose value of the feature is known (the ones in its table), weighted by the fraction of them. When no value of a feature is masked, it's the gain of the feature
+
+	@param 	featureTables 		stacked contingency tables of each node, without the masked values
+	@param 	featureStarts 		row where each feature table starts
+	@param 	classCounts 		class counts of each node
+	@param 	featureEntropies 	entropy of each feature for each node (see _entropyOfFeatures)
+	@return gain of each feature (columns) for each node (rows)
+	"""
+	def _knownGain(self, featureTables, featureStarts, classCounts, featureEntropies):
+		known = np.add.reduceat(featureTables, featureStarts, axis=1)
+		fraction = known.sum(axis=2)/classCounts.sum(axis=1)[:, np.newaxis]
+		# the entropies of the features are weighted by the samples of each node, so they already are the fraction of the entropies over the known samples
+		return fraction * self._H(known) - featureEntropies
 
 	"""
 	Calculates and returns the entropy of the given values taken as a list
 
 	@param  amounts	 list of the amounts of elements for one feature value
-						belonging the target feature
+						belonging the target feature (or a matrix with a list per row)
 	"""
 	def _H(self,amounts):
-		acc=0
-		total_classes = sum(amounts)
-		for el in amounts:
-			if el != 0:
-				prob = el/total_classes
-				acc += prob * math.log(prob,2)
-		return -acc
+		return H(amounts)
 
 	"""
-	Given a feature, and the current training set we're dealing with, calculates the entropy for that continuous feature and updates the threshold setting it to the threshold whose partition has the minimum entropy
+	Given a continuous feature, and the samples of some nodes, finds the threshold that partitions the samples of each node with the minimum entropy and returns the contingency table of that partition
+
+	The candidate thresholds are the midpoints between consecutive values of the feature. The samples are sorted once by node and feature value and their classes are accumulated, so the class counts below any threshold of any node are just a lookup in the cumulative counts and every candidate of every node is scored at once (in blocks, to bound the memory used). Ties are resolved in favour of the first candidate, as when trying them one by one
 
+	@param 	trainingSet		samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	nodesCount 		number of nodes
 	@param 	feature			continous feature to calculate entropy
-	@param 	trainingSet		current filtered samples we're dealing with
-	@return the lowest entropy available for the partitioning of this feature
-	"""
-	def _entropyOfContinuousFeature(self, trainingSet, feature):
-		feature_values = [0,1]
-		# loop all possible values for the feature
-		values = self._features[feature]
-		entropy_min,best_threshold = 99, None
-		for i in range(len(values)-1):
-			threshold = (values[i]+values[i+1])/2.
-			# create partition according to threshold
-			feature_discrete = np.where(self._data[:,feature] < threshold, 0, 1)
-			entropy = self._entropyOfFeature(trainingSet, feature, feature_values, feature_discrete)
-			# check if there was an improvement
-			if entropy < entropy_min:
-				entropy_min = entropy
-				best_threshold = threshold
-		return entropy_min, best_threshold
+	@return contingency table of the best partition (< threshold, >= threshold) of each node and its threshold
+	"""
+	def _contingencyOfContinuousFeature(self, trainingSet, nodes, nodesCount, feature):
+		if self._binned is not None:
+			return self._contingencyOfBinnedFeature(trainingSet, nodes, nodesCount, feature)
+		# sort samples once and accumulate their classes
+		featureData = self._columns[feature][trainingSet]
+		order = np.lexsort((featureData, nodes))
+		featureData, nodes = featureData[order], nodes[order]
+		targetData = self._columns[self._target][trainingSet[order]]
+		classes = len(self._features[self._target])
+		cumulative = self._zeroCounts((len(featureData)+1)*classes).reshape(-1, classes)
+		weights = None if self._weights is None else self._weights[trainingSet[order]]
+		for targetClass in range(classes):
+			inClass = targetData == targetClass
+			np.cumsum(inClass if weights is None else np.where(inClass, weights, 0), out=cumulative[1:,targetClass])
+		starts = np.searchsorted(nodes, np.arange(nodesCount+1))
+		totals = cumulative[starts[1:]] - cumulative[starts[:-1]]
+		# candidate thresholds
+		values = np.asarray(self._features[feature], dtype=float)
+		if len(values) < 2:
+			# nothing to split, all samples are >= than the unique value
+			return np.stack((np.zeros_like(totals), totals), axis=1), np.full(nodesCount, values[0])
+		thresholds = (values[:-1] + values[1:])/2.
+		# samples below a threshold in a node, searching by (node, rank of the value)
+		sortedValues = np.sort(values)
+		keys = nodes * (len(values)+1) + np.searchsorted(sortedValues, featureData)
+		limits = np.searchsorted(sortedValues, thresholds, side="left")
+		tables = np.empty((nodesCount, 2, classes), dtype=cumulative.dtype)
+		best = np.empty(nodesCount, dtype=np.int64)
+		block = max(1, THRESHOLDS_BLOCK // len(thresholds))
+		for first in range(0, nodesCount, block):
+			block_nodes = np.arange(first, min(first+block, nodesCount))
+			positions = np.searchsorted(keys, block_nodes[:, np.newaxis] * (len(values)+1) + limits)
+			below = cumulative[positions] - cumulative[starts[block_nodes]][:, np.newaxis]
+			above = totals[block_nodes][:, np.newaxis] - below
+			total = totals[block_nodes].sum(axis=1)[:, np.newaxis]
+			entropies = below.sum(axis=2)/total * H(below) + above.sum(axis=2)/total * H(above)
+			block_best = entropies.argmin(axis=1)
+			best[block_nodes] = block_best
+			tables[block_nodes, 0] = below[np.arange(len(block_nodes)), block_best]
+			tables[block_nodes, 1] = above[np.arange(len(block_nodes)), block_best]
+		return tables, thresholds[best]
+
+	"""
+	Given a binned continuous feature, and the samples of some nodes, finds the edge between bins that partitions the samples of each node with the minimum entropy and returns the contingency table of that partition
+
+	The class counts of every bin of every node are obtained with a bincount per block of samples, so accumulating them along the bins gives the counts below every edge. The cost doesn't depend on the number of distinct values of the feature, just on the number of bins
+
+	@param 	trainingSet		samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	nodesCount 		number of nodes
+	@param 	feature			binned continuous feature to calculate entropy
+	@return contingency table of the best partition (< edge, >= edge) of each node and its edge as threshold
+	"""
+	def _contingencyOfBinnedFeature(self, trainingSet, nodes, nodesCount, feature):
+		column = self._binnedColumns[feature]
+		edges = self._edges[column]
+		classes, bins = len(self._features[self._target]), len(edges)+1
+		counts = self._zeroCounts(nodesCount*bins*classes)
+		for block in self._blocks(len(trainingSet)):
+			samples = trainingSet[block]
+			codes = (nodes[block] * bins + self._binned[samples, column]) * classes
+			codes += self._columns[self._target][samples]
+			counts += self._countCodes(codes, samples, len(counts))
+		counts = counts.reshape(nodesCount, bins, classes)
+		totals = counts.sum(axis=1)
+		if not len(edges):
+			# nothing to split, all samples are in the unique bin
+			return np.stack((totals, np.zeros_like(totals)), axis=1), np.full(nodesCount, np.inf)
+		# class counts of both partitions (< edge, >= edge)
+		below = np.cumsum(counts[:, :-1], axis=1)
+		above = totals[:, np.newaxis] - below
+		total = totals.sum(axis=1)[:, np.newaxis]
+		entropies = below.sum(axis=2)/total * H(below) + above.sum(axis=2)/total * H(above)
+		best = entropies.argmin(axis=1)
+		nodes = np.arange(nodesCount)
+		return np.stack((below[nodes, best], above[nodes, best]), axis=1), edges[best]
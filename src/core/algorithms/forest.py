@@ -0,0 +1,108 @@
+# Libraries
+from .parallel import ForestTrainingPool
+from core.dataset.trainingset import TrainingSet
+from core.tree.forest import DecisionForest
+import numpy as np
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+"""
+Grows a tree of a random forest: draws a bootstrap resample of the training set, as weights of the samples drawn (so the resample isn't copied), and grows a tree from it picking randomly the features to score at each node
+
+@param 	trainingSet 		training set to draw the resample from
+@param 	algorithmClass 		class of the tree growing algorithm
+@param 	target 				target feature to classify
+@param 	seed 				seed of the random generator to draw the resample and pick the features with
+@param 	bins 				maximum number of bins per continuous feature (None to search thresholds among all values)
+@param 	memory 				memory budget of the algorithm in bytes (None if unbounded)
+@param 	randomFeatures 		number of features picked randomly to score at each node
+@return decision tree grown
+"""
+def growForestTree(trainingSet, algorithmClass, target, seed, bins, memory, randomFeatures):
+	random = np.random.default_rng(seed)
+	samples = trainingSet.getSampleCount()
+	rows = np.arange(samples) if trainingSet.getRows() is None else np.asarray(trainingSet.getRows())
+	weights = trainingSet.getWeights()
+	if weights is None:
+		drawn = random.integers(0, samples, samples)
+	else:
+		# the weighted samples are drawn as if they were repeated as many times as their weight
+		total = int(weights.sum())
+		drawn = random.choice(samples, total, p=weights/total)
+	counts = np.bincount(drawn, minlength=samples)
+	picked = np.flatnonzero(counts)
+	resample = TrainingSet(None, trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures(), len(picked), trainingSet.getFeaturesCount(),
+		columns = trainingSet.getColumns(), rows = rows[picked], weights = counts[picked].astype(np.min_scalar_type(counts.max())),
+		masked = trainingSet.getMaskedCodes())
+	return algorithmClass(resample, bins, None, memory, randomFeatures, random)(target)
+
+"""
+Random forest: grows several trees with a tree growing algorithm (ID3, C4.5...), each one from its own bootstrap resample of the training set and picking randomly the features to score at each node, and classifies by the votes of the trees
+
+Every tree has its own seed, spawned from the seed of the forest, so the forest generated is the same whatever the number of processes growing it. The trees can be grown in parallel by a pool of processes attached to a single shared copy of the training set
+"""
+class RandomForestAlgorithm(object):
+	"""
+	@attr 	_trainingSet 		training set to grow the trees from
+	@attr 	_algorithmClass 	class of the tree growing algorithm
+	@attr 	_trees 				number of trees to grow
+	@attr 	_bins 				maximum number of bins per continuous feature (None to search thresholds among all values)
+	@attr 	_workers 			number of processes to grow the trees with
+	@attr 	_memory 			memory budget of each tree growing algorithm in bytes (None if unbounded)
+	@attr 	_randomFeatures 	number of features picked randomly to score at each node (None for the square root of the number of features)
+	@attr 	_seed 				seed of the random generators of the trees
+	"""
+	__slots__ = ["_trainingSet","_algorithmClass","_trees","_bins","_workers","_memory","_randomFeatures","_seed"]
+
+	"""
+	Initializes the random forest algorithm given some training data and the algorithm to grow each tree with
+
+	@param 	trainingSet 		training data object
+	@param 	algorithmClass 		class of the tree growing algorithm
+	@param 	trees 				number of trees to grow
+	@param 	bins 				maximum number of bins per continuous feature (None to search thresholds among all values)
+	@param 	workers 			number of processes to grow the trees with (None or 1 to grow them in this process)
+	@param 	memory 				memory budget of each tree growing algorithm in bytes (None if unbounded)
+	@param 	randomFeatures 		number of features picked randomly to score at each node (None for the square root of the number of features)
+	@param 	seed 				seed of the random generators of the trees (None for a random seed)
+	"""
+	def __init__(self, trainingSet, algorithmClass, trees, bins = None, workers = None, memory = None, randomFeatures = None, seed = None):
+		assert trees >= 1, "a forest must have at least 1 tree"
+		self._trainingSet = trainingSet
+		self._algorithmClass = algorithmClass
+		self._trees = trees
+		self._bins = bins
+		self._workers = workers
+		self._memory = memory
+		self._randomFeatures = randomFeatures
+		self._seed = seed
+
+	"""
+	Grows the trees of the forest. Returns the forest when all the trees are grown
+
+	@param 	target 	variable to classify
+	@return decision forest
+	"""
+	def __call__(self, target):
+		randomFeatures = self._randomFeatures or max(1, int(np.sqrt(self._trainingSet.getFeaturesCount() - 1)))
+		seeds = np.random.SeedSequence(self._seed).spawn(self._trees)
+		arguments = [(self._algorithmClass, target, seed, self._bins, self._memory, randomFeatures) for seed in seeds]
+		classes = self._trainingSet.getFeatureValues(target)
+		LOGGER.debug("Starting to generate a forest of %d trees, picking %d random features at each node",self._trees,randomFeatures)
+		trees = []
+		if self._workers is not None and self._workers > 1 and self._trees > 1:
+			pool = ForestTrainingPool(self._trainingSet, min(self._workers, self._trees))
+			try:
+				for tree in pool.train(growForestTree, arguments, classes):
+					trees.append(tree)
+					LOGGER.debug("-> Tree %d generated (%d nodes)",len(trees),tree.getNodesCount())
+			finally:
+				pool.close()
+		else:
+			for treeArguments in arguments:
+				trees.append(growForestTree(self._trainingSet, *treeArguments))
+				LOGGER.debug("-> Tree %d generated (%d nodes)",len(trees),trees[-1].getNodesCount())
+		LOGGER.debug("Forest generated")
+		# the forest classifies with as many threads as processes grow it
+		return DecisionForest(trees, classes, self._workers)
@@ -0,0 +1,387 @@
+# App modules
+from core.dataset.trainingset import TrainingSet
+from core.dataset.genericdataset import mappedArrayOf
+from core.tree.decisiontree import DecisionTree
+from core.helpers.timers import TIMERS
+
+# Libraries
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+import numpy as np
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+"""
+Algorithm used by a worker process to score features. Each worker process has its own copy, whose data is attached to the shared memory of the pool
+"""
+_algorithm = None
+
+"""
+Shared memory blocks a worker process is attached to
+"""
+_blocks = []
+
+"""
+Copies an array into a new shared memory block
+
+@param 	array 	array to share
+@return shared memory block and the description to attach to it (name, shape, type, no file offset and order)
+"""
+def share(array):
+	block = SharedMemory(create=True, size=max(1, array.nbytes))
+	shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+	shared[...] = array
+	return block, (block.name, array.shape, array.dtype.str, None, "C")
+
+"""
+Describes an array that is (a contiguous view of) a memory-mapped file, so other processes can map the same file instead of copying the array. The array can be contiguous by rows or by columns (as the binned matrix)
+
+@param 	array 	array to describe
+@return description to attach to it (file name, shape, type, offset in the file and order), or None if the array isn't memory-mapped from a file
+"""
+def describeMapped(array):
+	mapped = mappedArrayOf(array)
+	if mapped is None or not (array.flags.c_contiguous or array.flags.f_contiguous):
+		return None
+	offset = mapped.offset + array.__array_interface__["data"][0] - mapped.__array_interface__["data"][0]
+	return (mapped.filename, array.shape, array.dtype.str, offset, "C" if array.flags.c_contiguous else "F")
+
+"""
+Shares the columns of a dataset with other processes: the columns that are (contiguous views of) memory-mapped files are just described so the processes map the same files, and the rest are copied into new shared memory blocks
+
+@param 	columns 	columns to share
+@param 	blocks 		list where the shared memory blocks created are added
+@return description to attach to each column
+"""
+def shareColumns(columns, blocks):
+	descriptions = []
+	for column in columns:
+		description = describeMapped(column)
+		if description is None:
+			block, description = share(column)
+			blocks.append(block)
+		descriptions.append(description)
+	return descriptions
+
+"""
+Attaches to an array shared in a shared memory block or memory-mapped from a file, without copying it
+
+@param 	description 	description of the shared array (name, shape, type, offset in the file if it's a file and order)
+@return shared memory block (None for files) and the array
+"""
+def attach(description):
+	name, shape, dtype, offset, order = description
+	if offset is not None:
+		return None, np.memmap(name, dtype=np.dtype(dtype), mode="r", offset=offset, shape=shape, order=order)
+	block = SharedMemory(name=name)
+	return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+"""
+Initializes a worker process: creates its algorithm and attaches its data to the shared memory of the pool
+
+@param 	algorithmClass 	class of the algorithm to score features with
+@param 	attributes 		attributes of the algorithm that are not shared
+@param 	shared 			description of the shared arrays (or lists of arrays), by attribute name
+"""
+def _initWorker(algorithmClass, attributes, shared):
+	global _algorithm
+	_algorithm = algorithmClass.__new__(algorithmClass)
+	for name, value in attributes.items():
+		setattr(_algorithm, name, value)
+	for name, descriptions in shared.items():
+		arrays = []
+		for description in (descriptions if isinstance(descriptions, list) else [descriptions]):
+			block, array = attach(description)
+			if block is not None:
+				_blocks.append(block)
+			arrays.append(array)
+		setattr(_algorithm, name, arrays if isinstance(descriptions, list) else arrays[0])
+
+"""
+Scores a candidate feature for the nodes of the level stored in the shared memory of the pool
+
+@param 	task 	candidate feature, number of samples of the level, class counts of the nodes and nodes that have the feature available
+@return best score and threshold of the feature for each node, and the seconds spent scoring it
+"""
+def _scoreFeature(task):
+	candidate, samples, classCounts, available = task
+	start = perf_counter()
+	trainingSet = _algorithm._levelSamples[:samples]
+	nodes = _algorithm._levelNodes[:samples]
+	score, threshold = _algorithm._scoreFeature(trainingSet, nodes, classCounts, available, candidate)
+	return score, threshold, perf_counter() - start
+
+"""
+Pool of worker processes that score the candidate features of a tree growing algorithm in parallel, one feature per task. The training data is copied once into shared memory when the pool is created and the workers attach to it, so it's never pickled again (columns that are memory-mapped files are just mapped by the workers). For each level of the tree, the samples of the level and their nodes are written to shared memory too, so tasks just carry the feature to score and the workers only send back the best score and threshold of the feature for each node (and the time spent scoring it)
+"""
+class FeatureScoringPool(object):
+	"""
+	@attr 	_pool 		worker processes
+	@attr 	_blocks 	shared memory blocks
+	@attr 	_samples 	shared array to write the samples of a level
+	@attr 	_nodes 		shared array to write the node of each sample of a level
+	@attr 	_candidates candidate features of the algorithm
+	"""
+	__slots__ = ["_pool","_blocks","_samples","_nodes","_candidates"]
+
+	"""
+	Creates the pool of workers for the algorithm specified
+
+	@param 	algorithm 	tree growing algorithm whose features will be scored
+	@param 	workers 	number of worker processes
+	"""
+	def __init__(self, algorithm, workers):
+		self._blocks = []
+		self._candidates = list(algorithm._candidates)
+		# shared arrays
+		shared = {}
+		samples = len(algorithm._columns[algorithm._target])
+		# memory-mapped columns are mapped by the workers too
+		shared["_columns"] = shareColumns(algorithm._columns, self._blocks)
+		if algorithm._binned is not None:
+			# a memory-mapped binned matrix is mapped by the workers too
+			shared["_binned"] = shareColumns([algorithm._binned], self._blocks)[0]
+		if algorithm._weights is not None:
+			self._share(shared, "_weights", algorithm._weights)
+		self._samples = self._share(shared, "_levelSamples", np.empty(samples, dtype=np.int64))
+		self._nodes = self._share(shared, "_levelNodes", np.empty(samples, dtype=np.int64))
+		# not shared attributes
+		attributes = {name: getattr(algorithm, name) for name in
+			["_target","_features","_continuous","_masked","_binnedColumns","_edges","_candidates","_memory","_block"]}
+		attributes["_binned"], attributes["_weights"] = None, None
+		attributes["_pool"] = None
+		LOGGER.debug("Starting %d workers to score features",workers)
+		self._pool = Pool(workers, _initWorker, (type(algorithm), attributes, shared))
+
+	"""
+	Copies an array to shared memory so the workers can attach to it
+
+	@param 	shared 	descriptions of the shared arrays, where the new one is added
+	@param 	name 	attribute of the algorithm the array is for
+	@param 	array 	array to share
+	@return the shared array
+	"""
+	def _share(self, shared, name, array):
+		block, shared[name] = share(np.ascontiguousarray(array))
+		self._blocks.append(block)
+		return np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+
+	"""
+	Scores every candidate feature for each node of a level in parallel
+
+	@param 	trainingSet 	samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	classCounts 	class counts of each node
+	@param 	available 		features available for each node
+	@return score of each candidate feature (columns) for each node (rows) and its threshold
+	"""
+	def scoreFeatures(self, trainingSet, nodes, classCounts, available):
+		samples = len(trainingSet)
+		self._samples[:samples] = trainingSet
+		self._nodes[:samples] = nodes
+		scores = np.full((len(available), len(self._candidates)), -np.inf)
+		thresholds = np.full((len(available), len(self._candidates)), np.nan)
+		candidates = np.flatnonzero(available.any(axis=0))
+		tasks = [(candidate, samples, classCounts, available[:, candidate]) for candidate in candidates]
+		for candidate, (score, threshold, seconds) in zip(candidates, self._pool.map(_scoreFeature, tasks, chunksize=1)):
+			scores[:, candidate] = score
+			thresholds[:, candidate] = threshold
+			TIMERS.add("feature %d"%self._candidates[candidate], seconds, 3)
+		return scores, thresholds
+
+	"""
+	Stops the workers and releases the shared memory
+	"""
+	def close(self):
+		self._pool.close()
+		self._pool.join()
+		self._samples, self._nodes = None, None
+		for block in self._blocks:
+			block.close()
+			block.unlink()
+
+"""
+Shared data of a worker process training folds: the columns, the rows of each training set, the values of the features, the continuous features and the masked codes
+"""
+_folds = None
+
+"""
+Initializes a worker process training folds: attaches to the columns and the rows of the training sets in the shared memory of the pool
+
+@param 	columns 		descriptions of the shared columns
+@param 	rows 			description of the shared rows of all the training sets, one after the other
+@param 	bounds 			position where the rows of each training set start in the shared rows, followed by their end
+@param 	featuresValues 	values of each feature
+@param 	continuous 		continuous features
+@param 	masked 			masked code of each feature (None if no value is masked)
+"""
+def _initFoldWorker(columns, rows, bounds, featuresValues, continuous, masked):
+	global _folds
+	arrays = []
+	for description in columns + [rows]:
+		block, array = attach(description)
+		if block is not None:
+			_blocks.append(block)
+		arrays.append(array)
+	_folds = {"columns": arrays[:-1], "rows": arrays[-1], "bounds": bounds, "featuresValues": featuresValues, "continuous": continuous, "masked": masked}
+
+"""
+Trains the tree of a fold, with the training set of the fold stored in the shared memory of the pool
+
+@param 	task 	fold, class of the algorithm, target feature and arguments of the algorithm (bins and memory budget)
+@return tree trained
+"""
+def _trainFold(task):
+	fold, algorithmClass, target, bins, memory = task
+	start, end = _folds["bounds"][fold], _folds["bounds"][fold+1]
+	trainingSet = TrainingSet(None, _folds["featuresValues"], _folds["continuous"], end-start, len(_folds["columns"]),
+		columns = _folds["columns"], rows = _folds["rows"][start:end], masked = _folds["masked"])
+	return algorithmClass(trainingSet, bins, None, memory)(target)
+
+"""
+Pool of worker processes that train the trees of several training sets at once, one set (fold) per task, as a cross-validation does. The sets must be subsets of the same columns: the columns are copied once into shared memory (or mapped from their files) and the rows of every training set are copied once too, so the workers attach to them and tasks just carry the fold to train. Each worker trains the tree of its fold serially and sends back the tree, so the trees are validated by the caller
+"""
+class FoldTrainingPool(object):
+	"""
+	@attr 	_pool 		worker processes
+	@attr 	_blocks 	shared memory blocks
+	@attr 	_folds 		number of folds
+	"""
+	__slots__ = ["_pool","_blocks","_folds"]
+
+	"""
+	Creates the pool of workers for the sets specified
+
+	@param 	datasets 	list with the training set and validation set of each fold, whose training sets are subsets of the same columns
+	@param 	workers 	number of worker processes
+	"""
+	def __init__(self, datasets, workers):
+		self._blocks = []
+		self._folds = len(datasets)
+		sets = [trainingSet for trainingSet, _ in datasets]
+		columns = sets[0].getColumns()
+		assert all(len(dataset.getColumns()) == len(columns) and all(own is column for own, column in zip(dataset.getColumns(), columns)) for dataset in sets), "cannot train folds in parallel: the sets must share their columns"
+		# shared columns
+		descriptions = shareColumns(columns, self._blocks)
+		# shared rows of all the training sets
+		rows = [np.arange(len(columns[0])) if dataset.getRows() is None else dataset.getRows() for dataset in sets]
+		bounds = np.cumsum([0] + [len(setRows) for setRows in rows]).tolist()
+		block, rowsDescription = share(np.concatenate(rows).astype(np.int64))
+		self._blocks.append(block)
+		LOGGER.debug("Starting %d workers to train %d folds",workers,self._folds)
+		self._pool = Pool(workers, _initFoldWorker, (descriptions, rowsDescription, bounds,
+			sets[0].getFeaturesValues(), sets[0].getContinuousFeatures(), sets[0].getMaskedCodes()))
+
+	"""
+	Trains the tree of every fold in parallel
+
+	@param 	algorithmClass 	class of the tree growing algorithm
+	@param 	target 			target feature to classify
+	@param 	bins 			maximum number of bins per continuous feature (None to search thresholds among all values)
+	@param 	memory 			memory budget of the algorithm in bytes (None if unbounded)
+	@return list with the tree of each fold
+	"""
+	def train(self, algorithmClass, target, bins = None, memory = None):
+		tasks = [(fold, algorithmClass, target, bins, memory) for fold in range(self._folds)]
+		return self._pool.map(_trainFold, tasks, chunksize=1)
+
+	"""
+	Stops the workers and releases the shared memory
+	"""
+	def close(self):
+		self._pool.close()
+		self._pool.join()
+		for block in self._blocks:
+			block.close()
+			block.unlink()
+
+"""
+Shared data of a worker process training trees of a forest: the training set, whose columns, rows and weights are attached to the shared memory of the pool
+"""
+_forest = None
+
+"""
+Initializes a worker process training trees of a forest: attaches to the columns, the rows and the weights of the training set in the shared memory of the pool
+
+@param 	columns 		descriptions of the shared columns
+@param 	rows 			description of the shared rows of the training set
+@param 	weights 		description of the shared weights of the training set (None if not weighted)
+@param 	featuresValues 	values of each feature
+@param 	continuous 		continuous features
+@param 	masked 			masked code of each feature (None if no value is masked)
+"""
+def _initForestWorker(columns, rows, weights, featuresValues, continuous, masked):
+	global _forest
+	arrays = []
+	for description in columns + [rows] + ([weights] if weights is not None else []):
+		block, array = attach(description)
+		if block is not None:
+			_blocks.append(block)
+		arrays.append(array)
+	columns, rows = arrays[:len(columns)], arrays[len(columns)]
+	_forest = TrainingSet(None, featuresValues, continuous, len(rows), len(columns), columns = columns, rows = rows,
+		weights = arrays[-1] if weights is not None else None, masked = masked)
+
+"""
+Grows a tree of a forest from the training set stored in the shared memory of the pool
+
+@param 	task 	function growing the tree from the training set and its arguments
+@return arrays describing the nodes of the tree grown (see DecisionTree)
+"""
+def _trainForestTree(task):
+	function, arguments = task
+	return function(_forest, *arguments).getNodes()
+
+"""
+Pool of worker processes that grow the trees of a forest at once, one tree per task. The training set is copied once into shared memory (its columns, or mapped from their files, and its rows and weights) and the workers attach to it, so tasks just carry the arguments to grow their tree. The trees are sent back as the arrays of their nodes as soon as they are grown, so they're rebuilt as they come
+"""
+class ForestTrainingPool(object):
+	"""
+	@attr 	_pool 		worker processes
+	@attr 	_blocks 	shared memory blocks
+	"""
+	__slots__ = ["_pool","_blocks"]
+
+	"""
+	Creates the pool of workers for the training set specified
+
+	@param 	trainingSet 	training set to grow the trees from
+	@param 	workers 		number of worker processes
+	"""
+	def __init__(self, trainingSet, workers):
+		self._blocks = []
+		columns = shareColumns(trainingSet.getColumns(), self._blocks)
+		rows = np.arange(len(trainingSet.getColumns()[0])) if trainingSet.getRows() is None else trainingSet.getRows()
+		block, rows = share(np.ascontiguousarray(rows, dtype=np.int64))
+		self._blocks.append(block)
+		weights = None
+		if trainingSet.getWeights() is not None:
+			block, weights = share(np.ascontiguousarray(trainingSet.getWeights()))
+			self._blocks.append(block)
+		LOGGER.debug("Starting %d workers to train trees",workers)
+		self._pool = Pool(workers, _initForestWorker, (columns, rows, weights,
+			trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures(), trainingSet.getMaskedCodes()))
+
+	"""
+	Grows trees in parallel, a tree per list of arguments, and yields them as they're grown (in the order of the arguments)
+
+	@param 	function 	function growing a tree given the training set and the arguments (it must be a function of a module, so it can be sent to the workers)
+	@param 	arguments 	list with the arguments of each tree
+	@param 	classes 	values of the target feature of the trees
+	@return generator of the trees grown
+	"""
+	def train(self, function, arguments, classes):
+		for nodes in self._pool.imap(_trainForestTree, [(function, treeArguments) for treeArguments in arguments], chunksize=1):
+			yield DecisionTree(**nodes, classes=classes)
+
+	"""
+	Stops the workers and releases the shared memory
+	"""
+	def close(self):
+		self._pool.close()
+		self._pool.join()
+		for block in self._blocks:
+			block.close()
+			block.unlink()
@@ -1,6 +1,8 @@
 # Libraries
+from .parallel import FeatureScoringPool
+from core.tree.decisiontree import DecisionTree
+from core.helpers.timers import TIMERS
 from abc import ABCMeta,abstractmethod,abstractproperty
-from anytree import *
 import numpy as np
 import random
 import logging
@@ -18,25 +20,83 @@ class TreeGrowingAlgorithm(object):
 	__metaclass__ = ABCMeta
 	"""
 	@attr 	_target 			feature to classify to
-	@attr 	_data               training matrix obtained from training set containing the samples to classify
+	@attr 	_columns            training data obtained from training set containing the samples to classify, as an array per feature
+	@attr 	_rows 				rows of the columns that are samples of the training set (None if all of them)
+	@attr 	_weights 			weight of each row of the columns (None if every sample counts once)
 	@attr 	_features		 	possible values for each feature, specified as
 	list of lists
 	@attr 	_continuous 		features whose values are continuous
-	@attr 	_thresholds 		thresholds that set how to discretize the continuous values in order to set 2 partitions (< threshold, >= than threshold)
+	@attr 	_masked 			code of the masked value of each feature (None for the features without masked values, and None if no value is masked)
+	@attr 	_binned 			continuous features binned (uint8 matrix), if searching thresholds using histograms
+	@attr 	_binnedColumns 		column of each continuous feature in the binned matrix
+	@attr 	_edges 				edges between the bins of each binned feature
+	@attr 	_candidates 		features the tree can split by (all of them except the target)
+	@attr 	_randomFeatures 	number of available features picked randomly to score at each node (None to score all of them)
+	@attr 	_random 			random generator to pick the features with
+	@attr 	_workers 			number of processes to score features with
+	@attr 	_memory 			memory budget (bytes) for the temporary arrays of the samples of a level, or None if unbounded
+	@attr 	_block 				number of samples whose values are read and counted at once
+	@attr 	_pool 				pool of processes scoring features while the algorithm runs, if more than one worker and the algorithm scores features
 	@attr	_isRunning 			controls the algorithm is not run twice
 	"""
-	__slots__ = ["_target","_data","_features","_isRunning"]
+	__slots__ = ["_target","_columns","_rows","_weights","_features","_continuous","_masked","_binned",
+	"_binnedColumns","_edges","_candidates","_randomFeatures","_random","_workers","_memory","_block","_pool","_isRunning"]
 
 	"""
-	Initializes the tree growing algorithm given some training data
+	Whether the split criterion scores the candidate features, so they can be scored in parallel by a pool of processes (algorithms that don't score them never start the pool)
+	"""
+	scoresFeatures = False
+
+	"""
+	Initializes the tree growing algorithm given some training data. By default, the thresholds of continuous features are searched among all their values. If a number of bins is specified, continuous features are binned once into quantile bins and thresholds are only searched at the edges between bins (histogram mode), so the search doesn't grow with the number of distinct values
+
+	The features can be scored in parallel by a pool of worker processes, that attach to a shared copy of the training data. The tree generated is the same as when scoring them serially
+
+	If a memory budget is specified, the columns of the training data are read in blocks of samples and the class counts are accumulated block by block, so the temporary arrays of the samples read at once don't grow with the training data. This way the training data can be memory-mapped files larger than the memory (the binned features are memory-mapped too if the columns are). The arrays with an element per sample of a level (the samples, their nodes and the values they're split by) aren't bounded by the budget: they take up to about 80 bytes per training sample. The tree generated is the same whatever the budget is
+
+	If a number of random features is specified, each node is split by the best of that number of features picked randomly among the features available for the node (as the trees of a random forest do), instead of the best of all of them
+
+	If the training set has masked values (as the unknown values when they're masked), the samples whose value of a feature is masked are left out of the contingency table of the feature, so the feature is scored from the samples whose value is known, and when a node is split by the feature, they go with the samples of the child most of them go to (the child samples with an unknown value are classified to). Only the values of features that aren't continuous are masked
+
+	If the training set has weights, every count of samples (class counts, contingency tables and the counts below thresholds) is a weighted count, so a sample counts as many times as its weight without being copied, and the samples with no weight are left out
 
 	@param 	trainingSet 		training data object
+	@param 	bins 				maximum number of bins per continuous feature (None to search thresholds among all values)
+	@param 	workers 			number of processes to score the features with (None or 1 to score them in this process)
+	@param 	memory 				memory budget in bytes for the temporary arrays of the samples read at once (None to read all the samples of a level at once)
+	@param 	randomFeatures 		number of features picked randomly to score at each node (None to score all the features available)
+	@param 	seed 				seed (or random generator) to pick the random features with
 	"""
-	def __init__(self, trainingSet):
+	def __init__(self, trainingSet, bins = None, workers = None, memory = None, randomFeatures = None, seed = None):
 		self._target = None
 		self._features = trainingSet.getFeaturesValues()
-		self._data = trainingSet.getData()
+		self._columns = trainingSet.getColumns()
+		self._rows = trainingSet.getRows()
+		self._weights = trainingSet.getWeights()
+		if self._weights is not None and self._rows is not None:
+			# weights indexed as the columns
+			weights = np.zeros(len(self._columns[0]), dtype=self._weights.dtype)
+			weights[self._rows] = self._weights
+			self._weights = weights
 		self._continuous = trainingSet.getContinuousFeatures()
+		masked = trainingSet.getMaskedCodes()
+		self._masked = None
+		if masked is not None:
+			masked = [None if self._continuous[feature] else code for feature, code in enumerate(masked)]
+			self._masked = masked if any(code is not None for code in masked) else None
+		self._binned, self._binnedColumns, self._edges = None, None, None
+		if bins:
+			self._binned, self._edges = trainingSet.getBinnedFeatures(bins)
+			self._binnedColumns = np.cumsum(self._continuous) - 1
+		self._candidates = None
+		self._randomFeatures = randomFeatures
+		self._random = np.random.default_rng(seed)
+		self._workers = workers
+		self._memory = memory
+		self._block = None
+		if memory and not bins and any(self._continuous):
+			LOGGER.warning("Searching thresholds among all the values of continuous features sorts the samples of each level in memory, so it doesn't keep to the memory budget. Use histogram bins to train out of core")
+		self._pool = None
 		self._isRunning = False
 
 	"""
@@ -50,90 +110,406 @@ class TreeGrowingAlgorithm(object):
 		# not running
 		assert not self._isRunning, "the algorithm is alredy running"
 		self._isRunning = True
-		# generate features and trainingSet
-		trainingSet = np.ones(len(self._data), dtype=bool)
+		# generate features and trainingSet (all rows belong to the root)
 		if featureSet == None:
-			featureSet = [i for i in range(len(self._data[0]))]
+			featureSet = [i for i in range(len(self._columns))]
 		# check correct target
 		assert target in featureSet, """target classifier is not defined in
 		feature set, target must be %d <= target < %d"""%(0,len(featureSet))
 		self._target = target
-		featureSet.remove(target)
+		trainingSet = np.arange(len(self._columns[target])) if self._rows is None else np.array(self._rows, dtype=np.int64)
+		if self._weights is not None:
+			trainingSet = trainingSet[self._weights[trainingSet] > 0]
+		self._candidates = [feature for feature in featureSet if feature != target]
+		# samples read at once: an int64 code per candidate and a few indexes per sample
+		self._block = max(1, self._memory // (8 * (len(self._candidates) + 4))) if self._memory else max(1, len(trainingSet))
 		# classify
 		LOGGER.debug("Starting to generate decision tree")
-		tree = self._treeGrowing(trainingSet, featureSet)
+		if self.scoresFeatures and self._workers is not None and self._workers > 1:
+			self._pool = FeatureScoringPool(self, self._workers)
+		try:
+			tree = self._treeGrowing(trainingSet)
+		finally:
+			if self._pool is not None:
+				self._pool.close()
+				self._pool = None
 		LOGGER.debug("Decision tree generated")
 		self._isRunning = False
-		return tree.children[0]
+		return tree
 
 	"""
 	Creates a decision tree built from a given training set to evaluate and
 	classify some values in the future to determine the target value
 
-	@param  trainingSet	 	list of boolean references of the real training set
-	that specify the samples of the real training set we're dealing with
-	@param  featureSet 		list of features pending to classify
-	@param  target		 	feature to be determined by the tree
-	@return tree
-	"""
-	def _treeGrowing(self, trainingSet, featureSet, parent=Node("root"),
-	 	depth=0):
-		LOGGER.debug("-> treeGrowing Iteration (depth=%d)",depth)
-		LOGGER.debug("   Parent is: %s",str(parent.name))
-		if self._stopCriterion(trainingSet, featureSet):
-			# leaf
-			LOGGER.debug("--> Leaf reached.")
-			leaf = self._selectLeaf(trainingSet)
-			LOGGER.debug("    Leaf has been tagged as %s",self._features[self._target][leaf])
-			Node(self._features[self._target][leaf],parent)
-		else:
-			# branch
-			LOGGER.debug("--> Splitting tree")
-			featureNode = self._splitCriterion(trainingSet, featureSet)
-			featureNode.parent = parent
-			# Get data from the node
-			feature = featureNode.name
-			featureSet.remove(feature)
-			LOGGER.debug("---> Split criterion: %d",feature)
-			# temporary, just an idea -- born to help, not to work
-			for featureValue in featureNode.featureValues:
-				# cut training set
-				filteredTrainingSet = trainingSet * self._filterByFeatureValue(feature,featureValue,featureNode.featureData)
-				LOGGER.debug("----> Created node for %s",featureValue)
-				LOGGER.debug("      Examples:     %s (in, out)",str(np.bincount(filteredTrainingSet,minlength=2)[::-1]))
-				LOGGER.debug("      Distribution: %s (%s)",self._countTargetClasses(filteredTrainingSet),self._features[self._target])
-				# Recursive call
-				if(np.sum(filteredTrainingSet)):
-					valueNode = Node(featureValue,featureNode)
-					valueNode.samples = np.sum(filteredTrainingSet)
-					self._treeGrowing(filteredTrainingSet, featureSet, valueNode,depth+1)
-		return parent
-
-	"""
-	Given a feature and its value, selects all the samples whose feature specified matches the specified feature value in the feature data passed
-
-	@param 		feature 		feature whose values will be filtered
-	@param 		featureValue 	value of the feature the samples must match
-	@param 		featureData 	feature data of the samples
-	@return 	boolean array where trues are samples in the data that match the filter
-	"""
-	def _filterByFeatureValue(self, feature, featureValue, featureData):
-		return np.where(featureData == featureValue,True,False)
-
-	"""
-	Given a reference to the data as a boolean arrays, takes those true samples and counts how are they distributed according to the target feature
-
-	@param 		trainingSet 	references to the original sample data that we have to take in account to calculate the count of the target classes
-	@return 	list counting the occurences of each value of the classifier target feature in the training set reference specified
-	"""
-	def _countTargetClasses(self, trainingSet):
-		return np.bincount(self._data[:,self._target][trainingSet],minlength=len(self._features[self._target]))
-
-	"""
-	Given a traning set, returns the target feature value where most of the samples are in
-	"""
-	def _selectLeaf(self, trainingSet):
-		return self._countTargetClasses(trainingSet).argmax()
+	The tree grows level by level: the nodes of the frontier (the nodes of the same depth pending to be grown) are evaluated all at once. Each frontier node owns a contiguous slice of a permutation of the rows of the training data, and each row is tagged with the position of its node in the frontier, so the class counts and the split statistics of every node are obtained from grouped bincounts over the rows of the whole level. Splitting a node sorts its slice by the value of the split feature, so its children own contiguous sub-slices in the next level
+
+	Every node has its own set of features pending to classify: the ones of its parent except the feature its parent splits by
+
+	The nodes are numbered level by level as they are grown, so the arrays of each level are just appended to the arrays of the tree
+
+	Several trees can be grown at once from several slices of samples: each slice is the root of a tree, and the trees are stored in the same arrays, with their roots as the first nodes
+
+	@param  trainingSet	 	array of indexes of the rows of the real training set that specify the samples we're dealing with
+	@param 	bounds 			position where the samples of each root start, followed by their end (default is a single root with all the samples)
+	@param 	available 		features (candidates) available for each root (default is all of them)
+	@return decision tree
+	"""
+	def _treeGrowing(self, trainingSet, bounds = None, available = None):
+		tree = {attribute: [] for attribute in ["feature","threshold","children","childrenCount","value","leaf","samples"]}
+		# frontier: slices of the rows, available features and values leading to the nodes
+		bounds = np.array([0,len(trainingSet)]) if bounds is None else np.asarray(bounds)
+		available = np.ones((len(bounds)-1,len(self._candidates)), dtype=bool) if available is None else np.array(available, dtype=bool)
+		values = np.zeros(len(bounds)-1, dtype=np.int64)
+		nodesCount, depth = 0, 0
+		while len(bounds) > 1:
+			frontier = len(bounds) - 1
+			LOGGER.debug("-> treeGrowing level (depth=%d, nodes=%d)",depth,frontier)
+			TIMERS.count("nodes per depth", depth, frontier, 2)
+			nodes = np.repeat(np.arange(frontier), np.diff(bounds))
+			with TIMERS.phase("class counting", 2):
+				classCounts = self._countTargetClasses(trainingSet, nodes, frontier)
+				leaves = self._stopCriterion(classCounts, available)
+			LOGGER.debug("--> Leaves reached: %d",np.count_nonzero(leaves))
+			# level nodes
+			tree["value"].append(values)
+			tree["leaf"].append(self._selectLeaf(classCounts))
+			tree["samples"].append(classCounts.sum(axis=1))
+			feature = np.full(frontier, -1)
+			threshold = np.full(frontier, np.nan)
+			children = np.zeros(frontier, dtype=np.int64)
+			childrenCount = np.zeros(frontier, dtype=np.int64)
+			# branches
+			branches = np.flatnonzero(~leaves)
+			if len(branches):
+				LOGGER.debug("--> Splitting %d nodes",len(branches))
+				samples = ~leaves[nodes]
+				trainingSet, nodes = trainingSet[samples], (np.cumsum(~leaves)-1)[nodes[samples]]
+				available = available[branches]
+				with TIMERS.phase("split evaluation", 2):
+					candidates, thresholds = self._splitCriterion(trainingSet, nodes, classCounts[branches], self._pickFeatures(available))
+				features = np.asarray(self._candidates)[candidates]
+				# cut training set, so the children of every node are contiguous
+				with TIMERS.phase("partition", 2):
+					values = self._featureValuesOf(trainingSet, nodes, features, thresholds)
+					if self._masked is not None:
+						values = self._unmaskedValuesOf(trainingSet, nodes, features, values)
+					order = np.lexsort((values, nodes))
+					trainingSet, nodes, values = trainingSet[order], nodes[order], values[order]
+					starts = np.flatnonzero(np.diff(nodes) | np.diff(values)) + 1
+					bounds = np.concatenate(([0], starts, [len(trainingSet)]))
+					parents = nodes[bounds[:-1]]
+					values = self._featureValuesAt(values[bounds[:-1]], features[parents], thresholds[parents])
+				# link nodes with their children (numbered after the nodes of the level)
+				feature[branches], threshold[branches] = features, thresholds
+				childrenCount[branches] = np.bincount(parents, minlength=len(branches))
+				children[branches] = nodesCount + frontier + np.cumsum(childrenCount[branches]) - childrenCount[branches]
+				# children features: the ones of the parent except the split one
+				available = available[parents]
+				available[np.arange(len(parents)), candidates[parents]] = False
+			else:
+				bounds = np.zeros(1, dtype=np.int64)
+			for attribute, array in [("feature",feature),("threshold",threshold),("children",children),("childrenCount",childrenCount)]:
+				tree[attribute].append(array)
+			nodesCount += frontier
+			depth += 1
+		return DecisionTree(**{attribute: np.concatenate(arrays) for attribute, arrays in tree.items()}, classes=self._features[self._target])
+
+	"""
+	Evaluates the algorithm with leave-one-out: classifies each sample of the training set with the tree grown from all the other samples, without growing a tree per sample
+
+	The tree of all the samples is grown first. Then the samples walk down that tree level by level, and at each node of its path, each sample checks which decision the node takes without it, from the class counts and the split statistics of the node minus the contribution of the sample. While the decision is the same (stop, or split by the same feature and threshold), the tree grown without the sample has the same node, so the sample goes on to its child (or, if it's the only sample of its child, to the child the other samples make the default one and down the tree from there). Only when the decision changes, the subtree of the node is regrown from the samples of the node but the one left out, and the sample is classified with it. Ties are resolved as when growing, so every sample gets the class of the tree grown without it
+
+	Searching thresholds using histograms isn't supported, as the bins depend on the samples they're found from
+
+	@param 	target 		variable to classify
+	@param 	featureSet 	features to take in consideration
+	@return tree grown from all the samples and the class each sample (in the order of the training set) is classified to by the tree grown without it
+	"""
+	def leaveOneOut(self, target, featureSet = None):
+		assert self._binned is None, "leave-one-out can't search thresholds using histograms"
+		assert self._masked is None, "leave-one-out can't mask values"
+		assert self._weights is None, "leave-one-out can't leave out weighted samples"
+		assert self._randomFeatures is None, "leave-one-out can't pick features randomly"
+		tree = self(target, featureSet)
+		structure = tree.getNodes()
+		rows = np.arange(len(self._columns[target])) if self._rows is None else np.array(self._rows, dtype=np.int64)
+		assert len(rows) > 1, "leave-one-out needs at least 2 samples"
+		# candidate feature each node of the tree splits by (-1 for leaves)
+		candidates = np.full(len(self._columns), -1)
+		candidates[self._candidates] = np.arange(len(self._candidates))
+		split = np.where(structure["feature"] >= 0, candidates[structure["feature"]], -1)
+		available = np.zeros((tree.getNodesCount(), len(self._candidates)), dtype=bool)
+		available[0] = True
+		# samples of the level (sorted) and samples left out still walking down the tree
+		members = np.sort(rows)
+		memberNodes = np.zeros(len(members), dtype=np.int64)
+		pending, pendingNodes = members, memberNodes
+		predictions = np.full(len(members), -1, dtype=np.int64)
+		sortedRows = members
+		# samples classified from another node of the tree
+		moved, movedNodes = [], []
+		depth = 0
+		while len(pending):
+			LOGGER.debug("-> leave-one-out level (depth=%d, samples left out=%d)",depth,len(pending))
+			levelNodes, nodes = np.unique(memberNodes, return_inverse=True)
+			classCounts = self._countTargetClasses(members, nodes, len(levelNodes))
+			pendingLevel = np.searchsorted(levelNodes, pendingNodes)
+			# decision of the node of each sample without it
+			counts = classCounts[pendingLevel]
+			counts[np.arange(len(pending)), self._columns[target][pending]] -= 1
+			leaves = self._stopCriterion(counts, available[pendingNodes])
+			predictions[np.searchsorted(sortedRows, pending[leaves])] = self._selectLeaf(counts[leaves])
+			branches = np.flatnonzero(~leaves)
+			selected, thresholds = self._splitCriterionWithout(members, nodes, classCounts, available[levelNodes], pending[branches], pendingLevel[branches])
+			treeThresholds = structure["threshold"][pendingNodes[branches]]
+			same = (selected == split[pendingNodes[branches]]) & ((thresholds == treeThresholds) | (np.isnan(thresholds) & np.isnan(treeThresholds)))
+			LOGGER.debug("--> Subtrees regrown: %d",np.count_nonzero(~same))
+			regrow = branches[~same]
+			predictions[np.searchsorted(sortedRows, pending[regrow])] = self._regrowWithout(members, nodes, pending[regrow], pendingLevel[regrow], available[levelNodes], len(rows))
+			# children of the samples of the nodes that split
+			splitting = split[levelNodes] >= 0
+			kept = splitting[nodes]
+			members, nodes = members[kept], nodes[kept]
+			features, levelThresholds = structure["feature"][levelNodes], structure["threshold"][levelNodes]
+			values = self._featureValuesOf(members, nodes, features, levelThresholds)
+			values = self._featureValuesAt(values, features[nodes], levelThresholds[nodes])
+			memberNodes = tree.getChildren(levelNodes[nodes], values)
+			# features available for the children: the ones of the parent except the split one
+			parents = levelNodes[splitting]
+			childrenCount = structure["childrenCount"][parents]
+			children = np.repeat(structure["children"][parents] - np.cumsum(childrenCount) + childrenCount, childrenCount) + np.arange(childrenCount.sum())
+			available[children] = available[np.repeat(parents, childrenCount)]
+			available[children, np.repeat(split[parents], childrenCount)] = False
+			# samples left out going on to their child
+			pending = pending[branches[same]]
+			pendingNodes = memberNodes[np.searchsorted(members, pending)]
+			alone = structure["samples"][pendingNodes] == 1
+			moved.append(pending[alone])
+			movedNodes.extend(self._defaultChildWithout(structure, child) for child in pendingNodes[alone])
+			pending, pendingNodes = pending[~alone], pendingNodes[~alone]
+			depth += 1
+		moved = np.concatenate(moved)
+		if len(moved):
+			predictions[np.searchsorted(sortedRows, moved)] = tree.predict(self._samplesMatrix(moved), movedNodes)
+		# back to the order of the training set
+		return tree, predictions[np.argsort(np.argsort(rows))]
+
+	"""
+	Regrows the subtree of the node of each sample left out from the samples of the node but the one left out, and classifies the sample with it. The subtrees are grown together as the trees of a single growth, as many at once as samples fit in the number of samples specified
+
+	@param 	trainingSet 	samples of the nodes
+	@param 	nodes 			node of each sample
+	@param 	leftOut 		samples to leave out, one at a time
+	@param 	leftOutNodes 	node of each sample left out
+	@param 	available 		features (candidates) available for each node
+	@param 	batch 			number of samples to grow subtrees from at once
+	@return class each sample left out is classified to
+	"""
+	def _regrowWithout(self, trainingSet, nodes, leftOut, leftOutNodes, available, batch):
+		predictions = np.empty(len(leftOut), dtype=np.int64)
+		order = np.argsort(nodes, kind="stable")
+		starts = np.searchsorted(nodes[order], np.arange(len(available)+1))
+		sizes = starts[leftOutNodes+1] - starts[leftOutNodes] - 1
+		first = 0
+		while first < len(leftOut):
+			last = first + max(1, np.searchsorted(np.cumsum(sizes[first:]), batch, side="right"))
+			samples = []
+			for sample, node in zip(leftOut[first:last], leftOutNodes[first:last]):
+				samples.append(np.setdiff1d(trainingSet[order[starts[node]:starts[node+1]]], [sample], assume_unique=True))
+			bounds = np.cumsum([0] + [len(rootSamples) for rootSamples in samples])
+			regrown = self._treeGrowing(np.concatenate(samples), bounds, available[leftOutNodes[first:last]])
+			predictions[first:last] = regrown.predict(self._samplesMatrix(leftOut[first:last]), np.arange(last-first))
+			first = last
+		return predictions
+
+	"""
+	Builds the matrix of the values of every feature (columns) of some samples (rows), to classify them with a tree
+
+	@param 	samples 	indexes of the samples
+	@return matrix of samples
+	"""
+	def _samplesMatrix(self, samples):
+		return np.column_stack([column[samples] for column in self._columns])
+
+	"""
+	Given a node of a tree, returns the child its parent sends the samples to when they have no child of their own (the one with more samples, the first one if there are ties) if the node didn't exist
+
+	@param 	structure 	arrays describing the nodes of the tree
+	@param 	node 		node to ignore
+	@return default child of the parent of the node among the rest of children
+	"""
+	def _defaultChildWithout(self, structure, node):
+		parent = np.flatnonzero((structure["children"] <= node) & (structure["children"] + structure["childrenCount"] > node))[0]
+		children = np.arange(structure["children"][parent], structure["children"][parent] + structure["childrenCount"][parent])
+		children = children[children != node]
+		return children[structure["samples"][children].argmax()]
+
+	"""
+	Picks randomly the features to score for each node among the features available for it, if the number of random features is set
+
+	@param 	available 	boolean matrix with the features (candidates) available for each node
+	@return boolean matrix with the features picked for each node (the ones available if all of them are scored)
+	"""
+	def _pickFeatures(self, available):
+		if self._randomFeatures is None:
+			return available
+		keys = self._random.random(available.shape)
+		keys[~available] = np.inf
+		kth = np.sort(keys, axis=1)[:, min(self._randomFeatures, available.shape[1]) - 1]
+		return available & (keys <= kth[:, np.newaxis])
+
+	"""
+	Given the samples of some nodes and the feature each node splits by, returns the position that the value of the feature of each sample has in the feature values of its node. If the node has a threshold, the values are discretized into 0 (< threshold) and 1 (>= threshold)
+
+	@param 		trainingSet 	indexes of the samples
+	@param 		nodes 			node of each sample
+	@param 		features 		feature to take the value from for each node
+	@param 		thresholds 		threshold of each node (NaN if none)
+	@return 	position of the feature value of each sample
+	"""
+	def _featureValuesOf(self, trainingSet, nodes, features, thresholds):
+		values = np.empty(len(trainingSet), dtype=np.int64)
+		for block in self._blocks(len(trainingSet)):
+			blockFeatures = features[nodes[block]]
+			for feature in np.unique(blockFeatures):
+				samples = np.flatnonzero(blockFeatures == feature) + block.start
+				values[samples] = self._columns[feature][trainingSet[samples]]
+		threshold = thresholds[nodes]
+		discretize = ~np.isnan(threshold)
+		values[discretize] = values[discretize] >= threshold[discretize]
+		# continuous features without threshold: look up the value position
+		for feature in np.unique(features[np.isnan(thresholds)]):
+			if self._continuous[feature]:
+				positions = np.argsort(self._features[feature], kind="stable")
+				sortedValues = np.asarray(self._features[feature])[positions]
+				raw = (features[nodes] == feature) & ~discretize
+				values[raw] = positions[np.searchsorted(sortedValues, values[raw])]
+		return values
+
+	"""
+	Given the values of the split feature of the samples of some nodes, replaces the masked values by the value most of the samples of the node whose value is known take (the first one if there are ties), so the samples with masked values go to the child with more samples, the default child of the node. The values of nodes where every value is masked are kept
+
+	@param 		trainingSet 	indexes of the samples
+	@param 		nodes 			node of each sample
+	@param 		features 		feature each node is split by
+	@param 		values 			value of the split feature of each sample (as returned by _featureValuesOf)
+	@return 	values with the masked values replaced
+	"""
+	def _unmaskedValuesOf(self, trainingSet, nodes, features, values):
+		codes = np.array([-1 if code is None else code for code in self._masked])[features]
+		masked = values == codes[nodes]
+		if not masked.any():
+			return values
+		size = max(len(self._features[feature]) for feature in np.unique(features))
+		counts = self._countCodes(nodes * size + values, trainingSet, len(features) * size).reshape(len(features), size)
+		split = np.flatnonzero(codes >= 0)
+		counts[split, codes[split]] = 0
+		known = counts.max(axis=1) > 0
+		replace = masked & known[nodes]
+		values[replace] = counts.argmax(axis=1)[nodes[replace]]
+		return values
+
+	"""
+	Given positions of feature values (as returned by _featureValuesOf), returns the feature values at that positions
+
+	@param 		positions 		positions of the feature values
+	@param 		features 		feature of each position
+	@param 		thresholds 		threshold of the feature of each position (NaN if none)
+	@return 	feature values
+	"""
+	def _featureValuesAt(self, positions, features, thresholds):
+		values = positions.copy()
+		raw = np.isnan(thresholds)
+		for feature in np.unique(features[raw]):
+			if self._continuous[feature]:
+				atFeature = raw & (features == feature)
+				values[atFeature] = np.asarray(self._features[feature])[positions[atFeature]]
+		return values
+
+	"""
+	Splits the samples of a level into the blocks of samples that are read at once
+
+	@param 		samples 	number of samples of the level
+	@return 	list of slices, one per block
+	"""
+	def _blocks(self, samples):
+		return [slice(first, first+self._block) for first in range(0, samples, self._block)]
+
+	"""
+	Builds the contingency tables (feature values x target classes counts) of the samples of some nodes for all the features specified in a single pass. The node, the value of each feature and the class of each sample are combined into a code that identifies a cell of a table, so just one bincount fills every cell of every table of every node. The samples are coded and counted block by block, accumulating the counts
+
+	@param 		trainingSet 	indexes of the samples to count
+	@param 		nodes 			node of each sample
+	@param 		nodesCount 		number of nodes
+	@param 		features 		features (not continuous) to build the tables for
+	@return 	array with the tables of each node, stacked one after the other, so for each node the rows are the values of the features and the columns the target classes, and the row where each feature table starts
+	"""
+	def _contingencyTables(self, trainingSet, nodes, nodesCount, features):
+		classes = len(self._features[self._target])
+		offsets = np.cumsum([0] + [len(self._features[feature]) for feature in features])
+		counts = self._zeroCounts(nodesCount*offsets[-1]*classes)
+		for block in self._blocks(len(trainingSet)):
+			samples = trainingSet[block]
+			codes = np.empty((len(samples), len(features)), dtype=np.int64, order="F")
+			for column, feature in enumerate(features):
+				codes[:, column] = self._columns[feature][samples]
+			codes += offsets[:-1]
+			codes += (nodes[block] * offsets[-1])[:, np.newaxis]
+			codes *= classes
+			codes += self._columns[self._target][samples][:, np.newaxis]
+			counts += self._countCodes(codes, samples, len(counts))
+		tables = counts.reshape(nodesCount, offsets[-1], classes)
+		if self._masked is not None:
+			# masked values are left out of the tables
+			for column, feature in enumerate(features):
+				if self._masked[feature] is not None:
+					tables[:, offsets[column] + self._masked[feature]] = 0
+		return tables, offsets[:-1]
+
+	"""
+	Given the indexes of some samples of the data and the node each one belongs to, counts how are they distributed according to the target feature in each node, block by block
+
+	@param 		trainingSet 	indexes of the samples of the original data that we have to take in account to calculate the count of the target classes
+	@param 		nodes 			node of each sample
+	@param 		nodesCount 		number of nodes
+	@return 	matrix counting the occurences of each value of the classifier target feature (columns) in each node (rows)
+	"""
+	def _countTargetClasses(self, trainingSet, nodes, nodesCount):
+		classes = len(self._features[self._target])
+		counts = self._zeroCounts(nodesCount*classes)
+		for block in self._blocks(len(trainingSet)):
+			codes = nodes[block] * classes + self._columns[self._target][trainingSet[block]]
+			counts += self._countCodes(codes, trainingSet[block], len(counts))
+		return counts.reshape(nodesCount, classes)
+
+	"""
+	Returns an array of counts of samples set to zero: integers, or floats if the samples are weighted
+
+	@param 		length 		number of counts
+	@return 	array of zero counts
+	"""
+	def _zeroCounts(self, length):
+		return np.zeros(length, dtype=np.int64 if self._weights is None else np.float64)
+
+	"""
+	Counts the samples of each code, as a bincount of the codes. If the training set has weights, each sample counts as its weight
+
+	@param 		codes 		code of each sample, or a column of codes per feature of each sample (in column-major order)
+	@param 		samples 	indexes of the samples
+	@param 		length 		number of codes
+	@return 	count of each code
+	"""
+	def _countCodes(self, codes, samples, length):
+		if self._weights is None:
+			return np.bincount(codes.ravel(order="K"), minlength=length)
+		weights = self._weights[samples]
+		return np.bincount(codes.ravel(order="F"), weights=np.tile(weights, codes.size // max(1, len(weights))), minlength=length)
+
+	"""
+	Given the class counts of some nodes, returns the target feature value where most of the samples of each node are in
+	"""
+	def _selectLeaf(self, classCounts):
+		return classCounts.argmax(axis=1)
 
 	"""
 	Adds a meaning field to each node in order to then print the node with useful information. The algorithm will try to look for meanings in the original dataset, but will retrieve default values if not possible
@@ -183,22 +559,42 @@ class TreeGrowingAlgorithm(object):
 
 	"""
 	Determines if the tree must stop growing and put a leaf or not, based on
-	the current training set and attribute set remaining
+	the class counts of the nodes and the features remaining for them
 
-	@return 	True if stop and put a leaf
+	@param 	classCounts 	class counts of each node
+	@param 	available 		boolean matrix with the features (candidates) available for each node
+	@return 	boolean array, true for the nodes that must stop and put a leaf
 	"""
 	@abstractmethod
-	def _stopCriterion(self, trainingSet, featureSet):
+	def _stopCriterion(self, classCounts, available):
 		pass
 
 	"""
-	Selects the next feature to classify the tree and returns a node for the tree containing that feature
+	Selects the next feature to classify each node of the tree
 
 	@param  trainingSet Set of samples to build the tree
-	@return node   		tree node containing the feature to classify and its properties
+	@param 	nodes 		node of each sample
+	@param 	classCounts class counts of each node
+	@param 	available 	boolean matrix with the features (candidates) available for each node
+	@return candidate feature selected for each node and its threshold (NaN if it's not discretized)
 	"""
 	@abstractmethod
-	def _splitCriterion(self, trainingSet, featureSet):
+	def _splitCriterion(self, trainingSet, nodes, classCounts, available):
+		pass
+
+	"""
+	Selects the next feature to classify the node of each sample specified, as if the sample wasn't in its node (the split statistics of the node are the ones of its samples but the one left out)
+
+	@param  trainingSet 	samples of the nodes (including the ones left out)
+	@param 	nodes 			node of each sample
+	@param 	classCounts 	class counts of each node
+	@param 	available 		boolean matrix with the features (candidates) available for each node
+	@param 	leftOut 		samples to leave out, one at a time
+	@param 	leftOutNodes 	node of each sample left out
+	@return candidate feature selected for the node of each sample left out and its threshold (NaN if it's not discretized)
+	"""
+	@abstractmethod
+	def _splitCriterionWithout(self, trainingSet, nodes, classCounts, available, leftOut, leftOutNodes):
 		pass
 
 	"""
@@ -215,22 +611,15 @@ Dummy implementation of the tree growing algorithm. Generates a decision tree
 with the simple criteria of picking the first feature as the next classifier
 """
 class BasicTreeGrowingAlgorithm(TreeGrowingAlgorithm):
-	def _stopCriterion(self, trainingSet, featureSet):
+	def _stopCriterion(self, classCounts, available):
 		# Not attributes remaining
-		if not len(featureSet):
-			return True
+		stop = ~available.any(axis=1)
 		# All elements belonging to a unique class
-		if np.count_nonzero(self._countTargetClasses(trainingSet)) == 1:
-			return True
-
-		#Continue classifying
-		return False
-
-	def _splitCriterion(self, trainingSet, featureSet):
-		feature = featureSet[0]
-		featureNode = Node(feature)
-		featureNode.featureValues = self._features[feature]
-		featureNode.featureData = self._data[:,feature]
-		featureNode.isContinuous = self._continuous[feature]
-		featureNode.threshold = None
-		return featureNode
+		stop |= np.count_nonzero(classCounts, axis=1) == 1
+		return stop
+
+	def _splitCriterion(self, trainingSet, nodes, classCounts, available):
+		return available.argmax(axis=1), np.full(len(available), np.nan)
+
+	def _splitCriterionWithout(self, trainingSet, nodes, classCounts, available, leftOut, leftOutNodes):
+		return available[leftOutNodes].argmax(axis=1), np.full(len(leftOut), np.nan)
@@ -0,0 +1,105 @@
+# App modules
+from .constants import *
+
+# libraries
+import numpy as np
+import hashlib
+import logging
+import json
+import os
+
+# constants
+LOGGER = logging.getLogger(__name__)
+
+"""
+Binary cache of a dataset already read and encoded, stored in a folder next to the files of the dataset. Each column of codes is saved as a .npy file, so it can be loaded without parsing any text (or memory-mapped), and a JSON manifest keeps the values of each feature (so the text to code maps can be rebuilt), the parsed features meanings and the number of training samples
+
+The data is cached unfiltered, so every filter is applied to the same cached codes when they're loaded, and trying another filter doesn't read or encode the dataset again
+
+The cache is identified by a key: the name, size, modification time and content hash of each file of the dataset. The cache is only used if its key matches the key of the current files
+"""
+class DatasetCache(object):
+	"""
+	@attr 	_folder 	folder of the dataset files
+	@attr 	_path 		folder of the cache
+	"""
+	__slots__ = ["_folder","_path"]
+
+	"""
+	Initializes the cache of a dataset folder
+
+	@param 	folder 	folder where the dataset files are located
+	"""
+	def __init__(self, folder):
+		self._folder = folder
+		self._path = os.path.join(folder, DATASET_CACHE_FOLDER, DATASET_CACHE_CODES_FOLDER)
+
+	"""
+	Calculates the key that identifies the current files of the dataset
+
+	@return key as a dictionary
+	"""
+	def _key(self):
+		extensions = ["." + ext for ext in (DATASET_TRAINING_EXT, DATASET_VALIDATION_EXT, DATASET_FEATURES_EXT)]
+		files = []
+		for filename in sorted(os.listdir(self._folder)):
+			path = os.path.join(self._folder, filename)
+			if os.path.splitext(filename)[1] in extensions and os.path.isfile(path):
+				stat = os.stat(path)
+				digest = hashlib.sha1()
+				with open(path, "rb") as source:
+					for block in iter(lambda: source.read(DATASET_READ_CHUNK), b""):
+						digest.update(block)
+				files.append({"name": filename, "size": stat.st_size, "mtime": stat.st_mtime_ns, "sha1": digest.hexdigest()})
+		return {"version": DATASET_CACHE_VERSION, "files": files}
+
+	"""
+	Loads the dataset from the cache if it's valid for the current files of the dataset
+
+	@param 	mmap 	true to memory-map the columns instead of reading them
+	@return columns of codes (an array per feature), the values of each feature, the number of training samples and the features meanings; or None if there's no valid cache
+	"""
+	def load(self, mmap = False):
+		try:
+			with open(os.path.join(self._path, DATASET_CACHE_MANIFEST)) as manifest_file:
+				manifest = json.load(manifest_file)
+		except (OSError, ValueError):
+			LOGGER.debug("No dataset cache found in %s",self._path)
+			return None
+		if manifest.get("key") != self._key():
+			LOGGER.debug("Dataset cache in %s is outdated",self._path)
+			return None
+		columns = [np.load(os.path.join(self._path, column), mmap_mode="r" if mmap else None)
+			for column in manifest["columns"]]
+		LOGGER.debug("Loaded dataset from cache %s",self._path)
+		return columns, manifest["featuresValues"], manifest["trainingSamples"], manifest["featuresData"]
+
+	"""
+	Saves a dataset into the cache, replacing the previous one
+
+	@param 	columns 			columns of codes (an array per feature)
+	@param 	featuresValues 		values of each feature, so the code of each value is its position
+	@param 	trainingSamples 	number of training samples (the first ones of the data)
+	@param 	featuresData 		features meanings (None if unknown)
+	"""
+	def save(self, columns, featuresValues, trainingSamples, featuresData):
+		os.makedirs(self._path, exist_ok=True)
+		# invalidate the previous cache until the new one is complete
+		manifestPath = os.path.join(self._path, DATASET_CACHE_MANIFEST)
+		if os.path.exists(manifestPath):
+			os.remove(manifestPath)
+		files = []
+		for feature, column in enumerate(columns):
+			files.append("column%02d.npy"%feature)
+			np.save(os.path.join(self._path, files[-1]), np.ascontiguousarray(column))
+		manifest = {
+			"key": self._key(),
+			"samples": int(len(columns[0])) if len(columns) else 0,
+			"trainingSamples": int(trainingSamples),
+			"columns": files,
+			"featuresValues": featuresValues,
+			"featuresData": featuresData
+		}
+		with open(manifestPath, "w") as manifest_file:
+			json.dump(manifest, manifest_file)
+		LOGGER.debug("Saved dataset into cache %s",self._path)
@@ -29,3 +29,54 @@ DATASET_FEATURE_CONT = "continuous"
 Dataset cols separator
 """
 DATASET_COLS_SEP = ','
+
+"""
+Value of the features whose value is unknown (missing) in a sample
+"""
+DATASET_UNKNOWN_VALUE = '?'
+
+"""
+Size of the chunks (in characters) the dataset files are read in
+"""
+DATASET_READ_CHUNK = 1 << 20
+
+"""
+Number of samples parsed from the dataset files before encoding them at once
+"""
+DATASET_ENCODE_ROWS = 1 << 14
+
+"""
+Maximum size (in bytes) of the parts a dataset file is split into when it's parsed by several processes, so each process merges its part before parsing the next one
+"""
+DATASET_PARSE_PART = 1 << 24
+
+"""
+Folder inside a dataset folder where the datasets already read are cached, and the manifest of each cache
+"""
+DATASET_CACHE_FOLDER = ".cache"
+DATASET_CACHE_MANIFEST = "manifest.json"
+
+"""
+Folder inside the cache folder of a dataset where the codes of the dataset are cached (unfiltered, for every filter)
+"""
+DATASET_CACHE_CODES_FOLDER = "codes"
+
+"""
+Version of the format of the dataset caches. Caches with another version are read again from the dataset files
+"""
+DATASET_CACHE_VERSION = 2
+
+"""
+Maximum number of bins to bin continuous features into (bins are stored as uint8 codes)
+"""
+DATASET_MAX_BINS = 255
+
+"""
+Number of samples converted, scanned or classified at once when going through the columns of a dataset, so the memory used doesn't grow with the dataset when its columns are memory-mapped files
+"""
+DATASET_BLOCK_SAMPLES = 1 << 20
+
+"""
+Folder inside the cache folder of a dataset where the numeric columns of the training and validation sets are stored as memory-mapped files while training out of core
+"""
+DATASET_COLUMNS_FOLDER = "columns"
@@ -0,0 +1,99 @@
+# libraries
+import numpy as np
+import logging
+
+# constants
+LOGGER = logging.getLogger(__name__)
+
+"""
+Encodes text samples into integer codes as they come, chunk by chunk, so the text of the samples never has to be kept in memory. Each column has its own dictionary, that assigns a code to each text value as it appears. When all the samples have been encoded, the codes are renumbered so that each code is the position of its value in the sorted values of the column, and the samples are returned as a column-oriented matrix
+"""
+class DatasetEncoder(object):
+	"""
+	@attr 	_dictionaries 	dictionary of each column, mapping each text value to its code (in order of appearance)
+	@attr 	_chunks 		codes of each chunk of samples encoded, for each column
+	@attr 	_samples 		number of samples encoded
+	"""
+	__slots__ = ["_dictionaries","_chunks","_samples"]
+
+	"""
+	Initializes an encoder with no samples encoded
+	"""
+	def __init__(self):
+		self._dictionaries = None
+		self._chunks = None
+		self._samples = 0
+
+	"""
+	Encodes a chunk of samples, adding their new values to the dictionaries of the columns
+
+	@param 	rows 	samples to encode, as a list of rows of text values
+	"""
+	def encodeRows(self, rows):
+		if not len(rows):
+			return
+		if self._dictionaries is None:
+			self._dictionaries = [dict() for _ in rows[0]]
+			self._chunks = [[] for _ in rows[0]]
+		columns = len(self._dictionaries)
+		assert all(len(row) == columns for row in rows), """cannot encode samples: all samples must have %d features"""%columns
+		for column, values in enumerate(zip(*rows)):
+			dictionary = self._dictionaries[column]
+			codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+			self._chunks[column].append(np.array(codes, dtype=np.uint32))
+		self._samples += len(rows)
+
+	"""
+	Appends the samples encoded by another encoder after the samples of this one. The values of the dictionaries of the other encoder are looked up (or added) in the dictionaries of this one, in their order of appearance, so its codes are just remapped, chunk by chunk, with the codes of this encoder. The result is the same as encoding all the samples with this encoder
+
+	@param 	encoder 	encoder whose samples are appended
+	"""
+	def merge(self, encoder):
+		if encoder._dictionaries is None:
+			return
+		if self._dictionaries is None:
+			self._dictionaries = [dict() for _ in encoder._dictionaries]
+			self._chunks = [[] for _ in encoder._dictionaries]
+		assert len(encoder._dictionaries) == len(self._dictionaries), """cannot merge encoded samples: all samples must have %d features"""%len(self._dictionaries)
+		for column, dictionary in enumerate(encoder._dictionaries):
+			own = self._dictionaries[column]
+			recode = np.array([own.setdefault(value, len(own)) for value in dictionary], dtype=np.uint32)
+			self._chunks[column].extend(recode[chunk] for chunk in encoder._chunks[column])
+		self._samples += encoder._samples
+
+	"""
+	Returns the number of samples encoded
+
+	@return 	number of samples encoded
+	"""
+	def getSampleCount(self):
+		return self._samples
+
+	"""
+	Returns the values of each column, sorted, so that the position of a value is its code in the encoded data
+
+	@return 	list with the sorted values of each column
+	"""
+	def getFeaturesValues(self):
+		if self._dictionaries is None:
+			return []
+		return [sorted(dictionary) for dictionary in self._dictionaries]
+
+	"""
+	Returns the samples encoded as a column-oriented matrix, where the code of each value is its position in the sorted values of the column. The codes of the chunks are released as each column is built, so the memory used doesn't grow much more than the matrix (thus it can only be called once). The type of the matrix is the smallest unsigned integer type able to store the codes of all the columns
+
+	@return 	matrix of codes, samples as rows and features as columns
+	"""
+	def getData(self):
+		if self._dictionaries is None:
+			return np.zeros((0, 0), dtype=np.uint8)
+		largest = max(len(dictionary) for dictionary in self._dictionaries)
+		data = np.empty((self._samples, len(self._dictionaries)), dtype=np.min_scalar_type(max(largest - 1, 0)), order="F")
+		for column, dictionary in enumerate(self._dictionaries):
+			# code of appearance -> position in the sorted values
+			recode = np.empty(len(dictionary), dtype=data.dtype)
+			recode[[dictionary[value] for value in sorted(dictionary)]] = np.arange(len(dictionary))
+			data[:, column] = recode[np.concatenate(self._chunks[column])]
+			self._chunks[column] = None
+		LOGGER.debug("Encoded %d samples with %d features as %s codes",self._samples,len(self._dictionaries),data.dtype)
+		return data
@@ -1,41 +1,111 @@
+# App modules
+from .constants import *
+
 # libraries
+import numpy as np
 import logging
 
 # constants
 LOGGER = logging.getLogger(__name__)
 
 """
-Ables to filter a dataset in order to clean the dataset data from non-valid or non-desirable feature values
+Ables to filter a dataset in order to clean the dataset data from non-valid or non-desirable feature values. The data is filtered already encoded as columns of codes of the features values (as cached), so filtering just selects rows of the columns
+
+The unknown value has a reserved code in each column (its code in the values of the feature), so the unknown values are found comparing codes. They are tracked with a bitmap (a bit per feature of each sample), so the samples can be kept and their unknown values masked (their codes are given to the tree growing algorithms, that leave them out of the counts), or removed with a single row mask, without copying the data. Filters can be reset and tried again without reading or encoding the dataset again
 """
 class DatasetFilterer(object):
 	"""
-	@attr   _data		the dataset data to filter
+	@attr   _columns	the dataset data to filter, as columns of codes (an array per feature)
+	@attr 	_features_vals 	values of each feature, so the position of each value is its code
+	@attr 	_kept 		samples of the original data that have not been filtered
+	@attr 	_unknown 	reserved code of the unknown value of each feature (None if the feature has no unknown values)
+	@attr 	_missing 	bitmap of the unknown values (a row of bits per sample, a bit per feature), once calculated
 	"""
-	__slots__ = ["_data"]
+	__slots__ = ["_columns","_features_vals","_kept","_unknown","_missing"]
 
 	"""
 	Initializes the filterer with the data specified
 
-	@param  data	data to filter
+	@param  columns			data to filter, as columns of codes (an array per feature)
+	@param 	features_vals 	values of each feature, so the position of each value is its code
+	@param  unk				the value used when there's an unknown value
+	"""
+	def __init__(self, columns, features_vals, unk = DATASET_UNKNOWN_VALUE):
+		self._columns = columns
+		self._features_vals = features_vals
+		self._kept = np.ones(len(columns[0]) if len(columns) else 0, dtype=bool)
+		self._unknown = [values.index(unk) if unk in values else None for values in features_vals]
+		self._missing = None
+
+	"""
+	Returns the reserved code of the unknown value of each feature
+
+	@return 	list with the code of the unknown value of each feature (None if the feature has no unknown values)
+	"""
+	def getUnknownCodes(self):
+		return self._unknown
+
+	"""
+	Keeps all the samples, masking their unknown values: builds the bitmap of the unknown values, where the bits of each sample (a row of bytes) are set for the features whose value is unknown, in the order of np.packbits. The data is not copied
+
+	@return 	bitmap of the unknown values, as a matrix of bytes (samples as rows)
+	"""
+	def maskUnknownValues(self):
+		if self._missing is None:
+			self._missing = np.zeros((len(self._kept), (len(self._features_vals)+7)//8), dtype=np.uint8)
+			for feature, code in enumerate(self._unknown):
+				if code is not None:
+					self._missing[:, feature//8] |= (np.asarray(self._columns[feature]) == code).view(np.uint8) << (7 - feature%8)
+		return self._missing
+
+	"""
+	Returns which values are unknown, as masks unpacked from the bitmap of the unknown values
+
+	@param 	feature 	feature to get the mask of (default is all the features)
+	@return 	boolean array, true for the samples whose value of the feature is unknown (or boolean matrix with a column per feature)
+	"""
+	def getUnknownMask(self, feature = None):
+		missing = self.maskUnknownValues()
+		if feature is None:
+			return np.unpackbits(missing, axis=1, count=len(self._features_vals)).view(bool)
+		return ((missing[:, feature//8] >> (7 - feature%8)) & 1).view(bool)
+
+	"""
+	Removes the rows with unknown values, masking the samples that have any bit set in the bitmap of the unknown values
+	"""
+	def deleteUnknownSamples(self):
+		LOGGER.debug("Before removing %d",np.count_nonzero(self._kept))
+		# remove rows with unknown values
+		self._kept &= ~self.maskUnknownValues().any(axis=1)
+		LOGGER.debug("After removing: %d",np.count_nonzero(self._kept))
+
+	"""
+	Resets the filters applied, keeping all the samples again, so other filters can be tried
 	"""
-	def __init__(self, data):
-		self._data = data
+	def resetFilters(self):
+		self._kept[:] = True
 
 	"""
-	Removes the rows with unknown values
+	Returns the samples of the original data that have not been filtered
 
-	@param  unk		the character to use when there's an unknown value
+	@return 	boolean array, true for the samples kept
 	"""
-	def deleteUnknownSamples(self, unk='?'):
-		LOGGER.debug("Before removing %d",len(self._data))
-		# remove rows with unk char
-		self._data = list(filter(lambda s: unk not in s, self._data))
-		LOGGER.debug("After removing: %d",len(self._data))
+	def getKeptSamples(self):
+		return self._kept
 
 	"""
-	Returns the data (filtered or not)
+	Returns the data (filtered or not). The values that no longer appear in the data are removed from the features values, so the codes are renumbered. If no sample is filtered, the columns are returned as they are (so memory-mapped columns stay mapped)
 
-	@return 	data
+	@return 	columns of codes, and the values of each feature
 	"""
 	def getData(self):
-		return self._data
+		if self._kept.all():
+			return self._columns, self._features_vals
+		columns, features_vals = [], []
+		for feature, values in enumerate(self._features_vals):
+			codes = np.asarray(self._columns[feature])[self._kept]
+			used = np.zeros(len(values), dtype=bool)
+			used[codes] = True
+			columns.append((np.cumsum(used) - 1).astype(codes.dtype)[codes])
+			features_vals.append([value for value, isUsed in zip(values, used) if isUsed])
+		return columns, features_vals
@@ -1,22 +1,41 @@
 # libraries
 import numpy as np
+import os
+
+"""
+Finds the memory-mapped file an array is (a view of)
+
+@param 	array 	array to find the file of
+@return memory-mapped array of the file, or None if the array isn't memory-mapped from a file
+"""
+def mappedArrayOf(array):
+	mapped = array
+	while mapped is not None and not isinstance(mapped, np.memmap):
+		mapped = getattr(mapped, "base", None)
+	return mapped if mapped is not None and mapped.filename is not None else None
 
 """
 Contains a set of samples that will be used to run a decision tree algorithm
 to generate a classifying tree in order to classify them. The samples are represented as a matrix where each row is a sample and each column of a row sets the feature values for the sample
+
+The samples are stored by columns: each feature is a contiguous array with the smallest type able to store its values, so reading all the values of a feature reads just the memory they take. The columns can be memory-mapped files (np.memmap), so the dataset doesn't need to fit in memory: the operations that go through all the samples read them in blocks
+
+A dataset can be also a subset of the samples of some columns shared with other datasets: then it just keeps the indexes of its samples (rows of the columns), so splitting a dataset doesn't copy its data
 """
 class GenericDataset(object):
 	"""
-	@attr   _data		   sample data, as a matrix of rows that represent samples and cols that set its properties
+	@attr   _columns	   sample data, as an array per feature (column of the matrix) with the value of each sample
 	@attr   _n_samples	  number of samples in the data set (rows of the data)
 	@attr   _n_features	 number of features for each sample (columns of the data)
 	@attr   _features_vals  list containing for each feature, the possible values in it
 	@attr 	_continuous 	list containing per each column a true value if is a continuous feature values or not
+	@attr 	_rows 			indexes of the samples of the dataset in the columns, if the dataset is a subset of the columns (None if all the samples of the columns are the samples of the dataset)
+	@attr 	_masked 		code of the masked value of each feature (as the unknown values), left out of the counts when growing trees (None if no value is masked)
 	"""
-	__slots__ = ["_data","_n_samples","_n_features","_features_vals","_continuous"]
+	__slots__ = ["_columns","_n_samples","_n_features","_features_vals","_continuous","_rows","_masked"]
 
 	"""
-	Initializes a new data set with the data given, setting the number of items and features manually, or either being automatic (then len of data are rows and len of data[0] will be cols)
+	Initializes a new data set with the data given, setting the number of items and features manually, or either being automatic (then len of data are rows and len of data[0] will be cols). The data can be also given already by columns
 
 	@param  data			the data of the datset
 	@param  features_vals   values suitable for each feature, specified as a list:
@@ -24,40 +43,134 @@ class GenericDataset(object):
 	@param 	continuous 	list specifying the continuous attributes
 	@param  samples		 number of samples in the dataset (default is calculated automatically)
 	@param  features		number of features per sample (default is calculated automatically using first sample in the data)
-	"""
-	def __init__(self, data, features_vals = None, continuous = None, samples = None, features = None):
-		self._data = data
+	@param 	columns 		the data of the dataset as an array per feature, instead of the data matrix
+	@param 	rows 			indexes of the samples of the columns that are the samples of the dataset (default is all of them)
+	@param 	masked 			code of the masked value of each feature, None for the features without masked values (default is no value masked)
+	"""
+	def __init__(self, data, features_vals = None, continuous = None, samples = None, features = None, columns = None, rows = None, masked = None):
+		if columns is None:
+			data = np.asarray(data)
+			columns = [data[:, feature] for feature in range(data.shape[1] if data.ndim == 2 else 0)]
+		self._columns = [self._compact(column) for column in columns]
+		self._rows = None if rows is None else np.asarray(rows)
+		self._masked = masked
 		self._continuous = continuous
 		self._features_vals = features_vals
 		self._n_samples = samples
 		self._n_features = features
 		# Automatic calculations
 		if samples == None:
-			self._n_samples = len(data)
+			self._n_samples = len(self._rows) if self._rows is not None else len(self._columns[0]) if len(self._columns) else 0
 		if features == None:
-			self._n_features = len(data[0]) if len(data) else 0
+			self._n_features = len(self._columns)
 		if features_vals == None:
 			self._guessFeaturesValues()
 		if continuous is None:
 			self._continuous = np.zeros(self._n_features,dtype=bool)
 
 	"""
-	Loops through all samples to learn all the possible values that each feature can have. This calculation is only necessary if no features values have been specified
+	Stores a column of the data as a contiguous array with the smallest integer type able to store its values (columns not made of integers are just made contiguous)
+
+	@param 	column 	values of a feature
+	@return contiguous array with the values
+	"""
+	def _compact(self, column):
+		column = np.asarray(column)
+		if column.dtype.kind in "iub" and len(column):
+			dtype = np.result_type(np.min_scalar_type(column.min()), np.min_scalar_type(column.max()))
+			if dtype != column.dtype or not column.flags.c_contiguous:
+				return np.ascontiguousarray(column, dtype=dtype)
+		return np.ascontiguousarray(column)
+
+	"""
+	Finds all the possible values that each feature can have, as the sorted distinct values of each column. This calculation is only necessary if no features values have been specified
 
 	After the calculus, the list of features and its possible values, _features_vals is saved
 	"""
 	def _guessFeaturesValues(self):
 		# Recognize features and its values
-		self._features_vals = [sorted(list(set([sample[feature] for sample in self._data])))
-			for feature in range(self._n_features)]
+		self._features_vals = [np.unique(self.getColumn(feature)).tolist() for feature in range(len(self._columns))]
 
 	"""
-	Returns the data of the dataset
+	Returns the data of the dataset. The matrix is built from the columns, so it's a copy
 
 	@return	 data matrix of samples and its features
 	"""
 	def getData(self):
-		return self._data
+		return self.getSamples(slice(None))
+
+	"""
+	Returns the data of some samples of the dataset, as a matrix built from the columns (so it's a copy)
+
+	@param 	samples 	indexes (or slice) of the samples
+	@return data matrix of the samples and their features
+	"""
+	def getSamples(self, samples):
+		if not len(self._columns):
+			return np.zeros((len(np.arange(self._n_samples)[samples]), 0), dtype=np.uint8)
+		rows = self.getRowsOf(samples)
+		return np.column_stack([column[rows] for column in self._columns])
+
+	"""
+	Returns the data of the dataset by columns. If the dataset is a subset of the columns, the columns are the whole columns shared with other datasets, and the samples of the dataset are the rows returned by getRows
+
+	@return 	list with an array per feature with the values of the samples
+	"""
+	def getColumns(self):
+		return self._columns
+
+	"""
+	Returns the folder of the files the columns are memory-mapped from, so other arrays as large as the columns can be memory-mapped from files of the same folder
+
+	@return 	folder of the memory-mapped columns, or None if the columns are in memory
+	"""
+	def getColumnsFolder(self):
+		mapped = mappedArrayOf(self._columns[0]) if len(self._columns) else None
+		return os.path.dirname(mapped.filename) if mapped is not None else None
+
+	"""
+	Returns the indexes of the samples of the dataset in its columns
+
+	@return 	array with the row of each sample, or None if the samples are all the rows of the columns
+	"""
+	def getRows(self):
+		return self._rows
+
+	"""
+	Returns the code of the masked value of each feature (as the unknown values when they're masked)
+
+	@return 	list with the masked code of each feature (None for the features without masked values), or None if no value is masked
+	"""
+	def getMaskedCodes(self):
+		return self._masked
+
+	"""
+	Returns the rows of the columns where some samples of the dataset are
+
+	@param 	samples 	indexes (or slice) of the samples
+	@return rows of the samples in the columns
+	"""
+	def getRowsOf(self, samples):
+		return samples if self._rows is None else self._rows[samples]
+
+	"""
+	Returns the values of a feature for all the samples (a copy if the dataset is a subset of the columns)
+
+	@param 	feature 	the feature to get the values of (the column of the feature)
+	@return array with the value of the feature of each sample
+	"""
+	def getColumn(self, feature):
+		return self._columns[feature] if self._rows is None else self._columns[feature][self._rows]
+
+	"""
+	Returns a sample of the dataset, with the value of each feature
+
+	@param 	sample 	index of the sample
+	@return values of the sample
+	"""
+	def getSample(self, sample):
+		row = self.getRowsOf(sample)
+		return [column[row] for column in self._columns]
 
 	"""
 	Returns the list of possible values for each feature
@@ -110,8 +223,8 @@ class GenericDataset(object):
 		txt =  "%s Specifications\n"%self.__class__.__name__
 		txt += "------------------------------------------------------------\n"
 		txt += "SIZE:	 %d samples, %d features per sample\n"%(self._n_samples,self._n_features)
-		txt += "HEAD:	 %s\n"%(self._data[0])
-		txt += "TAIL:	 %s\n"%(self._data[-1])
+		txt += "HEAD:	 %s\n"%(self.getSample(0))
+		txt += "TAIL:	 %s\n"%(self.getSample(-1))
 		if features_vals:
 			txt += "FEATURES: List of features and possible values\n"
 			i = 1
@@ -1,8 +1,14 @@
 # App modules
 from .constants import *
+from .encoder import DatasetEncoder
 
 # External modules
+from itertools import accumulate, islice
+from multiprocessing import Pool
+import codecs
 import csv
+import io
+import locale
 import logging
 import os
 from abc import ABCMeta, abstractmethod
@@ -15,11 +21,13 @@ Defines an interface to show how datasets readers must act
 """
 class DatasetReader(object):
 	"""
-	@attr 	_trainingData 	matrix of data where rows are samples defined by its features specified in each column that will be used for training purposes
-	@attr 	_validationData 	same as trainingData but for validation
+	@attr 	_data 				matrix of codes where rows are samples defined by its features specified in each column: first the samples that will be used for training purposes and then the ones for validation
+	@attr 	_featuresValues 	values of each feature, sorted, so the position of each value is its code in the data
+	@attr 	_trainingSamples 	number of samples for training
+	@attr 	_validationSamples 	number of samples for validation (None if no validation data has been found)
 	@attr 	_featuresData 		contains information about the features of the dataset
 	"""
-	__slots__= ["_trainingData", "_validationData", "_featuresData"]
+	__slots__= ["_data", "_featuresValues", "_trainingSamples", "_validationSamples", "_featuresData"]
 	__metaclass__ = ABCMeta
 
 	"""
@@ -45,20 +53,44 @@ class DatasetReader(object):
 		pass
 
 	"""
-	Returns the training data loaded (it will be also the validation data if no validation data has been found)
+	Returns all the data loaded, the training samples followed by the validation ones, encoded as codes of the features values
 
-	@return 	training data matrix
+	@return 	data matrix of codes
+	"""
+	def getData(self):
+		return self._data
+
+	"""
+	Returns the values of each feature, sorted, so the position of each value is its code in the data
+
+	@return 	list with the values of each feature
+	"""
+	def getFeaturesValues(self):
+		return self._featuresValues
+
+	"""
+	Returns the number of samples for training, that are the first samples of the data
+
+	@return 	number of training samples
+	"""
+	def getTrainingSampleCount(self):
+		return self._trainingSamples
+
+	"""
+	Returns the training data loaded (it will be also the validation data if no validation data has been found), as a view of the data
+
+	@return 	training data matrix of codes
 	"""
 	def getTrainingData(self):
-		return self._trainingData
+		return self._data[:self._trainingSamples] if self._data is not None else None
 
 	"""
-	Returns the validation data loaded (or None if no validation data has been found)
+	Returns the validation data loaded (or None if no validation data has been found), as a view of the data
 
-	@return 	validation data matrix
+	@return 	validation data matrix of codes
 	"""
 	def getValidationData(self):
-		return self._validationData
+		return self._data[self._trainingSamples:] if self._validationSamples is not None else None
 
 	"""
 	Returns information about the features present in the training and validation data in the following format
@@ -70,37 +102,134 @@ class DatasetReader(object):
 	def getFeaturesData(self):
 		return self._featuresData
 
+"""
+Splits pieces of text of any size into lines, keeping the end of each line (the last line of a piece may continue in the next piece)
+
+@param 	pieces 	iterable with the pieces of text
+@return generator of the lines of the text
+"""
+def _linesOf(pieces):
+	pending = ""
+	for piece in filter(None, pieces):
+		lines = (pending + piece).split("\n")
+		pending = lines.pop()
+		for line in lines:
+			yield line + "\n"
+	if pending:
+		yield pending
+
+"""
+Encodes samples in text format, given as pieces of text of any size, parsing their lines as a single CSV text, so a quoted value may span several lines (and pieces). The samples are encoded in blocks of DATASET_ENCODE_ROWS samples
+
+@param 	pieces 		iterable with the pieces of text
+@param 	encoder 	encoder to encode the samples with
+"""
+def _encodeText(pieces, encoder):
+	rows = csv.reader(_linesOf(pieces), delimiter=DATASET_COLS_SEP,skipinitialspace=True)
+	while True:
+		block = list(islice(rows, DATASET_ENCODE_ROWS))
+		if not block:
+			break
+		encoder.encodeRows([[s.strip(". 	") for s in row] for row in block if len(row)])
+
+"""
+Counts the quote characters of a part of a file in a worker process, to know if the part ends inside a quoted value
+
+@param 	part 	filename and range of bytes of the part (start and end)
+@return number of quote characters in the part
+"""
+def _countQuotes(part):
+	filename, start, end = part
+	quotes = 0
+	with open(filename, "rb") as source:
+		source.seek(start)
+		remaining = end - start
+		while remaining > 0:
+			data = source.read(min(DATASET_READ_CHUNK, remaining))
+			if not data:
+				break
+			remaining -= len(data)
+			quotes += data.count(b'"')
+	return quotes
+
+"""
+Parses a part of a file in a worker process, decoding its bytes as the file would be decoded when opened in text mode, and encodes its samples with a new encoder
+
+@param 	part 	filename and range of bytes of the part (start and end), aligned to samples
+@return encoder with the samples of the part
+"""
+def _encodePart(part):
+	filename, start, end = part
+	encoder = DatasetEncoder()
+	decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(locale.getpreferredencoding(False))(), True)
+	with open(filename, "rb") as source:
+		source.seek(start)
+		def pieces():
+			remaining = end - start
+			while remaining > 0:
+				data = source.read(min(DATASET_READ_CHUNK, remaining))
+				if not data:
+					break
+				remaining -= len(data)
+				yield decoder.decode(data)
+			yield decoder.decode(b"", final=True)
+		_encodeText(pieces(), encoder)
+	return encoder
+
 class FileDatasetReader(DatasetReader):
 	"""
 	@attr 	_folder 	folder where data is stored
+	@attr 	_workers 	number of processes to parse the files with
 	"""
-	__slots__ = ["_folder"]
+	__slots__ = ["_folder","_workers"]
 
 	"""
 	Initializes a dataset reader from a folder source where it will try to locate the training data file and validation file
 
 	@param 	folder 	folder where training data and validation data files should be located
+	@param 	workers number of processes to parse the files with (None or 1 to parse them in this process)
 	"""
-	def __init__(self,folder):
+	def __init__(self,folder,workers=None):
 		self._folder = folder
+		self._workers = workers
 
 	"""
-	Reads the data from the files and stores it into the attributes. If one of either two files does not exist, then will be set to None
+	Reads the data from the files and stores it into the attributes. The training file and the validation file are encoded with the same dictionaries, one after the other, into the same matrix. If one of either two files does not exist, then will be set to None
+
+	If several workers are set, each file is split into parts at sample boundaries and the parts are parsed and encoded by a pool of processes, each with its own dictionaries. The encoded parts are merged in order, remapping their codes, so the data is the same as when parsing the files in this process
 	"""
 	def read(self):
+		if self._workers is not None and self._workers > 1:
+			LOGGER.debug("Starting %d workers to parse the dataset",self._workers)
+			with Pool(self._workers) as pool:
+				self._readFiles(DatasetEncoder(), pool)
+		else:
+			self._readFiles(DatasetEncoder())
+
+	"""
+	Reads the data from the files with the encoder specified and stores it into the attributes
+
+	@param 	encoder 	encoder to encode the samples with
+	@param 	pool 		pool of processes to parse the files with (None to parse them in this process)
+	"""
+	def _readFiles(self, encoder, pool = None):
+		self._data, self._featuresValues = None, None
 		# training file
-		self._trainingData = None
+		self._trainingSamples = None
 		trainingFiles = list(filter(lambda x: x.endswith("." + DATASET_TRAINING_EXT), os.listdir(self._folder)))
 		if len(trainingFiles):
-			self._trainingData = self._readFile(os.path.join(self._folder,trainingFiles[0]))
+			self._trainingSamples = self._readFile(os.path.join(self._folder,trainingFiles[0]), encoder, pool)
 		else:
 			LOGGER.error("No training data file found in folder %s",
 			self._folder)
 		# validation file
-		self._validationData = None
+		self._validationSamples = None
 		validationFiles = list(filter(lambda x: x.endswith("." + DATASET_VALIDATION_EXT), os.listdir(self._folder)))
-		if len(validationFiles):
-			self._validationData = self._readFile(os.path.join(self._folder,validationFiles[0]))
+		if len(validationFiles) and self._trainingSamples is not None:
+			self._validationSamples = self._readFile(os.path.join(self._folder,validationFiles[0]), encoder, pool)
+		if self._trainingSamples is not None:
+			self._featuresValues = encoder.getFeaturesValues()
+			self._data = encoder.getData()
 		# features file
 		self._featuresData = None
 		featuresFiles = list(filter(lambda x: x.endswith("." + DATASET_FEATURES_EXT), os.listdir(self._folder)))
@@ -108,19 +237,54 @@ class FileDatasetReader(DatasetReader):
 			self._featuresData = [line.rstrip('\n') for line in open(os.path.join(self._folder,featuresFiles[0]),"r")]
 
 	"""
-	Reads the data from the file and returns it as a matrix of data
+	Reads the data from the file in chunks and encodes each chunk as it's read, so the text of the whole file is never in memory. If a pool of processes is specified, the parts of the file are parsed by the pool and merged into the encoder as they are parsed, in order
 
 	Throws IOError if fails
 
-	@param 		filename filename to read
-	@return 	data loaded or None if does not exist
+	@param 		filename 	filename to read
+	@param 		encoder 	encoder to encode the samples with
+	@param 		pool 		pool of processes to parse the file with (None to parse it in this process)
+	@return 	number of samples read
 	"""
-	def _readFile(self, filename):
+	def _readFile(self, filename, encoder, pool = None):
 		LOGGER.debug("Starting to read %s",filename)
-		data = list(csv.reader(open(filename, 'r'), delimiter=DATASET_COLS_SEP,skipinitialspace=True))
-		data = [[s.strip(". 	") for s in row] for row in data]
+		samples = encoder.getSampleCount()
+		if pool is None:
+			with open(filename, 'r') as source:
+				_encodeText(iter(lambda: source.read(DATASET_READ_CHUNK), ""), encoder)
+		else:
+			bounds = self._splitFile(filename, pool)
+			LOGGER.debug("Parsing %d parts of %s in parallel",len(bounds)-1,filename)
+			for part in pool.imap(_encodePart, [(filename, start, end) for start, end in zip(bounds[:-1], bounds[1:])]):
+				encoder.merge(part)
 		LOGGER.debug("Finished reading %s", filename)
-		return data
+		return encoder.getSampleCount() - samples
+
+	"""
+	Splits a file into parts to be parsed by the workers: a part per worker, or more parts if needed so that no part is much larger than DATASET_PARSE_PART bytes. Each part ends at the end of a line, so no line is split between parts. A quoted value may span several lines, so the quotes of each part are counted by the pool and the parts ending inside a quoted value (after an odd number of quotes since the start of the file) are joined with the next part. Quotes are counted as CSV escapes them (doubling them inside quoted values), so a quote inside an unquoted value isn't supported
+
+	@param 		filename 	filename to split
+	@param 		pool 		pool of processes to count the quotes of the parts with
+	@return 	byte offsets where the parts start, followed by the size of the file
+	"""
+	def _splitFile(self, filename, pool):
+		size = os.path.getsize(filename)
+		parts = max(self._workers, -(-size // DATASET_PARSE_PART))
+		bounds = [0]
+		with open(filename, "rb") as source:
+			for part in range(1, parts):
+				offset = max(size * part // parts, bounds[-1])
+				if offset >= size:
+					break
+				# move to the start of the next line
+				source.seek(offset)
+				source.readline()
+				if source.tell() > bounds[-1] and source.tell() < size:
+					bounds.append(source.tell())
+		bounds.append(size)
+		# parts can't start inside a quoted value
+		quotes = accumulate(pool.map(_countQuotes, [(filename, start, end) for start, end in zip(bounds[:-1], bounds[1:])]))
+		return [bounds[0]] + [bound for bound, quoted in zip(bounds[1:-1], quotes) if quoted % 2 == 0] + [size]
 
 	"""
 	Parses the features data to format it before returning it
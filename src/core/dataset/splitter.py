@@ -3,7 +3,6 @@ from .trainingset import *
 from .validationset import *
 
 # libraries
-import random
 import numpy as np
 import logging
 
@@ -12,51 +11,172 @@ LOGGER = logging.getLogger(__name__)
 """
 Given a dataset, generates a training set and a validation set according to
 the splitting method specified
+
+The dataset is converted to numbers once, the first time it's split, and every training set and validation set generated is a subset of the same numeric columns: a split just generates the indexes of the samples of each set, so splitting again doesn't convert nor copy any data. The numeric columns can be stored into a folder as memory-mapped files, to train out of core. The samples are picked with the random generator of the splitter, so the splits are reproducible given its seed
 """
 class DatasetSplitter(object):
 	"""
 	@attr   _dataset	original dataset
+	@attr 	_numeric 	numeric dataset with the columns shared by the sets generated (once converted)
+	@attr 	_random 	random generator to pick the samples with
+	@attr 	_folder 	folder to store the numeric columns into as memory-mapped files (None to keep them in memory)
 	"""
-	__slots__ = ["_dataset"]
+	__slots__ = ["_dataset","_numeric","_random","_folder"]
 
 	"""
 	Initializes a new dataset splitter with the dataset to split specified as
 	a parameter
+
+	@param 	dataset 	dataset to split
+	@param 	seed 		seed of the random generator to pick the samples with (None for a random seed)
+	@param 	folder 		folder to store the numeric columns into as memory-mapped files (default is keeping them in memory)
 	"""
-	def __init__(self, dataset):
+	def __init__(self, dataset, seed = None, folder = None):
 		self._dataset = dataset
+		self._numeric = None
+		self._random = np.random.default_rng(seed)
+		self._folder = folder
+
+	"""
+	Returns the numeric dataset whose columns are shared by the sets generated, converting the dataset the first time
+
+	@return numeric dataset
+	"""
+	def getNumericDataset(self):
+		if self._numeric is None:
+			self._numeric = self._dataset.getNumericDataset(folder = self._folder)
+		return self._numeric
+
+	"""
+	Creates a set of the type specified with some samples of the numeric dataset, sharing its columns
+
+	@param 	rows 		indexes of the samples of the set
+	@param 	setType 	type of the set to create
+	@param 	weights 	weight of each sample, for training sets (default is every sample counting once)
+	@return set created
+	"""
+	def _createSet(self, rows, setType, weights = None):
+		numeric = self.getNumericDataset()
+		subset = {"columns": numeric.getColumns(), "rows": rows, "masked": numeric.getMaskedCodes()}
+		if weights is not None:
+			subset["weights"] = weights
+		return setType(None, numeric.getFeaturesValues(), numeric.getContinuousFeatures(), len(rows), numeric.getFeaturesCount(), **subset)
+
+	"""
+	Picks randomly the samples of the training set of a holdout split. If a target is specified, the split is stratified: each class of the target gets the same percentage of its samples into the training set, so both sets keep the class distribution of the dataset
+
+	@param  percent	 percent of random samples to pick from the dataset to set as the training set
+	@param 	target 	 feature whose classes are stratified (None to pick samples regardless of their class)
+	@return boolean array, true for the samples picked for the training set
+	"""
+	def holdoutMask(self, percent, target = None):
+		rows = self._dataset.getSampleCount()
+		order = self._random.permutation(rows)
+		picked = np.zeros(rows, dtype=bool)
+		if target is None:
+			picked[order[:int(rows*percent)]] = True
+			return picked
+		# group the shuffled samples by class (stable, so each group stays shuffled)
+		classes = self.getNumericDataset().getColumn(target)[order]
+		order = order[np.argsort(classes, kind="stable")]
+		counts = np.bincount(classes, minlength=len(self._dataset.getFeatureValues(target)))
+		starts = np.cumsum(counts) - counts
+		# the first samples of each group are picked
+		positions = np.arange(rows) - np.repeat(starts, counts)
+		picked[order[positions < np.repeat((counts*percent).astype(np.int64), counts)]] = True
+		return picked
 
 	"""
 	Generates a training set and a validation set using the holdout method, this
 	means, specifying a percent of the dataset, we will generate a random
 	training set that contains that percentage of the dataset and the rest will
-	be the validation set
+	be the validation set. Both sets are subsets of the same numeric columns, so no data is copied
 
 	@param  percent	 percent of random samples to pick from the dataset to
 						set as the training set
+	@param 	target 	 feature to stratify the split by (None for no stratification)
 	@return trainingSet and validationSet objects generated
 	"""
-	def holdout(self, percent):
-		# shuffle dataset data
-		numericDataset = self._dataset.getNumericDataset()
-		data = numericDataset.getData()
-		np.random.shuffle(data)
-		# calculate slicing
-		rows = self._dataset.getSampleCount()
-		tr = int(rows*percent)
-		# slice!
-		feature_values = self._dataset.getFeaturesNumValues()
-		LOGGER.debug("First sample of training set is: %s",data[0])
-		trainingSet = TrainingSet(data[:tr],feature_values)
-		if tr == len(data):
+	def holdout(self, percent, target = None):
+		picked = self.holdoutMask(percent, target)
+		trainingSet = self._createSet(np.flatnonzero(picked), TrainingSet)
+		if picked.all():
 			LOGGER.warning("No validation set, as specified 100% as training data")
+		validationSet = self._createSet(np.flatnonzero(~picked), ValidationSet)
+		LOGGER.debug("Holdout split%s: %d training samples, %d validation samples"," (stratified)" if target is not None else "",trainingSet.getSampleCount(),validationSet.getSampleCount())
+		return trainingSet, validationSet
+
+	"""
+	Assigns randomly each sample to one of the k folds (groups) of a cross-validation, so the folds have the same number of samples (give or take one). If a target is specified, the folds are stratified: the samples are dealt to the folds class by class, so each fold keeps the class distribution of the dataset
+
+	@param 	k 		number of folds
+	@param 	target 	feature whose classes are stratified (None to assign samples regardless of their class)
+	@return array with the fold of each sample
+	"""
+	def crossValidationFolds(self, k, target = None):
+		rows = self._dataset.getSampleCount()
+		order = self._random.permutation(rows)
+		if target is not None:
+			# group the shuffled samples by class (stable, so each group stays shuffled)
+			order = order[np.argsort(self.getNumericDataset().getColumn(target)[order], kind="stable")]
+		folds = np.empty(rows, dtype=np.min_scalar_type(max(k-1, 0)))
+		folds[order] = np.arange(rows) % k
+		return folds
+
+	"""
+	Generates the training sets and validation sets of a k-fold cross-validation: the samples are split into k folds and each fold is the validation set of the training set made of the other folds. All the sets are subsets of the same numeric columns, so no data is copied
+
+	@param 	k 		number of folds
+	@param 	target 	feature to stratify the folds by (None for no stratification)
+	@return list with the training set and validation set of each fold
+	"""
+	def crossValidation(self, k, target = None):
+		assert k >= 2 and k <= self._dataset.getSampleCount(), """cannot split the dataset into %d folds: there must be 2 <= k <= %d folds"""%(k, self._dataset.getSampleCount())
+		folds = self.crossValidationFolds(k, target)
+		LOGGER.debug("Cross-validation split%s into %d folds"," (stratified)" if target is not None else "",k)
+		return [(self._createSet(np.flatnonzero(folds != fold), TrainingSet),
+			self._createSet(np.flatnonzero(folds == fold), ValidationSet)) for fold in range(k)]
+
+	"""
+	Draws a bootstrap resample of the dataset: as many samples as the dataset has, picked randomly with replacement. If a target is specified, the resample is stratified: the samples of each class are drawn among the samples of the class, so the resample keeps the class distribution of the dataset
+
+	@param 	target 	feature whose classes are stratified (None to draw samples regardless of their class)
+	@return number of times each sample is drawn
+	"""
+	def bootstrapWeights(self, target = None):
+		rows = self._dataset.getSampleCount()
+		if target is None:
+			drawn = self._random.integers(0, rows, rows)
 		else:
-			LOGGER.debug("First element of validation set is: %s",data[tr])
-		validationSet = ValidationSet(data[tr:],feature_values)
-		# return
+			# draw each sample among the samples of its class
+			classes = self.getNumericDataset().getColumn(target)
+			order = np.argsort(classes, kind="stable")
+			counts = np.bincount(classes, minlength=len(self._dataset.getFeatureValues(target)))
+			starts = np.cumsum(counts) - counts
+			drawn = order[np.repeat(starts, counts) + (self._random.random(rows) * np.repeat(counts, counts)).astype(np.int64)]
+		return np.bincount(drawn, minlength=rows)
+
+	"""
+	Generates a training set and a validation set using bootstrapping: the training set is a bootstrap resample of the dataset and the validation set are the samples not drawn (out of bag). The resample isn't materialized, the training set has the samples drawn weighted by the times they're drawn, so no sample is copied
+
+	@param 	target 	feature to stratify the resample by (None for no stratification)
+	@return trainingSet and validationSet objects generated
+	"""
+	def bootstrap(self, target = None):
+		weights = self.bootstrapWeights(target)
+		drawn = np.flatnonzero(weights)
+		trainingSet = self._createSet(drawn, TrainingSet, weights[drawn].astype(np.min_scalar_type(weights.max())))
+		validationSet = self._createSet(np.flatnonzero(weights == 0), ValidationSet)
+		LOGGER.debug("Bootstrap split%s: %d distinct training samples, %d out of bag samples"," (stratified)" if target is not None else "",trainingSet.getSampleCount(),validationSet.getSampleCount())
 		return trainingSet, validationSet
 
 	"""
+	Generates the sets of a leave-one-out: each sample is validated with the tree grown from the rest of samples. Growing a tree per sample is avoided by growing a single tree from all the samples and regrowing only the parts that change without each sample (see TreeGrowingAlgorithm.leaveOneOut), so the training set and the validation set are the same: all the samples of the dataset
+
+	@return trainingSet and validationSet objects generated, both with all the samples
 	"""
-	def crossValidation(self, k):
-		pass
+	def leaveOneOut(self):
+		samples = self._dataset.getSampleCount()
+		assert samples >= 2, "cannot leave one sample out: there must be at least 2 samples"
+		LOGGER.debug("Leave-one-out split: %d samples",samples)
+		return self._createSet(np.arange(samples), TrainingSet), self._createSet(np.arange(samples), ValidationSet)
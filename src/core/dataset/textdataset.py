@@ -3,6 +3,7 @@ from .validationset import *
 from .constants import *
 import logging
 import numpy as np
+import os
 
 LOGGER = logging.getLogger(__name__)
 
@@ -18,15 +19,34 @@ class TextDataset(GenericDataset):
 	__slots__ = ["_features_map_txt","_features_map_num","_features_mean","_features_mean_np"]
 
 	"""
-	Initializes a dataset given the matrix of samples where rows are the samples and columns are the feature values for each sample
+	Initializes a dataset given the matrix of samples where rows are the samples and columns are the feature values for each sample. The samples can be either in text format or already encoded as codes of the values of each feature, if the values are specified. Encoded samples can be also given already by columns
 
-	@param 	data 	data as matrix containing samples in text format
+	@param 	data 			data as matrix containing samples in text format, or their codes
+	@param 	features_vals 	values of each feature, sorted, if the data is encoded: the code of each value is its position
+	@param 	columns 		codes of the samples as an array per feature, instead of the data matrix
+	@param 	masked 			code of the masked value of each feature, None for the features without masked values (default is no value masked)
 	"""
-	def __init__(self,data):
-		super().__init__(data)
+	def __init__(self, data, features_vals = None, columns = None, masked = None):
+		if features_vals is None:
+			columns, features_vals = self.__encode(data)
+		super().__init__(data, features_vals, columns = columns, masked = masked)
 		self._features_mean = None
 		self.__createNumericMappers()
 
+	"""
+	Encodes samples in text format into the codes of their values. The values of each column are found and the samples are encoded at once, sorting the column
+
+	@param 	data 	data as matrix containing samples in text format
+	@return codes of each column, and the values of each feature, sorted, so the code of each value is its position
+	"""
+	def __encode(self, data):
+		text = np.asarray(data, dtype=str)
+		features_vals, columns = [], []
+		for feature in range(text.shape[1] if text.ndim == 2 else 0):
+			values, column = np.unique(text[:, feature], return_inverse=True)
+			features_vals.append(values.tolist())
+			columns.append(column)
+		return columns, features_vals
 
 	"""
 	Generates a numerical mapper from each feature text value into a numerical value and vice versa to enable numerical dataset extraction
@@ -56,20 +76,67 @@ class TextDataset(GenericDataset):
 		self.__createNumericMappers()
 
 	"""
-	Returns a numerical, NumPy dataset object (the same object, but with numpy data) where each text feature is mapped to a number. If some data is specified rather than the data in the own dataset, those data will be used
+	Returns a numerical, NumPy dataset object (the same object, but with numpy data) where each text feature is mapped to a number. If some samples are specified rather than all the samples of the own dataset, just those samples will be used
 
+	The data is converted column by column: codes of non continuous features are already their numbers and the numbers of continuous features are looked up in the numeric values of the feature. Each column gets the smallest type able to store the numbers of its feature. If a folder is specified, each column is written block by block into a .npy file of the folder and the dataset is backed by the memory-mapped files, so it doesn't need to fit in memory
+
+	@param 	samples 	indexes (or slice) of the samples of this dataset to convert (default is all the samples)
+	@param 	datasetType type of the dataset object to create
+	@param 	folder 		folder to store the columns into as memory-mapped files (default is keeping them in memory)
 	@return 	generic dataset with the same data and attributes but with the data mapped to numbers
 	"""
-	def getNumericDataset(self, data=None, datasetType = GenericDataset):
-		if data == None:
-			data = self._data
-		samples = len(data)
-		num_data = np.array([
-			np.array([
-			int(data[sample][feature]) if self._continuous[feature] else self._features_map_txt[feature][data[sample][feature]]
-				for feature in range(self._n_features)],dtype=np.uint16)
-					for sample in range(samples)])
-		return datasetType(num_data, self.getFeaturesNumValues(), self._continuous)
+	def getNumericDataset(self, samples=None, datasetType = GenericDataset, folder = None):
+		codes = self._columns if samples is None else [column[samples] for column in self._columns]
+		count = len(codes[0]) if len(codes) else 0
+		features_vals = self.getFeaturesNumValues()
+		columns = []
+		for feature, dtype in enumerate(self.getFeaturesNumTypes()):
+			numbers = np.asarray(features_vals[feature], dtype=dtype) if self._continuous[feature] else None
+			if folder is None:
+				columns.append(self.__toNumbers(codes[feature], numbers, dtype))
+				continue
+			path = os.path.join(folder, "column%02d.npy"%feature)
+			column = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(count,))
+			for first in range(0, count, DATASET_BLOCK_SAMPLES):
+				block = slice(first, first+DATASET_BLOCK_SAMPLES)
+				column[block] = self.__toNumbers(codes[feature][block], numbers, dtype)
+			column.flush()
+			del column
+			columns.append(np.load(path, mmap_mode="r"))
+		return datasetType(None, features_vals, self._continuous, count, self._n_features, columns = columns, masked = self._masked)
+
+	"""
+	Converts the codes of a feature into the numbers of its values
+
+	@param 	codes 		codes of the values of the feature
+	@param 	numbers 	number of each value of the feature, if continuous (None if the codes are the numbers)
+	@param 	dtype 		type of the numbers
+	@return array with the numbers
+	"""
+	def __toNumbers(self, codes, numbers, dtype):
+		return numbers[codes] if numbers is not None else np.asarray(codes, dtype=dtype)
+
+	"""
+	Returns the smallest numpy type able to store the numbers of each feature when using numerical converted dataset
+
+	@return 	list with the type of each feature
+	"""
+	def getFeaturesNumTypes(self):
+		types = []
+		for values in self.getFeaturesNumValues():
+			low, high = (min(values), max(values)) if len(values) else (0, 0)
+			types.append(np.result_type(np.min_scalar_type(low), np.min_scalar_type(high)))
+		return types
+
+	"""
+	Returns a sample of the dataset, with the text value of each feature
+
+	@param 	sample 	index of the sample
+	@return text values of the sample
+	"""
+	def getSample(self, sample):
+		row = self.getRowsOf(sample)
+		return [self._features_vals[feature][column[row]] for feature, column in enumerate(self._columns)]
 
 	"""
 	Returns the list of possible values for each feature when using numerical converted dataset
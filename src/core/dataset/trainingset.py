@@ -1,5 +1,94 @@
 import numpy as np
+import os
+import tempfile
+import weakref
 from .genericdataset import *
+from .constants import *
 
+"""
+Training set: the samples to grow a tree from. Each sample can have a weight, so it counts as many times as its weight (as the samples of a bootstrap resample, that are drawn several times) without copying it
+"""
 class TrainingSet(GenericDataset):
-	pass
+	"""
+	@attr 	_weights 	weight of each sample (None if every sample counts once)
+	"""
+	__slots__ = ["_weights"]
+
+	"""
+	Initializes a new training set as a generic dataset (see GenericDataset), with a weight per sample if specified
+
+	@param 	weights 	weight of each sample of the training set, in the order of its samples (default is every sample counting once)
+	"""
+	def __init__(self, data, features_vals = None, continuous = None, samples = None, features = None, columns = None, rows = None, weights = None, masked = None):
+		super().__init__(data, features_vals, continuous, samples, features, columns, rows, masked)
+		self._weights = None if weights is None else np.asarray(weights)
+		assert self._weights is None or len(self._weights) == self._n_samples, "cannot weight the training set: there must be a weight per sample"
+
+	"""
+	Returns the weight of each sample of the training set
+
+	@return weight of each sample, or None if every sample counts once
+	"""
+	def getWeights(self):
+		return self._weights
+
+	"""
+	Bins each continuous feature into at most the number of bins specified, so that each bin holds approximately the same number of samples (quantile bins). The bin of each sample is stored as a uint8 code, thus there can't be more than 255 bins. The edges between bins are placed in the middle of two consecutive values of the feature, so they can be used as thresholds: a sample is in a bin lower or equal than b if and only if its value is lower than the edge b. If a feature has no more distinct values than bins, every distinct value gets its own bin
+
+	The matrix is allocated besides the columns, which are still needed to partition the samples and to classify them, so binning adds a byte per sample and continuous feature to the memory used. If the columns are memory-mapped files, the matrix is memory-mapped from a new file of their folder instead, which is removed once the matrix is released
+
+	The samples of each value are counted going through the column in blocks, so the quantiles are found from the counts without sorting the column, and the samples are binned in blocks too
+
+	Weighted samples count as many times as their weight, so the bins are the ones of the samples repeated
+
+	If the dataset is a subset of its columns, the bins are found for the samples of the dataset, and the matrix has a row per row of the columns (only the rows of the samples of the dataset are binned), so it's indexed as the columns
+
+	@param 	bins 	maximum number of bins per continuous feature
+	@return uint8 matrix with the bin of each sample (rows) for each continuous feature (columns, in the same order as the features), and a list with the edges of each continuous feature
+	"""
+	def getBinnedFeatures(self, bins):
+		assert bins >= 2 and bins <= DATASET_MAX_BINS, """cannot bin the continuous features: bins must be %d <= bins <= %d"""%(2, DATASET_MAX_BINS)
+		features = np.flatnonzero(self._continuous)
+		binned = self._binnedMatrix((len(self._columns[0]) if len(self._columns) else 0, len(features)))
+		blocks = [self.getRowsOf(slice(first, first+DATASET_BLOCK_SAMPLES)) for first in range(0, self._n_samples, DATASET_BLOCK_SAMPLES)]
+		weights = [None if self._weights is None else self._weights[first:first+DATASET_BLOCK_SAMPLES] for first in range(0, self._n_samples, DATASET_BLOCK_SAMPLES)]
+		samples = self._n_samples if self._weights is None else int(self._weights.sum())
+		edges = []
+		for column, feature in enumerate(features):
+			data = self._columns[feature]
+			# samples of each value of the feature
+			values = np.unique(np.asarray(self._features_vals[feature]))
+			counts = np.zeros(len(values), dtype=np.int64)
+			for block, blockWeights in zip(blocks, weights):
+				counts += np.bincount(np.searchsorted(values, data[block]), blockWeights, minlength=len(values)).astype(np.int64)
+			values, counts = values[counts > 0], counts[counts > 0]
+			if len(values) <= bins:
+				cuts = np.arange(1, len(values))
+			else:
+				# value of the higher sample of each quantile, as sorted
+				ranks = np.ceil((samples-1) * np.linspace(0, 1, bins+1)[1:-1]).astype(np.intp)
+				quantiles = values[np.searchsorted(np.cumsum(counts), ranks, side="right")]
+				cuts = np.searchsorted(values, np.unique(quantiles))
+				cuts = cuts[cuts > 0]
+			edges.append((values[cuts-1] + values[cuts])/2.)
+			for block in blocks:
+				binned[block, column] = np.searchsorted(edges[-1], data[block], side="right")
+		if isinstance(binned, np.memmap):
+			binned.flush()
+		return binned, edges
+
+	"""
+	Allocates the uint8 matrix of the binned features, stored by columns: in memory, or memory-mapped from a new file of the folder of the columns if they're memory-mapped (the file is removed once the matrix is released)
+
+	@param 	shape 	number of rows and columns of the matrix
+	@return matrix allocated
+	"""
+	def _binnedMatrix(self, shape):
+		folder = self.getColumnsFolder()
+		if folder is None or not shape[0] * shape[1]:
+			return np.empty(shape, dtype=np.uint8, order="F")
+		handle, path = tempfile.mkstemp(prefix="binned-", suffix=".npy", dir=folder)
+		os.close(handle)
+		binned = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=shape, fortran_order=True)
+		weakref.finalize(binned, os.remove, path)
+		return binned
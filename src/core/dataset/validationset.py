@@ -1,6 +1,7 @@
+from core.measure.confusionmatrix import ConfusionMatrix
 import numpy as np
-#from core.measure.confusionmatrix import ConfusionMatrix
 from .genericdataset import *
+from .constants import *
 
 class ValidationSet(GenericDataset):
 	"""
@@ -14,37 +15,41 @@ class ValidationSet(GenericDataset):
 	#	super().__init__(dataset)
 	#	self._target = target
 
+	"""
+	Classifies all the samples of the validation set with the tree specified. By default, the samples of each block of samples are classified at once. If compiled is set, they are classified one by one with the prediction function compiled from the tree, as when classifying samples as they come
+
+	@param 	tree 		decision tree to classify with
+	@param 	compiled 	true to classify the samples one by one with the compiled tree
+	@return target class of each sample, numbered as the target feature values
+	"""
+	def predict(self, tree, compiled = False):
+		predictions = np.empty(self._n_samples, dtype=np.int64)
+		for first in range(0, self._n_samples, DATASET_BLOCK_SAMPLES):
+			block = slice(first, first+DATASET_BLOCK_SAMPLES)
+			data = self.getSamples(block)
+			if compiled:
+				predictions[block] = np.fromiter(map(tree.predictOne, data), dtype=np.int64, count=len(data))
+			else:
+				predictions[block] = tree.predict(data)
+		return predictions
+
 	"""
 	Checks the tree quality by using a part of the DataSet as Validation Set and
 	calculating the hits and misses on it
 	"""
 	def validateTree(self, tree, target):
-		#confusionMatrix = ConfusionMatrix(self._features_vals[target])
-		if not len(self._data):
+		if not self._n_samples:
 			return None
-		hits = 0.
-		for sample in self._data:
-			hits += self._classifySample(tree, sample, target)
-			#confusionMatrix.addResult(result, sample[target])
-		return hits/self._n_samples
+		predictions = self.predict(tree)
+		return np.count_nonzero(predictions == self.getColumn(target))/self._n_samples
 
-	def _classifySample(self, tree, sample, target):
-		node = tree
-		while not node.is_leaf:
-			featureValues = [e.name for e in node.children]
-			# has children -> evaluate next node with next feature
-			featureValue = sample[node.name]
-			if not featureValue in featureValues:
-				# not in possible values
-				# suppose that is the most common feature in that level
-				samples = [n.samples for n in node.children]
-				samplesMaxIndex = samples.index(max(samples))
-				next_node = node.children[samplesMaxIndex]
-			else:
-				next_node = node.children[featureValues.index(featureValue)]
-			node = next_node.children[0]
-		# is leaf -> evaluate target
-		values = self._features_vals[target]
-		if values.index(node.name) == sample[target]:
-			return True
-		return False
+	"""
+	Builds the confusion matrix of the tree, counting the samples classified to each target class by the tree for each real class of the samples at once
+
+	@param 	tree 		decision tree (or forest) to classify with
+	@param 	target 		target feature the tree classifies
+	@param 	predictions class each sample is classified to, if already classified (default is classifying them with the tree)
+	@return confusion matrix of the tree on the validation set
+	"""
+	def getConfusionMatrix(self, tree, target, predictions = None):
+		return ConfusionMatrix(self._features_vals[target], None, self.predict(tree) if predictions is None else predictions, self.getColumn(target))
@@ -1,10 +1,18 @@
-import math
+import numpy as np
 
-def H(self,amounts):
-	acc=0
-	total_classes = sum(amounts)
-	for el in amounts:
-		if el != 0:
-			prob = el/total_classes
-			acc += prob * math.log(prob,2)
+"""
+Calculates the entropy of the given class counts. The counts are taken along the last axis, so a matrix of counts returns the entropy of each row, which lets us score lots of partitions at once
+
+@param 	amounts 	counts of elements belonging to each class (last axis)
+@return entropy of the amounts (one per row if a matrix is specified)
+"""
+def H(amounts):
+	amounts = np.asarray(amounts)
+	total = amounts.sum(axis=-1)
+	acc = np.zeros(amounts.shape[:-1])
+	with np.errstate(divide="ignore", invalid="ignore"):
+		for value in range(amounts.shape[-1]):
+			el = amounts[...,value]
+			prob = el/total
+			acc += np.where(el != 0, prob * np.log2(prob), 0.)
 	return -acc
@@ -0,0 +1,182 @@
+# libraries
+from time import perf_counter
+import json
+import logging
+
+# constants
+LOGGER = logging.getLogger(__name__)
+
+"""
+Phase timed by some timers, used as a context manager: the time from entering to exiting it is added to the phase, nested into the phases being timed when it's entered
+"""
+class _Phase(object):
+	"""
+	@attr 	_timers 	timers the phase is recorded into
+	@attr 	_name 		name of the phase
+	@attr 	_start 		time when the phase was entered
+	"""
+	__slots__ = ["_timers","_name","_start"]
+
+	def __init__(self, timers, name):
+		self._timers = timers
+		self._name = name
+		self._start = None
+
+	def __enter__(self):
+		self._timers._enter(self._name)
+		self._start = perf_counter()
+		return self
+
+	def __exit__(self, *exception):
+		self._timers._exit(perf_counter() - self._start)
+		return False
+
+"""
+Phase of disabled timers: does nothing, so timing a phase costs just a comparison when timings are off
+"""
+class _NoPhase(object):
+	__slots__ = []
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exception):
+		return False
+
+_NO_PHASE = _NoPhase()
+
+"""
+Hierarchical timers of the phases of the software. Each phase has a level of detail and is only timed if the timers are enabled up to its level, and phases timed while others are being timed are nested into them, so the report shows where the time of each phase goes. Besides times, amounts can be counted by key (as the nodes grown at each depth)
+
+The timers only see the time spent in the process they're in: the work of worker processes is timed as the time spent waiting for them
+"""
+class Timers(object):
+	"""
+	@attr 	_level 		level of detail of the phases timed (0 to disable the timers)
+	@attr 	_phases 	seconds spent and times entered of each phase, by path of phases (in the order they're first entered)
+	@attr 	_counters 	amount counted for each key of each counter, by name
+	@attr 	_stack 		path of the phases being timed
+	"""
+	__slots__ = ["_level","_phases","_counters","_stack"]
+
+	"""
+	Initializes the timers, with nothing timed yet
+
+	@param 	level 	level of detail of the phases to time (0 to disable the timers)
+	"""
+	def __init__(self, level = 0):
+		self._level = level
+		self._phases = {}
+		self._counters = {}
+		self._stack = []
+
+	"""
+	Sets the level of detail of the phases to time
+
+	@param 	level 	level of detail (0 to disable the timers)
+	"""
+	def setLevel(self, level):
+		self._level = level
+
+	"""
+	Returns the level of detail of the phases timed
+
+	@return 	level of detail (0 if disabled)
+	"""
+	def getLevel(self):
+		return self._level
+
+	"""
+	Returns whether the phases of a level of detail are timed
+
+	@param 	level 	level of detail
+	@return true if timed
+	"""
+	def isEnabled(self, level = 1):
+		return self._level >= level
+
+	"""
+	Returns a context manager timing a phase, nested into the phases being timed, if its level is timed
+
+	@param 	name 	name of the phase
+	@param 	level 	level of detail of the phase
+	@return context manager timing the phase
+	"""
+	def phase(self, name, level = 1):
+		return _Phase(self, name) if self._level >= level else _NO_PHASE
+
+	"""
+	Adds some time spent in a phase nested into the phases being timed, if its level is timed, for phases timed by hand (as the ones of worker processes)
+
+	@param 	name 	name of the phase
+	@param 	seconds time spent
+	@param 	level 	level of detail of the phase
+	"""
+	def add(self, name, seconds, level = 1):
+		if self._level >= level:
+			self._enter(name)
+			self._exit(seconds)
+
+	"""
+	Adds an amount to a key of a counter, if its level is timed
+
+	@param 	name 	name of the counter
+	@param 	key 	key counted
+	@param 	amount 	amount to add
+	@param 	level 	level of detail of the counter
+	"""
+	def count(self, name, key, amount = 1, level = 1):
+		if self._level >= level:
+			counter = self._counters.setdefault(name, {})
+			counter[key] = counter.get(key, 0) + amount
+
+	def _enter(self, name):
+		self._stack.append(name)
+		self._phases.setdefault(tuple(self._stack), [0., 0])
+
+	def _exit(self, seconds):
+		phase = self._phases[tuple(self._stack)]
+		phase[0] += seconds
+		phase[1] += 1
+		self._stack.pop()
+
+	"""
+	Returns the timings as nested dictionaries: each phase with its seconds, the times it was entered and its nested phases, and the counters with the amount of each key
+
+	@return 	dictionary of the timings, ready to be dumped as JSON
+	"""
+	def toDict(self):
+		root = {"phases": []}
+		nodes = {(): root}
+		for path, (seconds, calls) in self._phases.items():
+			nodes[path] = {"name": path[-1], "seconds": seconds, "calls": calls, "phases": []}
+			nodes[path[:-1]]["phases"].append(nodes[path])
+		return {"level": self._level, "phases": root["phases"],
+			"counters": {name: {str(key): amount for key, amount in counter.items()} for name, counter in self._counters.items()}}
+
+	"""
+	Writes the timings into a JSON file
+
+	@param 	filename 	file to write
+	"""
+	def save(self, filename):
+		with open(filename, "w") as file:
+			json.dump(self.toDict(), file, indent="\t")
+
+	"""
+	Returns a report of the timings: the time of each phase (and its share of the time of the phase it's nested into) as a tree, followed by the counters
+	"""
+	def __str__(self):
+		lines = []
+		for path, (seconds, calls) in self._phases.items():
+			parent = self._phases.get(path[:-1])
+			share = " %5.1f%%"%(100*seconds/parent[0]) if parent is not None and parent[0] else ""
+			lines.append("%-40s %10.4fs%s%s"%("  "*(len(path)-1) + path[-1], seconds, share, " (%d times)"%calls if calls > 1 else ""))
+		for name, counter in self._counters.items():
+			lines.append("%s: %s"%(name, ", ".join("%s=%s"%(key, amount) for key, amount in counter.items())))
+		return "\n".join(lines)
+
+"""
+Timers of the software, disabled until a level is set
+"""
+TIMERS = Timers()
@@ -6,7 +6,18 @@ import numpy as np
 LOGGER = logging.getLogger(__name__)
 
 """
-Confusion matrix with true/false positives and negatives that will able to generate different metrics to measure the efficiency of one or more decision trees
+Divides element-wise some counts by their totals, being 0 the ratios of a total of 0
+
+@param 	counts 	counts to divide
+@param 	totals 	totals to divide by
+@return ratios
+"""
+def _ratios(counts, totals):
+	counts, totals = np.asarray(counts, dtype=np.float64), np.asarray(totals, dtype=np.float64)
+	return np.divide(counts, totals, out=np.zeros_like(totals), where=totals != 0)
+
+"""
+Confusion matrix counting the samples classified to each class (rows) for each real class of the samples (columns), that generates different metrics to measure the efficiency of one or more decision trees. The results are added at once from whole vectors of predictions and real classes, and matrices of several trees (as the folds of a cross-validation) are merged by adding them up
 """
 class ConfusionMatrix(object):
 	"""
@@ -16,12 +27,22 @@ class ConfusionMatrix(object):
 	"""
 	__slots__ = ["_matrix","_values","_names"]
 
-	def __init__(self, values, names = None):
+	"""
+	Initializes an empty confusion matrix for the values of the target feature, or counting the results specified
+
+	@param 	values 			values the target feature can take
+	@param 	names 			meaning of each value (default is the value itself)
+	@param 	predictions 	class each sample is classified to, numbered as the values (default is no results)
+	@param 	truth 			real class of each sample, numbered as the values
+	"""
+	def __init__(self, values, names = None, predictions = None, truth = None):
 		self._values = values
 		self._names = names
-		self._matrix = np.zeros((len(values),len(values)),dtype=np.uint32)
+		self._matrix = np.zeros((len(values),len(values)),dtype=np.int64)
 		if names == None:
 			self._names = list(map(str,self._values))
+		if predictions is not None:
+			self.addResults(predictions, truth)
 
 	"""
 	Given the result obtained from classifying a sample using a decision tree and the supposed result for that sample, adds a new value to the correct matrix cell
@@ -33,20 +54,127 @@ class ConfusionMatrix(object):
 		self._matrix[result][supposedResult] += 1
 
 	"""
-	Combines the current confusion matrix with another confusion matrix to be more confused at the end
+	Adds the results of classifying many samples at once: each pair of classified and real class is combined into the code of its cell, and the codes are counted with a single bincount
+
+	@param 	predictions 	class each sample is classified to, numbered as the values
+	@param 	truth 			real class of each sample, numbered as the values
+	"""
+	def addResults(self, predictions, truth):
+		predictions, truth = np.asarray(predictions, dtype=np.int64), np.asarray(truth, dtype=np.int64)
+		assert predictions.shape == truth.shape, "there must be a real class for each prediction"
+		classes = len(self._values)
+		self._matrix += np.bincount(predictions * classes + truth, minlength=classes*classes).reshape(classes, classes)
+
+	"""
+	Combines the current confusion matrix with another confusion matrix to be more confused at the end, as a new matrix
+
+	@param 	other 	confusion matrix of the same target feature (or 0, so matrices can be summed up)
+	@return confusion matrix with the counts of both
 	"""
 	def __add__(self, other):
+		merged = ConfusionMatrix(self._values, self._names)
+		merged._matrix = self._matrix + (other.getMatrix() if isinstance(other, ConfusionMatrix) else other)
+		return merged
+
+	def __radd__(self, other):
+		return self.__add__(other)
+
+	"""
+	Adds the counts of another confusion matrix to the current one
+
+	@param 	other 	confusion matrix of the same target feature
+	@return the current matrix
+	"""
+	def __iadd__(self, other):
 		self._matrix += other.getMatrix()
+		return self
 
 	"""
-	Prints a representation of the confusion matrix
+	Sets the meaning of each value of the target feature, as printed
+
+	@param 	names 	meaning of each value
 	"""
-	def __str__(self):
-		LOGGER.warning("I'm confused, the matrix could be wrong or crazy because alcoholic illnesses")
-		return str(self._matrix)
+	def setNames(self, names):
+		assert len(names) == len(self._values), "there must be a meaning for each value"
+		self._names = list(names)
 
 	"""
 	Returns the real matrix
 	"""
 	def getMatrix(self):
 		return self._matrix
+
+	"""
+	Returns the number of samples counted
+
+	@return 	number of samples
+	"""
+	def getSamplesCount(self):
+		return int(self._matrix.sum())
+
+	"""
+	Returns the ratio of samples classified to their real class
+
+	@return 	accuracy (None if there are no samples)
+	"""
+	def getAccuracy(self):
+		total = self.getSamplesCount()
+		return np.trace(self._matrix)/total if total else None
+
+	"""
+	Returns the precision of each class: the ratio of the samples classified to the class that are of the class (0 if no sample is classified to it)
+
+	@return 	precision of each class
+	"""
+	def getPrecisions(self):
+		return _ratios(np.diag(self._matrix), self._matrix.sum(axis=1))
+
+	"""
+	Returns the recall of each class: the ratio of the samples of the class classified to it (0 if no sample is of the class)
+
+	@return 	recall of each class
+	"""
+	def getRecalls(self):
+		return _ratios(np.diag(self._matrix), self._matrix.sum(axis=0))
+
+	"""
+	Returns the F1 score of each class, the harmonic mean of its precision and its recall (0 if both are 0)
+
+	@return 	F1 score of each class
+	"""
+	def getF1Scores(self):
+		precisions, recalls = self.getPrecisions(), self.getRecalls()
+		return _ratios(2 * precisions * recalls, precisions + recalls)
+
+	"""
+	Returns the macro averages of the metrics: the mean of the metric of each class, so every class weighs the same
+
+	@return 	precision, recall and F1 score averaged
+	"""
+	def getMacroAverages(self):
+		return self.getPrecisions().mean(), self.getRecalls().mean(), self.getF1Scores().mean()
+
+	"""
+	Returns the micro averages of the metrics: the metrics of the hits and misses of all the classes counted together, so every sample weighs the same (as every sample has a single class, the three of them are the accuracy)
+
+	@return 	precision, recall and F1 score averaged
+	"""
+	def getMicroAverages(self):
+		hits = np.trace(self._matrix)
+		precision = _ratios(hits, self._matrix.sum(axis=1).sum())
+		recall = _ratios(hits, self._matrix.sum(axis=0).sum())
+		return float(precision), float(recall), float(_ratios(2 * precision * recall, precision + recall))
+
+	"""
+	Prints a representation of the confusion matrix and the metrics of each class
+	"""
+	def __str__(self):
+		width = max([len(name) for name in self._names] + [9])
+		lines = ["%*s | %s"%(width, "predicted", " ".join("%*s"%(width, name) for name in self._names))]
+		lines += ["%*s | %s"%(width, name, " ".join("%*d"%(width, count) for count in row)) for name, row in zip(self._names, self._matrix)]
+		lines.append("%*s | %9s %9s %9s %9s"%(width, "class", "precision", "recall", "f1", "samples"))
+		for name, precision, recall, f1, samples in zip(self._names, self.getPrecisions(), self.getRecalls(), self.getF1Scores(), self._matrix.sum(axis=0)):
+			lines.append("%*s | %9.4f %9.4f %9.4f %9d"%(width, name, precision, recall, f1, samples))
+		lines.append("%*s | %9.4f %9.4f %9.4f %9d"%((width, "macro") + self.getMacroAverages() + (self.getSamplesCount(),)))
+		lines.append("%*s | %9.4f %9.4f %9.4f %9d"%((width, "micro") + self.getMicroAverages() + (self.getSamplesCount(),)))
+		return "\n".join(lines)
@@ -0,0 +1,391 @@
+# libraries
+from anytree import Node
+import numpy as np
+import logging
+import json
+import os
+
+# constants
+LOGGER = logging.getLogger(__name__)
+
+"""
+Minimum number of children of a node to dispatch them through a dictionary in the compiled source instead of comparing the value with each one
+"""
+DISPATCH_ARITY = 8
+
+"""
+Version of the format trees are saved with. Trees saved with a newer version can't be loaded
+"""
+MODEL_FORMAT = "decision-tree"
+MODEL_FORMAT_VERSION = 1
+
+"""
+Files of a saved tree inside its folder: the manifest, the source of the compiled tree and the arrays of the nodes
+"""
+MODEL_MANIFEST_FILE = "manifest.json"
+MODEL_SOURCE_FILE = "tree.py"
+MODEL_ARRAYS = ["feature","threshold","children","childrenCount","value","leaf","samples"]
+
+"""
+Maximum number of slots per node (on average) of the table to look up children directly by value. Trees whose values need more (as the ones splitting by raw continuous values) look them up with binary searches
+"""
+LOOKUP_TABLE_RATIO = 16
+
+"""
+Decision tree stored as a structure of arrays: each node of the tree is a position in a set of parallel arrays. Nodes are numbered in breadth-first order, so the children of a node are consecutive nodes and the root is the node 0. A node that splits by a feature has a child per value of the feature, and each child knows the value of the feature leading to it. Continuous features are split by a threshold, so their values are 0 (< threshold) and 1 (>= threshold)
+
+The tree doesn't keep any data from the training set but the number of samples of each node. It can be converted to an anytree tree to render it
+"""
+class DecisionTree(object):
+	"""
+	@attr 	_feature 		feature each node splits by (-1 for leaves)
+	@attr 	_threshold 		threshold of each node splitting by a continuous feature (NaN otherwise)
+	@attr 	_children 		first child of each node (children of a node are consecutive)
+	@attr 	_childrenCount 	number of children of each node (0 for leaves)
+	@attr 	_value 			value of the feature of the parent that leads to each node
+	@attr 	_leaf 			target class each node classifies to (the most common one among its samples)
+	@attr 	_samples 		number of training samples of each node
+	@attr 	_classes 		values of the target feature, as the classes are numbered
+	@attr 	_default 		child of each node samples go to if no child has their value (the one with more training samples)
+	@attr 	_values 		distinct values leading to any node, sorted
+	@attr 	_keys 			sorted keys (parent and rank of the value) of the nodes, to look up children by value
+	@attr 	_keyNodes 		node of each key
+	@attr 	_table 			child each value leads to, with a slot per value from 0 to the maximum value of the children of each node (None if the values are too big to have a slot each)
+	@attr 	_tableStarts 	slot where the values of each node start in the table
+	@attr 	_tableSizes 	number of slots of each node in the table
+	@attr 	_source 		python source of the prediction function of the tree, once generated
+	@attr 	_compiled 		prediction function compiled from the source, once compiled (it isn't pickled, the source is)
+	"""
+	__slots__ = ["_feature","_threshold","_children","_childrenCount","_value",
+	"_leaf","_samples","_classes","_default","_values","_keys","_keyNodes",
+	"_table","_tableStarts","_tableSizes","_source","_compiled"]
+
+	"""
+	Initializes a decision tree given the arrays describing its nodes
+
+	@param 	feature 		feature each node splits by (-1 for leaves)
+	@param 	threshold 		threshold of each node splitting by a continuous feature (NaN otherwise)
+	@param 	children 		first child of each node
+	@param 	childrenCount 	number of children of each node
+	@param 	value 			value of the feature of the parent that leads to each node
+	@param 	leaf 			target class each node classifies to
+	@param 	samples 		number of training samples of each node
+	@param 	classes 		values of the target feature
+	"""
+	def __init__(self, feature, threshold, children, childrenCount, value, leaf, samples, classes):
+		self._feature = np.asarray(feature, dtype=np.int32)
+		self._threshold = np.asarray(threshold, dtype=np.float64)
+		self._children = np.asarray(children, dtype=np.int32)
+		self._childrenCount = np.asarray(childrenCount, dtype=np.int32)
+		self._value = np.asarray(value, dtype=np.int64)
+		self._leaf = np.asarray(leaf, dtype=np.int32)
+		self._samples = np.asarray(samples, dtype=np.int64)
+		self._classes = classes
+		self._source, self._compiled = None, None
+		self._buildLookup()
+
+	def __getstate__(self):
+		return {name: getattr(self, name) for name in self.__slots__ if name != "_compiled"}
+
+	def __setstate__(self, state):
+		for name, value in state.items():
+			setattr(self, name, value)
+		self._compiled = None
+
+	"""
+	Precomputes the structures to find the children of many nodes at once: the default child of each node and the children of all the nodes sorted by a key combining their parent and the rank of the value leading to them, so finding the child a value leads to is a binary search. If the values are small (as the codes of categorical values and the 0 and 1 of thresholds), a table with a slot per value of each node is built too, so finding the child is just reading a slot
+	"""
+	def _buildLookup(self):
+		nodes = np.arange(self.getNodesCount())
+		self._default = np.full(len(nodes), -1, dtype=np.int64)
+		self._table, self._tableStarts, self._tableSizes = None, None, None
+		branches = np.flatnonzero(self._childrenCount)
+		if not len(branches):
+			self._values = np.zeros(0, dtype=np.int64)
+			self._keys, self._keyNodes = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+			return
+		# children of every node (all the nodes but the roots, if the arrays hold several trees)
+		childrenCount = self._childrenCount[branches]
+		parents = np.repeat(branches, childrenCount)
+		children = np.repeat(self._children[branches] - np.cumsum(childrenCount) + childrenCount, childrenCount) + np.arange(len(parents))
+		# default child: first child with the maximum samples
+		order = np.lexsort((children, -self._samples[children], parents))
+		firsts = np.flatnonzero(np.r_[True, parents[order][1:] != parents[order][:-1]])
+		self._default[parents[order][firsts]] = children[order][firsts]
+		# children by parent and value
+		self._values, ranks = np.unique(self._value[children], return_inverse=True)
+		keys = parents * len(self._values) + ranks
+		order = np.argsort(keys, kind="stable")
+		self._keys, self._keyNodes = keys[order], children[order]
+		# table of children by value (the slots of no child lead to the default one)
+		values = self._value[children]
+		if values.min() >= 0:
+			sizes = np.zeros(len(nodes), dtype=np.int64)
+			np.maximum.at(sizes, parents, values + 1)
+			if sizes.sum() <= LOOKUP_TABLE_RATIO * len(nodes):
+				self._tableSizes, self._tableStarts = sizes, np.cumsum(sizes) - sizes
+				self._table = np.repeat(self._default, sizes)
+				self._table[self._tableStarts[parents] + values] = children
+
+	"""
+	Returns the number of nodes of the tree (splitting nodes and leaves)
+
+	@return 	number of nodes
+	"""
+	def getNodesCount(self):
+		return len(self._feature)
+
+	"""
+	Returns the values of the target feature, as the classes of the leaves are numbered
+
+	@return 	target feature values
+	"""
+	def getClasses(self):
+		return self._classes
+
+	"""
+	Given a node and the value its feature takes, returns the child the value leads to. If no child has that value, the child with more training samples is returned (the first one if there are ties)
+
+	@param 	node 	splitting node
+	@param 	value 	value of the feature of the node
+	@return child node
+	"""
+	def _childOf(self, node, value):
+		first = self._children[node]
+		children = slice(first, first + self._childrenCount[node])
+		matches = np.flatnonzero(self._value[children] == value)
+		if len(matches):
+			return first + matches[0]
+		return first + self._samples[children].argmax()
+
+	"""
+	Classifies a sample walking down the tree from the root until reaching a leaf
+
+	@param 	sample 	sample with the value of each feature
+	@return target class the sample is classified to
+	"""
+	def classify(self, sample):
+		node = 0
+		while self._feature[node] >= 0:
+			value = sample[self._feature[node]]
+			if not np.isnan(self._threshold[node]):
+				value = int(value >= self._threshold[node])
+			node = self._childOf(node, value)
+		return self._leaf[node]
+
+	"""
+	Classifies a matrix of samples at once. All the samples start at the root (or at the nodes specified) and walk down the tree together: at each step, the samples that are not in a leaf yet take the value of the feature of their node and move to the child that value leads to (or the default child of the node if no child has it). So the tree is walked as many times as its depth, not once per sample
+
+	A sample can also walk down from several nodes at once (as the roots of the trees of a forest stored in the same arrays), specifying the row of the matrix of each walk
+
+	@param 	matrix 	samples (rows) with the value of each feature (columns)
+	@param 	nodes 	node where each sample starts (default is the root)
+	@param 	samples row of the matrix of the sample of each node (default is a row per node, in order)
+	@return target class each sample is classified to
+	"""
+	def predict(self, matrix, nodes = None, samples = None):
+		matrix = np.asarray(matrix)
+		nodes = np.zeros(len(matrix), dtype=np.int64) if nodes is None else np.array(nodes, dtype=np.int64)
+		samples = np.arange(len(nodes)) if samples is None else np.asarray(samples)
+		pending = np.flatnonzero(self._feature[nodes] >= 0)
+		while len(pending):
+			current = nodes[pending]
+			values = matrix[samples[pending], self._feature[current]]
+			threshold = self._threshold[current]
+			discretize = ~np.isnan(threshold)
+			values = values.astype(np.int64)
+			values[discretize] = values[discretize] >= threshold[discretize]
+			nodes[pending] = self.getChildren(current, values)
+			pending = pending[self._feature[nodes[pending]] >= 0]
+		return self._leaf[nodes]
+
+	"""
+	Given some splitting nodes and the value their feature takes, returns the child each value leads to, looking up the child of each node by the key of the node and the value (or the default child of the node if no child has the value)
+
+	@param 	nodes 	splitting nodes
+	@param 	values 	value of the feature of each node (0 or 1 if the node has a threshold)
+	@return child node of each node
+	"""
+	def getChildren(self, nodes, values):
+		if self._table is not None:
+			inTable = (values >= 0) & (values < self._tableSizes[nodes])
+			return np.where(inTable, self._table[np.where(inTable, self._tableStarts[nodes] + values, 0)], self._default[nodes])
+		ranks = np.minimum(np.searchsorted(self._values, values), len(self._values)-1)
+		keys = nodes * len(self._values) + ranks
+		positions = np.minimum(np.searchsorted(self._keys, keys), len(self._keys)-1)
+		found = (self._keys[positions] == keys) & (self._values[ranks] == values)
+		return np.where(found, self._keyNodes[positions], self._default[nodes])
+
+	"""
+	Returns the arrays describing the nodes of the tree (see the constructor), by name
+
+	@return 	dictionary with the array of each attribute of the nodes
+	"""
+	def getNodes(self):
+		return {attribute: getattr(self, "_" + attribute) for attribute in MODEL_ARRAYS}
+
+	"""
+	Classifies a single sample with the prediction function compiled from the tree, which is generated and compiled the first time is needed. It's much faster than walking the tree, so it's the one to use to classify samples one by one
+
+	@param 	sample 	sample with the value of each feature
+	@return target class the sample is classified to
+	"""
+	def predictOne(self, sample):
+		if self._compiled is None:
+			namespace = {}
+			exec(compile(self.toSource(), "<%s>"%self.__class__.__name__, "exec"), namespace)
+			self._compiled = namespace["predict"]
+		return self._compiled(sample)
+
+	"""
+	Generates the python source of a function predict(sample) that classifies a sample as the tree does, with the tree unrolled into nested conditions: thresholds are compared directly and categorical values are compared with the value of each child, but the default child, which is the else branch. Nodes with lots of children dispatch them through a dictionary of functions instead, one per child. The source is kept in the tree, so it's saved with it
+
+	@return python source of the prediction function
+	"""
+	def toSource(self):
+		if self._source is None:
+			functions, dispatchers = [], []
+			body = self._sourceOf(0, 1, functions, dispatchers)
+			lines = ["# decision tree compiled into python"]
+			lines += functions + dispatchers
+			lines += ["def predict(sample):"] + body
+			self._source = "\n".join(lines) + "\n"
+		return self._source
+
+	"""
+	Generates the source lines that classify the samples reaching a node
+
+	@param 	node 		node to generate the source of
+	@param 	indent 		indentation level of the lines
+	@param 	functions 	source of the functions of the dispatched children, where the new ones are added
+	@param 	dispatchers source of the dictionaries dispatching children, where the new ones are added
+	@return source lines of the node
+	"""
+	def _sourceOf(self, node, indent, functions, dispatchers):
+		tab = "\t" * indent
+		if self._feature[node] < 0:
+			return [tab + "return %d"%self._leaf[node]]
+		feature, default = self._feature[node], self._default[node]
+		children = range(self._children[node], self._children[node] + self._childrenCount[node])
+		if len(children) == 1:
+			return self._sourceOf(children[0], indent, functions, dispatchers)
+		if not np.isnan(self._threshold[node]):
+			threshold = self._threshold[node]
+			threshold = repr(float(threshold)) if np.isfinite(threshold) else "float('%r')"%float(threshold)
+			lines = [tab + "if sample[%d] < %s:"%(feature, threshold)]
+			lines += self._sourceOf(children[0], indent+1, functions, dispatchers)
+			lines += [tab + "else:"]
+			return lines + self._sourceOf(children[1], indent+1, functions, dispatchers)
+		if len(children) >= DISPATCH_ARITY:
+			for child in children:
+				functions += ["def _node%d(sample):"%child] + self._sourceOf(child, 1, functions, dispatchers)
+			dispatchers.append("_children%d = {%s}"%(node, ", ".join("%d: _node%d"%(self._value[child], child) for child in children)))
+			return [tab + "return _children%d.get(sample[%d], _node%d)(sample)"%(node, feature, default)]
+		lines = [tab + "value = sample[%d]"%feature]
+		for child in children:
+			if child != default:
+				lines += [tab + "%s value == %d:"%("elif" if len(lines) > 1 else "if", self._value[child])]
+				lines += self._sourceOf(child, indent+1, functions, dispatchers)
+		lines += [tab + "else:"]
+		return lines + self._sourceOf(default, indent+1, functions, dispatchers)
+
+	"""
+	Saves the tree into a folder: each array of the nodes is saved as a .npy file, so it can be loaded memory-mapped, and a JSON manifest describes them along with the format version, the target classes and optionally the vocabularies of the features and the target feature, so the tree can be checked against the dataset it classifies. If the tree has been compiled, its source is saved too, to read it (trees loaded generate it again)
+
+	@param 	path 			folder to save the tree into (created if it doesn't exist)
+	@param 	vocabularies 	values of each feature, to describe the codes of the tree
+	@param 	target 			target feature the tree classifies
+	"""
+	def save(self, path, vocabularies = None, target = None):
+		os.makedirs(path, exist_ok=True)
+		arrays = {}
+		for name in MODEL_ARRAYS:
+			array = getattr(self, "_" + name)
+			np.save(os.path.join(path, name + ".npy"), array)
+			arrays[name] = {"file": name + ".npy", "dtype": array.dtype.str, "shape": list(array.shape)}
+		manifest = {
+			"format": MODEL_FORMAT,
+			"version": MODEL_FORMAT_VERSION,
+			"nodes": self.getNodesCount(),
+			"classes": self._classes,
+			"vocabularies": vocabularies,
+			"target": target,
+			"arrays": arrays,
+			"source": MODEL_SOURCE_FILE if self._source is not None else None
+		}
+		if self._source is not None:
+			with open(os.path.join(path, MODEL_SOURCE_FILE), "w") as source:
+				source.write(self._source)
+		with open(os.path.join(path, MODEL_MANIFEST_FILE), "w") as manifest_file:
+			json.dump(manifest, manifest_file, indent="\t", default=_toJSON)
+		LOGGER.debug("Saved tree with %d nodes into %s",self.getNodesCount(),path)
+
+	"""
+	Converts the tree into an anytree tree. Splitting nodes are named as their feature and have a child named as each value of the feature, whose only child is the node the value leads to. Leaves are named as the target feature value they classify to
+
+	@return root of the anytree tree
+	"""
+	def toAnytree(self):
+		parents = [None]
+		for node in range(self.getNodesCount()):
+			if self._feature[node] < 0:
+				anyNode = Node(self._classes[self._leaf[node]], parents[node])
+			else:
+				anyNode = Node(int(self._feature[node]), parents[node])
+				anyNode.isContinuous = not np.isnan(self._threshold[node])
+				anyNode.threshold = self._threshold[node] if anyNode.isContinuous else None
+				for child in range(self._children[node], self._children[node] + self._childrenCount[node]):
+					valueNode = Node(int(self._value[child]), anyNode)
+					valueNode.samples = int(self._samples[child])
+					parents.append(valueNode)
+			if node == 0:
+				root = anyNode
+		return root
+
+	def __str__(self):
+		txt =  "%s Specifications\n"%self.__class__.__name__
+		txt += "------------------------------------------------------------\n"
+		txt += "NODES:    %d (%d leaves)\n"%(self.getNodesCount(), np.count_nonzero(self._feature < 0))
+		txt += "SAMPLES:  %d\n"%(self._samples[0])
+		txt += "------------------------------------------------------------\n"
+		return txt
+
+"""
+Converts numpy values to values that can be written as JSON
+
+@param 	value 	numpy value
+@return python value
+"""
+def _toJSON(value):
+	if isinstance(value, np.generic):
+		return value.item()
+	if isinstance(value, np.ndarray):
+		return value.tolist()
+	raise TypeError("unable to save %s as JSON"%type(value).__name__)
+
+"""
+Converts the values of each feature into the values they are saved as in the manifest of a tree, so they can be compared with the vocabularies of a tree loaded
+
+@param 	vocabularies 	values of each feature
+@return values of each feature as loaded from a manifest
+"""
+def toManifestValues(vocabularies):
+	return json.loads(json.dumps(vocabularies, default=_toJSON))
+
+"""
+Loads a tree saved into a folder. The arrays of the nodes can be memory-mapped, so they are read from the files as the tree is walked instead of loading them into memory. The source saved with the tree isn't executed: the prediction function is generated again from the arrays when it's needed
+
+@param 	path 	folder the tree was saved into
+@param 	mmap 	true to memory-map the arrays of the nodes
+@return tree loaded, and the vocabularies of the features and the target feature saved with it (None if not saved)
+"""
+def loadTree(path, mmap = True):
+	with open(os.path.join(path, MODEL_MANIFEST_FILE)) as manifest_file:
+		manifest = json.load(manifest_file)
+	assert manifest.get("format") == MODEL_FORMAT, """cannot load tree: %s is not a decision tree"""%path
+	assert manifest["version"] <= MODEL_FORMAT_VERSION, """cannot load tree: format version %d is newer than the supported one (%d)"""%(manifest["version"], MODEL_FORMAT_VERSION)
+	arrays = {name: np.load(os.path.join(path, description["file"]), mmap_mode="r" if mmap else None)
+		for name, description in manifest["arrays"].items()}
+	tree = DecisionTree(classes=manifest["classes"], **arrays)
+	LOGGER.debug("Loaded tree with %d nodes from %s",tree.getNodesCount(),path)
+	return tree, manifest["vocabularies"], manifest.get("target")
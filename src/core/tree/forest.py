@@ -0,0 +1,148 @@
+# app modules
+from .decisiontree import DecisionTree
+
+# libraries
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+import numpy as np
+import logging
+
+# constants
+LOGGER = logging.getLogger(__name__)
+
+"""
+Maximum number of walks (a sample walking down a tree) done at once when classifying samples with a forest
+"""
+FOREST_BLOCK = 1 << 20
+
+"""
+Counts the votes of some trees for each sample and class: every sample walks down every tree at once, as the trees are joined in the same arrays (see DecisionForest), and the leaves reached are counted with a bincount per block of walks
+
+@param 	task 	joined trees, their roots, the samples (rows) to classify and the number of classes
+@return matrix with the votes of each sample (rows) for each class (columns)
+"""
+def _votesOf(task):
+	tree, roots, matrix, classes = task
+	votes = np.zeros((len(matrix), classes), dtype=np.int64)
+	block = max(1, FOREST_BLOCK // len(roots))
+	for first in range(0, len(matrix), block):
+		samples = np.arange(first, min(first+block, len(matrix)))
+		walks = np.tile(samples, len(roots))
+		leaves = tree.predict(matrix, np.repeat(roots, len(samples)), walks)
+		votes[samples] += np.bincount((walks - first) * classes + leaves, minlength=len(samples)*classes).reshape(len(samples), classes)
+	return votes
+
+"""
+Forest of decision trees, as a random forest generates. Each tree votes the class it classifies a sample to, and the forest classifies the sample to the class with more votes (the first one if there are ties)
+
+The trees are kept as the arrays of their nodes (see DecisionTree), so a forest takes just the memory of the arrays of its trees. To classify samples, the trees are joined into the arrays of a single tree with a root per tree, so the samples walk down all the trees at once, with as many steps as the depth of the deepest tree. The trees can be split into groups classifying at once in several threads or processes
+"""
+class DecisionForest(object):
+	"""
+	@attr 	_trees 		decision trees of the forest
+	@attr 	_classes 	values of the target feature, as the classes of the trees are numbered
+	@attr 	_workers 	number of threads (or processes) to classify samples with by default
+	@attr 	_processes 	whether to classify with processes instead of threads by default
+	@attr 	_groups 	trees joined into groups (joined tree and its roots), by number of groups, once joined
+	"""
+	__slots__ = ["_trees","_classes","_workers","_processes","_groups"]
+
+	"""
+	Initializes a forest given its trees
+
+	@param 	trees 		decision trees of the forest, classifying the same target
+	@param 	classes 	values of the target feature
+	@param 	workers 	number of threads (or processes) to classify samples with by default (None or 1 to classify them in this thread)
+	@param 	processes 	true to classify with processes instead of threads by default
+	"""
+	def __init__(self, trees, classes, workers = None, processes = False):
+		self._trees = list(trees)
+		self._classes = classes
+		self._workers = workers
+		self._processes = processes
+		self._groups = {}
+	"""
+	Returns the trees of the forest
+
+	@return 	list of decision trees
+	"""
+	def getTrees(self):
+		return self._trees
+
+	"""
+	Returns the number of trees of the forest
+
+	@return 	number of trees
+	"""
+	def getTreesCount(self):
+		return len(self._trees)
+
+	"""
+	Returns the values of the target feature, as the classes of the trees are numbered
+
+	@return 	target feature values
+	"""
+	def getClasses(self):
+		return self._classes
+
+	"""
+	Joins the trees of the forest into groups of trees (as equal as possible), each group into the arrays of a single tree with a root per tree: the nodes of the trees are appended one tree after the other
+
+	@param 	groups 	number of groups
+	@return list with the joined tree of each group and the nodes that are its roots
+	"""
+	def _joinTrees(self, groups):
+		if groups not in self._groups:
+			self._groups[groups] = []
+			for trees in np.array_split(np.arange(len(self._trees)), groups):
+				nodes = [self._trees[tree].getNodes() for tree in trees]
+				roots = np.cumsum([0] + [len(treeNodes["feature"]) for treeNodes in nodes[:-1]])
+				joined = {attribute: np.concatenate([treeNodes[attribute] for treeNodes in nodes]) for attribute in nodes[0]}
+				joined["children"] = np.concatenate([treeNodes["children"] + root for treeNodes, root in zip(nodes, roots)])
+				self._groups[groups].append((DecisionTree(**joined, classes=self._classes), roots))
+		return self._groups[groups]
+
+	"""
+	Counts the votes of the trees for each sample and class. Every sample walks down every tree at once, and if there are several workers, each one walks the samples down a group of trees and their votes are added up
+
+	@param 	matrix 		samples (rows) with the value of each feature (columns)
+	@param 	workers 	number of threads (or processes) to count the votes with (default is the one of the forest)
+	@param 	processes 	true to count them with processes instead of threads (default is the one of the forest)
+	@return matrix with the votes of each sample (rows) for each class (columns)
+	"""
+	def votes(self, matrix, workers = None, processes = None):
+		matrix = np.asarray(matrix)
+		workers = min(self._workers or 1, len(self._trees)) if workers is None else min(workers, len(self._trees))
+		processes = self._processes if processes is None else processes
+		tasks = [(tree, roots, matrix, len(self._classes)) for tree, roots in self._joinTrees(max(1, workers))]
+		if workers <= 1:
+			return _votesOf(tasks[0])
+		pool = (Pool if processes else ThreadPool)(workers)
+		try:
+			return sum(pool.map(_votesOf, tasks, chunksize=1))
+		finally:
+			pool.close()
+			pool.join()
+
+	"""
+	Classifies a matrix of samples at once, to the class with more votes of each sample
+
+	@param 	matrix 		samples (rows) with the value of each feature (columns)
+	@param 	workers 	number of threads (or processes) to classify with (default is the one of the forest)
+	@param 	processes 	true to classify with processes instead of threads (default is the one of the forest)
+	@return target class each sample is classified to
+	"""
+	def predict(self, matrix, workers = None, processes = None):
+		return self.votes(matrix, workers, processes).argmax(axis=1)
+
+	"""
+	Classifies a single sample, as the class most of the trees classify it to
+
+	@param 	sample 	values of each feature of the sample
+	@return target class the sample is classified to
+	"""
+	def predictOne(self, sample):
+		return int(np.bincount([tree.predictOne(sample) for tree in self._trees], minlength=len(self._classes)).argmax())
+
+	def __str__(self):
+		return "%d trees, %d nodes"%(self.getTreesCount(), sum(tree.getNodesCount() for tree in self._trees))
@@ -8,19 +8,25 @@ from core.dataset.readers import FileDatasetReader
 from core.dataset.textdataset import TextDataset
 from core.dataset.splitter import DatasetSplitter
 from core.dataset.filters import DatasetFilterer
+from core.dataset.cache import DatasetCache
 from core.dataset.constants import *
 from core.dataset.trainingset import *
 from core.dataset.validationset import *
-#from core.measure.confusionmatrix import ConfusionMatrix
 from core.algorithms.treegrowing import BasicTreeGrowingAlgorithm
 from core.algorithms.ID3 import ID3Algorithm
 from core.algorithms.C45 import C45Algorithm
+from core.algorithms.parallel import FoldTrainingPool
+from core.algorithms.forest import RandomForestAlgorithm
+from core.tree.decisiontree import loadTree, toManifestValues
+from core.tree.forest import DecisionForest
 from core.helpers.types import *
+from core.helpers.timers import TIMERS
 from anytree.dotexport import RenderTreeGraph
 import logging
-import pickle
+import numpy as np
 import os
 import platform
+import tempfile
 from anytree import *
 import sys
 
@@ -40,31 +46,83 @@ values
 wholeDataset = None
 
 """
-Data extracted from the training source
+Samples of the whole dataset extracted from the training source (slice of the samples)
 """
 trainingData = None
 
 """
-Data extracted from the validation source
+Samples of the whole dataset extracted from the validation source (slice of the samples)
 """
 validationData = None
 
+"""
+Temporary folder inside the dataset cache folder where the numeric columns of the datasets are stored as memory-mapped files, when training out of core
+"""
+columnsFolder = None
+
 """
 Training set(s) and validation set(s) object(s) to use to generate a decision tree
 """
 datasets = None
 
+"""
+Whether the sets are validated with leave-one-out (each sample with the tree grown from the rest of samples) instead of with the trees grown from the training sets
+"""
+leaveOneOut = False
+
 # functions
 """
 Loads the reader object with the proper reader and reads the dataset, saving it
-into the wholeDataset variable according to the dataset specified in the arguments
+into the wholeDataset variable according to the dataset specified in the arguments. If the dataset has been cached and its files haven't changed since, the dataset is loaded from the cache. The dataset is cached unfiltered and filtered once loaded, so every filter uses the same cache
 """
 def readDataset():
 	# globals
 	global trainingData, validationData, wholeDataset
 	# dataset is from a file
 	source = os.path.join(DATASET_PATH,args.dataset)
-	datasetReader = FileDatasetReader(source)
+	cache = DatasetCache(source)
+	# out of core, the cached columns are memory-mapped
+	mmap = args.mmap_dataset or getMemoryBudget() is not None
+	cached = cache.load(mmap) if args.dataset_cache else None
+	if cached is not None:
+		LOGGER.info("Loaded dataset from cache")
+		columns, featuresValues, trainingSamples, featuresData = cached
+	else:
+		columns, featuresValues, trainingSamples, featuresData = readSources(source)
+		if args.dataset_cache:
+			try:
+				cache.save(columns, featuresValues, trainingSamples, featuresData)
+				if mmap:
+					columns = cache.load(mmap)[0]
+			except Exception as e:
+				LOGGER.warning("Unable to cache the dataset (%s)",e)
+	if args.filter != "none":
+		with TIMERS.phase("filter"):
+			columns, featuresValues, trainingSamples, masked = filterDataset(columns, featuresValues, trainingSamples)
+	else:
+		masked = None
+
+	# Reading result (training and validation data are the first and last samples of the whole data)
+	samples = len(columns[0]) if len(columns) else 0
+	trainingData = slice(0, trainingSamples)
+	validationData = slice(trainingSamples, samples)
+	LOGGER.info("Loaded training%s data from file, total %d samples with %d features"," and validation" if samples > trainingSamples else "",samples,len(columns))
+	wholeDataset = TextDataset(None, featuresValues, columns = columns, masked = masked)
+
+	# check if we have features
+	if featuresData == None:
+		LOGGER.warning("Dataset has no features meaning set, the tree will may be not very useful")
+	else:
+		wholeDataset.setFeaturesMeaning(featuresData)
+
+"""
+Reads the dataset files of the folder specified, encoding the values of each feature as codes
+
+@param 	source 	folder of the dataset files
+@return columns of codes (an array per feature), the values of each feature, the number of training samples and the features meanings
+"""
+def readSources(source):
+	datasetReader = FileDatasetReader(source, getJobs())
 	try:
 		datasetReader.read()
 	except Exception as e:
@@ -73,64 +131,106 @@ def readDataset():
 		sys.exit(1)
 
 	# obtain samples data
-	trainingData = datasetReader.getTrainingData()
-	validationData = datasetReader.getValidationData()
+	data, featuresValues = datasetReader.getData(), datasetReader.getFeaturesValues()
+	trainingSamples = datasetReader.getTrainingSampleCount()
 
 	# check at least we have training data
-	if trainingData is None:
+	if data is None:
 		LOGGER.critical("No training data was loaded for the dataset %s. We can't continue",source)
 		sys.exit(1)
-	if validationData is None:
-		validationData = []
+	return [data[:, feature] for feature in range(data.shape[1])], featuresValues, trainingSamples, datasetReader.getFeaturesData()
 
-	# Filter
-	if args.filter != "none":
-		trainingFilterer = DatasetFilterer(trainingData)
-		validationFilterer = DatasetFilterer(validationData)
-		# unknown rows
-		if args.filter == "remove-unknown-rows":
-			LOGGER.info("Applying filter to delete rows with unknown values")
-			trainingFilterer.deleteUnknownSamples()
-			validationFilterer.deleteUnknownSamples()
-		# update data
-		trainingData = trainingFilterer.getData()
-		validationData = validationFilterer.getData()
-
-	# Reading result
-	wholeData = trainingData + validationData
-	LOGGER.info("Loaded training%s data from file, total %d samples with %d features"," and validation" if validationData is not None else "",len(wholeData),len(wholeData[0]))
-	wholeDataset = TextDataset(wholeData)
+"""
+Filters the columns of codes of the dataset according to the filter specified in the arguments. Unknown values are either removed with their rows, or kept and masked: their codes are given to the datasets, so the tree growing algorithms leave them out of the counts
 
-	# check if we have features
-	if datasetReader.getFeaturesData() == None:
-		LOGGER.warning("Dataset has no features meaning set, the tree will may be not very useful")
-	else:
-		wholeDataset.setFeaturesMeaning(datasetReader.getFeaturesData())
+@param 	columns 			columns of codes (an array per feature)
+@param 	featuresValues 		values of each feature, so the code of each value is its position
+@param 	trainingSamples 	number of training samples (the first ones of the data)
+@return columns of codes filtered, the values of each feature, the number of training samples and the masked code of each feature (None if no values are masked)
+"""
+def filterDataset(columns, featuresValues, trainingSamples):
+	filterer = DatasetFilterer(columns, featuresValues)
+	masked = None
+	# unknown rows
+	if args.filter == "remove-unknown-rows":
+		LOGGER.info("Applying filter to delete rows with unknown values")
+		filterer.deleteUnknownSamples()
+	# unknown values kept, just masked
+	elif args.filter == "mask-unknown-values":
+		LOGGER.info("Applying filter to mask unknown values")
+		unknown = np.count_nonzero(filterer.getUnknownMask(), axis=0)
+		LOGGER.info("Unknown values masked: %d in %d features",unknown.sum(),np.count_nonzero(unknown))
+		masked = filterer.getUnknownCodes()
+	# update data
+	trainingSamples = np.count_nonzero(filterer.getKeptSamples()[:trainingSamples])
+	columns, featuresValues = filterer.getData()
+	return columns, featuresValues, trainingSamples, masked
+
+"""
+Creates the temporary folder inside the dataset cache folder where the numeric columns of the datasets are stored as memory-mapped files when training out of core (see columnsFolder), with a subfolder per numeric dataset
+
+@param 	names 	names of the subfolders to create
+@return path of each subfolder, or None for each one if not training out of core
+"""
+def createColumnsFolders(names):
+	global columnsFolder
+	if getMemoryBudget() is None:
+		return [None] * len(names)
+	cacheFolder = os.path.join(DATASET_PATH, args.dataset, DATASET_CACHE_FOLDER)
+	os.makedirs(cacheFolder, exist_ok=True)
+	columnsFolder = tempfile.TemporaryDirectory(prefix=DATASET_COLUMNS_FOLDER+"-", dir=cacheFolder)
+	folders = [os.path.join(columnsFolder.name, name) for name in names]
+	for folder in folders:
+		os.mkdir(folder)
+	LOGGER.info("Training out of core, with the numeric columns memory-mapped from %s",columnsFolder.name)
+	return folders
 
 """
 Checks if there's any validation data and generates the training and validation numerical datasets. If not, switches the splitting meta-algorithm and generates the trainining sets and validation sets necessary as specified by the algorithm
+
+@param 	classifier 	target feature, to stratify the splits by if specified in the arguments
 """
-def generateDatasets():
-	global datasets
-	if validationData is None or not len(validationData):
+def generateDatasets(classifier):
+	global datasets, leaveOneOut
+	if validationData.start == validationData.stop:
 		# switch algorithm and generate sets
 		LOGGER.info("No validation set found, using splitting algorithm")
-		splitter = DatasetSplitter(wholeDataset)
+		# out of core, the numeric columns the sets share are memory-mapped files
+		splitter = DatasetSplitter(wholeDataset, args.seed, createColumnsFolders(["whole"])[0])
+		with TIMERS.phase("encode"):
+			splitter.getNumericDataset()
 		if args.splitter == "holdout":
-			datasets = [splitter.holdout(getHoldoutPercentage())]
+			datasets = [splitter.holdout(getHoldoutPercentage(), classifier if args.stratify else None)]
 			LOGGER.info("Applied holdout splitting: created training set has %d elements, validation set has %d elements from a total of %d ",
 				datasets[0][0].getSampleCount(),
 				datasets[0][1].getSampleCount(),
 				wholeDataset.getSampleCount())
+		elif args.splitter == "cross-validation" and getCrossValidationK() < wholeDataset.getSampleCount():
+			k = getCrossValidationK()
+			datasets = splitter.crossValidation(k, classifier if args.stratify else None)
+			LOGGER.info("Applied %d-fold cross-validation splitting: created %d training sets and validation sets from a total of %d samples",k,len(datasets),wholeDataset.getSampleCount())
+		elif args.splitter == "bootstrapping":
+			datasets = [splitter.bootstrap(classifier if args.stratify else None)]
+			LOGGER.info("Applied bootstrapping splitting: created training set has %d samples drawn (%d distinct), validation set has %d out of bag samples from a total of %d",
+				wholeDataset.getSampleCount(),
+				datasets[0][0].getSampleCount(),
+				datasets[0][1].getSampleCount(),
+				wholeDataset.getSampleCount())
+		elif args.splitter in ["cross-validation","leave1out"]:
+			# a cross-validation with a fold per sample is a leave-one-out
+			datasets, leaveOneOut = [splitter.leaveOneOut()], True
+			LOGGER.info("Applied leave-one-out splitting: each of the %d samples will be validated with the tree generated from the rest of samples",wholeDataset.getSampleCount())
 		else:
 			LOGGER.critical("The splitting method %s has not been implemented yet, sorry :(",args.splitter)
 			sys.exit(1)
 	else:
-		# validation set is defined
-		datasets = [(
-			wholeDataset.getNumericDataset(trainingData,TrainingSet),
-			wholeDataset.getNumericDataset(validationData,ValidationSet)
-		)]
+		# validation set is defined (out of core, the numeric columns are memory-mapped files)
+		folders = createColumnsFolders(["training","validation"])
+		with TIMERS.phase("encode"):
+			datasets = [(
+				wholeDataset.getNumericDataset(trainingData,TrainingSet,folders[0]),
+				wholeDataset.getNumericDataset(validationData,ValidationSet,folders[1])
+			)]
 
 """
 Returns the user selected percentage of samples to sent to the training set or either exits the software if invalid, when using holdout splitting method
@@ -150,13 +250,138 @@ Return the user selected number of groups when performing cross-validation split
 @return 	number of groups to set to the cross-validation
 """
 def getCrossValidationK():
-	k = args.k
+	k = args.cross_validation_k
 	if k < CROSSVALID_K_MIN or k > wholeDataset.getSampleCount():
 		LOGGER.critical("""Cross-validation splitting method number of groups (k) specified (%d) has to be minimum %d and maximum %d (because is the size of the dataset)""",k,CROSSVALID_K_MIN, wholeDataset.getSampleCount())
 		sys.exit(1)
 	return k
 
 
+"""
+Returns the user selected number of bins to search thresholds of continuous features using histograms, or None to search among all values. If not valid, exits the application
+
+@return 	number of bins to use or None
+"""
+def getHistogramBins():
+	bins = args.histogram_bins
+	if not bins:
+		return None
+	if bins < HISTOGRAM_BINS_MIN or bins > DATASET_MAX_BINS:
+		LOGGER.critical("""Number of histogram bins specified (%d) has to be minimum %d and maximum %d""",bins,HISTOGRAM_BINS_MIN,DATASET_MAX_BINS)
+		sys.exit(1)
+	return bins
+
+"""
+Returns the user selected number of processes to score features with. If not valid, exits the application
+
+@return 	number of processes to use
+"""
+def getJobs():
+	jobs = args.jobs
+	if jobs < JOBS_MIN:
+		LOGGER.critical("""Number of processes specified (%d) has to be minimum %d""",jobs,JOBS_MIN)
+		sys.exit(1)
+	return jobs
+
+"""
+Returns the user selected memory budget to train with, in bytes, or None if unbounded. If not valid, exits the application
+
+@return 	memory budget in bytes or None
+"""
+def getMemoryBudget():
+	budget = args.memory_budget
+	if not budget:
+		return None
+	if budget < MEMORY_BUDGET_MIN:
+		LOGGER.critical("""Memory budget specified (%d MB) has to be minimum %d MB""",budget,MEMORY_BUDGET_MIN)
+		sys.exit(1)
+	return budget << 20
+
+"""
+Returns the user selected number of trees of the random forest. If not valid, exits the application
+
+@return 	number of trees
+"""
+def getForestTrees():
+	trees = args.forest_trees
+	if trees < FOREST_TREES_MIN:
+		LOGGER.critical("""Number of trees of the random forest specified (%d) has to be minimum %d""",trees,FOREST_TREES_MIN)
+		sys.exit(1)
+	return trees
+
+"""
+Returns the user selected number of features picked randomly to split each node of a random forest, or None to pick the square root of the number of features. If not valid, exits the application
+
+@return 	number of features or None
+"""
+def getForestFeatures():
+	features = args.forest_features
+	if not features:
+		return None
+	if features < 1 or features >= wholeDataset.getFeaturesCount():
+		LOGGER.critical("""Number of random features specified (%d) has to be minimum 1 and maximum %d (the features but the classifier)""",features,wholeDataset.getFeaturesCount()-1)
+		sys.exit(1)
+	return features
+
+"""
+Validates each tree (or forest) with its validation set, building its confusion matrix
+
+@param 	trees 			list with each tree (or forest) and the class each sample of its validation set is classified to, if already classified (None otherwise)
+@param 	validationSets 	validation set of each tree
+@param 	classifier 		target feature the trees classify
+@return list with each tree (or forest) and its confusion matrix on its validation set
+"""
+def validateTrees(trees, validationSets, classifier):
+	return [(tree, validationSet.getConfusionMatrix(tree, classifier, predictions)) for (tree, predictions), validationSet in zip(trees, validationSets)]
+
+"""
+Trains a tree for each training set with the algorithm specified. If there are several training sets (as the folds of a cross-validation) and several processes, the trees are trained in parallel by a pool of processes, a tree per process at once. With random forests, a forest is trained for each training set instead, with its trees trained in parallel. With leave-one-out, a single tree is trained from all the samples, and each sample is classified by the tree trained without it
+
+@param 	algorithm 	class of the algorithm to train with
+@param 	classifier 	target feature to classify
+@return list with the tree (or forest) of each training set and the class each sample of its validation set is classified to, if classified while training (None otherwise)
+"""
+def trainTrees(algorithm, classifier):
+	bins, jobs, memory = getHistogramBins(), getJobs(), getMemoryBudget()
+	if leaveOneOut:
+		# a single tree from all the samples, classifying each sample as the tree grown without it
+		if bins is not None:
+			LOGGER.warning("Leave-one-out searches thresholds among all the values of continuous features, so the histogram bins are ignored")
+		if args.random_forest:
+			LOGGER.warning("Leave-one-out validates a single tree, so no random forest is generated")
+		trainingSet, validationSet = datasets[0]
+		if trainingSet.getMaskedCodes() is not None:
+			LOGGER.critical("Leave-one-out can't mask unknown values. Use another filter or splitting method")
+			sys.exit(1)
+		return [algorithm(trainingSet, None, jobs, memory).leaveOneOut(classifier)]
+	if args.random_forest:
+		trees, features = getForestTrees(), getForestFeatures()
+		return [(RandomForestAlgorithm(trainingSet, algorithm, trees, bins, jobs, memory, features, args.seed)(classifier), None) for trainingSet, _ in datasets]
+	if len(datasets) > 1 and jobs > 1:
+		pool = FoldTrainingPool(datasets, min(jobs, len(datasets)))
+		try:
+			return [(tree, None) for tree in pool.train(algorithm, classifier, bins, memory)]
+		finally:
+			pool.close()
+	return [(algorithm(trainingSet, bins, jobs, memory)(classifier), None) for trainingSet, _ in datasets]
+
+"""
+Loads the tree cached by a previous execution. The tree has to be grown for the same classifier and with the same values of each feature (the same dataset and filter), as its codes would mean other values otherwise
+
+@param 	classifier 	target feature to classify
+@return tree loaded from the cache
+"""
+def loadCachedTree(classifier):
+	try:
+		tree, vocabularies, target = loadTree(TREE_CACHE_FOLDER)
+	except Exception as e:
+		LOGGER.critical("Unable to load tree from cache. Make sure cache folder %s exists and is readable (%s)",TREE_CACHE_FOLDER,e)
+		sys.exit(1)
+	if target != classifier or vocabularies != toManifestValues(wholeDataset.getFeaturesValues()):
+		LOGGER.critical("The tree cached in %s was grown for another dataset, filter or classifier. Grow it again with --enable-cache",TREE_CACHE_FOLDER)
+		sys.exit(1)
+	return tree
+
 """
 Selects from the arguments the algorithm to use, and creates an object with
 that algorithm
@@ -177,12 +402,17 @@ def selectAlgorithm():
 	return algorithm
 
 """
-Selects the classifier to generate the decision trees by setting this classifier as the target. Converts to integer if string is specified and features are available
+Selects the classifier to generate the decision trees by setting this classifier as the target (the default classifier of the dataset if none is specified). Converts to integer if string is specified and features are available. The classifier has to be a feature of the dataset with discrete values, as the classes of the trees are the values of the classifier
+
+@return 	classifier feature
 """
 def selectClassifier():
-	target = args.classifier
+	target = args.classifier if args.classifier is not None else TARGET_DEFAULT[args.dataset]
 	if isNatural(target):
-		return target
+		target = int(target)
+		if target >= wholeDataset.getFeaturesCount():
+			LOGGER.critical("Selected classifier %d does not exist, the dataset has %d features", target, wholeDataset.getFeaturesCount())
+			sys.exit(1)
 	else:
 		feature_names = wholeDataset.getFeaturesNames()
 		if feature_names == None:
@@ -196,6 +426,9 @@ def selectClassifier():
 			except ValueError:
 				LOGGER.info("Selected classifier %s does not exist. Available classifiers for this dataset are: %s", target, feature_names)
 				sys.exit(1)
+	if wholeDataset.getContinuousFeatures()[target]:
+		LOGGER.critical("Unable to select classifier %s, its values are continuous. Select a feature with discrete values as the classifier", wholeDataset.getFeatureMeaning(target))
+		sys.exit(1)
 	return target
 
 """
@@ -217,57 +450,89 @@ if __name__ == "__main__":
 	# Switching log level
 	root_logger = logging.getLogger()
 	root_logger.setLevel(LOGS_LEVELS[LOGS.index(args.log_level)])
+	TIMERS.setLevel(args.t)
 	# Welcome
 	LOGGER.info("Welcome to the Decision Trees software")
 	# Read dataset from sources
-	readDataset()
+	with TIMERS.phase("read"):
+		readDataset()
 	# Show dataset information
 	if args.show_dataset:
 		LOGGER.info(wholeDataset)
 	# Generate training sets and validation sets
-	generateDatasets()
+	classifier = selectClassifier()
+	with TIMERS.phase("split"):
+		generateDatasets(classifier)
 	# Create algorithm
 	algorithm = selectAlgorithm()
-	classifier = selectClassifier()
-	#confusionMatrix = ConfusionMatrix(wholeDataset.getFeaturesNumValues()[classifier])
 	LOGGER.info("Starting to generate decision tree(s)")
 	# Loop datasets and perform classifications
-	trainingSet, validationSet = datasets[0][0], datasets[0][1]
 	if args.from_cache:
 		# Trees are cached
-		try:
-			tree = pickle.load(open(TREE_CACHE_FILE, "rb"))
-		except Exception as e:
-			LOGGER.critical("Unable to load tree from cache. Make sure cache file %s exists and is readable (%s)",TREE_CACHE_FILE,e)
+		trees = [(loadCachedTree(classifier), None)]
 	else:
 		# Trees have to be calculated
-		for dataset in datasets:
-			trainingSet, validationSet = dataset[0], dataset[1]
-			tree = algorithm(trainingSet)(classifier)
-	# Give general accuracy information
-	#print(confusionMatrix)
+		with TIMERS.phase("train"):
+			trees = trainTrees(algorithm, classifier)
+	# Validate each tree with its validation set (the last ones if there are less trees than sets)
+	with TIMERS.phase("validate"):
+		results = validateTrees(trees, [validationSet for _, validationSet in datasets[-len(trees):]], classifier)
+	tree = results[-1][0]
+	if isinstance(tree, DecisionForest):
+		# the first tree of the forest is the one rendered
+		LOGGER.info("Forest generated: %s",tree)
+		tree = tree.getTrees()[0]
 	LOGGER.info("Tree generated")
-	if args.enable_cache and not args.from_cache:
+	if args.enable_cache and not args.from_cache and args.random_forest:
+		LOGGER.warning("Random forests can't be cached, just single trees")
+	elif args.enable_cache and not args.from_cache:
 		LOGGER.info("Caching generated trees into a file...")
 		try:
-			pickle.dump(tree, open(TREE_CACHE_FILE, "wb"))
+			# the source of the compiled tree is cached with it
+			tree.toSource()
+			tree.save(TREE_CACHE_FOLDER, wholeDataset.getFeaturesValues(), classifier)
 		except:
 			LOGGER.warning("Unable to cache generated trees")
-	# Validate accuracies
-	accuracy = validationSet.validateTree(tree, classifier)
-	LOGGER.info("accuracy %s"%accuracy)
-	# Print tree
-	if args.show_tree:
-		LOGGER.info("Attempting to translate the tree for better comprehension")
-		algorithm.translate(tree,classifier, wholeDataset)
-		LOGGER.info("Tree translated. Enjoy ;)")
-		for pre, fill, node in RenderTree(tree):
-			print("%s%s" % (pre, node.meaning))
-		if len(datasets) > 1:
-			LOGGER.warning("The tree provided is the last calculated, you are using a splitting method that generates more than 1 tree, so this tree does not guarantee the provided measures")
-	# Save tree
-	if args.output is not None:
+	# Validate accuracies (merging the confusion matrices of every tree)
+	for fold, (_, foldMatrix) in enumerate(results if len(results) > 1 else []):
+		LOGGER.info("fold %d accuracy %s",fold,foldMatrix.getAccuracy())
+	confusionMatrix = sum(foldMatrix for _, foldMatrix in results)
+	LOGGER.info("accuracy %s"%confusionMatrix.getAccuracy())
+	# Give general accuracy information
+	if confusionMatrix.getSamplesCount():
 		try:
-			RenderTreeGraph(tree).to_picture(args.output)
-		except Exception as e:
-			LOGGER.error("Unable to export to file %s. Exception occurred. Check you have GraphicViz installed and the file is writable or does not exist yet. (%s)",args.output,e)
+			confusionMatrix.setNames([wholeDataset.getFeatureNumValueMeaning(classifier, value) for value in range(len(wholeDataset.getFeaturesValues()[classifier]))])
+		except (IndexError, KeyError):
+			LOGGER.warning("Unable to translate the values of the target feature %d",classifier)
+		LOGGER.info("confusion matrix and metrics per class:\n%s",confusionMatrix)
+	# Render tree (anytree is only used to render)
+	with TIMERS.phase("render"):
+		if args.show_tree or args.output is not None:
+			anyTree = tree.toAnytree()
+		# Print tree
+		if args.show_tree:
+			LOGGER.info("Attempting to translate the tree for better comprehension")
+			algorithm.translate(anyTree,classifier, wholeDataset)
+			LOGGER.info("Tree translated. Enjoy ;)")
+			for pre, fill, node in RenderTree(anyTree):
+				print("%s%s" % (pre, node.meaning))
+			if args.random_forest and not args.from_cache:
+				LOGGER.warning("The tree provided is the first tree of the last forest calculated, so it does not guarantee the provided measures")
+			elif len(datasets) > 1:
+				LOGGER.warning("The tree provided is the last calculated, you are using a splitting method that generates more than 1 tree, so this tree does not guarantee the provided measures")
+		# Save tree
+		if args.output is not None:
+			try:
+				RenderTreeGraph(anyTree).to_picture(args.output)
+			except Exception as e:
+				LOGGER.error("Unable to export to file %s. Exception occurred. Check you have GraphicViz installed and the file is writable or does not exist yet. (%s)",args.output,e)
+	# Timings report
+	if TIMERS.isEnabled():
+		print("Timings (level %d):\n%s"%(TIMERS.getLevel(), TIMERS))
+		if args.timings_file is not None:
+			try:
+				TIMERS.save(args.timings_file)
+			except Exception as e:
+				LOGGER.error("Unable to write the timings into the file %s (%s)",args.timings_file,e)
+	elif args.timings_file is not None:
+		LOGGER.warning("Timings are disabled, so no timings are written into %s. Use -t to enable them",args.timings_file)
@@ -0,0 +1,6 @@
+# libraries
+import os
+import sys
+
+# the modules of the software are imported as when running it from src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
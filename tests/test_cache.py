@@ -0,0 +1,59 @@
+# app modules
+from core.dataset.cache import DatasetCache
+
+# libraries
+import numpy as np
+import os
+import pytest
+
+"""
+Writes a small dataset folder and caches some codes for it
+
+@param 	folder 	folder to write the dataset into
+@return cache of the dataset and the data cached: columns, values of each feature, training samples and features meanings
+"""
+def cachedDataset(folder):
+	for name, text in [("small.data", "a, x, 1\nb, y, 0\n"), ("small.test", "b, x, 1\n"), ("small.features", "letter: a, b\nsign: x, y\nbit: 0, 1\n")]:
+		with open(os.path.join(str(folder), name), "w") as dataset:
+			dataset.write(text)
+	data = ([np.array([0, 1, 1], dtype=np.uint8), np.array([0, 1, 0], dtype=np.uint8), np.array([1, 0, 1], dtype=np.uint8)],
+		[["a", "b"], ["x", "y"], ["0", "1"]], 2, [["letter", {"a": "a", "b": "b"}], ["sign", {"x": "x", "y": "y"}], ["bit", {"0": "0", "1": "1"}]])
+	cache = DatasetCache(str(folder))
+	cache.save(*data)
+	return cache, data
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_cached_dataset_is_loaded_while_files_do_not_change(tmp_path, mmap):
+	cache, (columns, values, trainingSamples, featuresData) = cachedDataset(tmp_path)
+	# files that are not part of the dataset don't count
+	with open(os.path.join(str(tmp_path), "README.txt"), "w") as readme:
+		readme.write("notes")
+	loaded = DatasetCache(str(tmp_path)).load(mmap)
+	assert loaded is not None
+	for column, cached in zip(columns, loaded[0]):
+		np.testing.assert_array_equal(cached, column)
+		assert isinstance(cached, np.memmap) == mmap
+	assert list(loaded[1:]) == [values, trainingSamples, featuresData]
+
+@pytest.mark.parametrize("change", ["mtime", "content", "new file", "removed file"])
+def test_cached_dataset_is_outdated_when_files_change(tmp_path, change):
+	cache, _ = cachedDataset(tmp_path)
+	path = os.path.join(str(tmp_path), "small.data")
+	stat = os.stat(path)
+	if change == "mtime":
+		os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+	elif change == "content":
+		# same size and modification time, only the hash tells
+		with open(path, "w") as dataset:
+			dataset.write("a, y, 1\nb, x, 0\n")
+		os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+	elif change == "new file":
+		with open(os.path.join(str(tmp_path), "more.test"), "w") as dataset:
+			dataset.write("a, y, 0\n")
+	else:
+		os.remove(os.path.join(str(tmp_path), "small.test"))
+	assert cache.load() is None
+	# saving it again makes it valid
+	columns = [np.array([0, 1], dtype=np.uint8)] * 3
+	cache.save(columns, [["a", "b"], ["x", "y"], ["0", "1"]], 2, None)
+	assert cache.load() is not None
@@ -0,0 +1,51 @@
+# app modules
+from core.measure.confusionmatrix import ConfusionMatrix
+
+# libraries
+import numpy as np
+import pytest
+
+# samples of 3 classes (and a 4th one no sample is of or classified to), classified by hand
+PREDICTIONS = [0, 0, 0, 1, 1, 2, 2, 2, 2, 0]
+TRUTH = [0, 0, 1, 1, 2, 2, 2, 0, 1, 0]
+
+def test_metrics_are_the_ones_computed_by_hand():
+	matrix = ConfusionMatrix(["a", "b", "c", "d"], None, PREDICTIONS, TRUTH)
+	np.testing.assert_array_equal(matrix.getMatrix(), [[3, 1, 0, 0], [0, 1, 1, 0], [1, 1, 2, 0], [0, 0, 0, 0]])
+	assert matrix.getSamplesCount() == 10
+	assert matrix.getAccuracy() == pytest.approx(6/10)
+	precisions, recalls, f1Scores = [3/4, 1/2, 2/4, 0], [3/4, 1/3, 2/3, 0], [3/4, 2/5, 4/7, 0]
+	np.testing.assert_allclose(matrix.getPrecisions(), precisions)
+	np.testing.assert_allclose(matrix.getRecalls(), recalls)
+	np.testing.assert_allclose(matrix.getF1Scores(), f1Scores)
+	# every class weighs the same, even the empty one
+	assert matrix.getMacroAverages() == pytest.approx((np.mean(precisions), np.mean(recalls), np.mean(f1Scores)))
+	# every sample weighs the same
+	assert matrix.getMicroAverages() == pytest.approx((6/10, 6/10, 6/10))
+	assert "macro" in str(matrix) and "micro" in str(matrix)
+
+def test_empty_matrix_has_no_accuracy():
+	matrix = ConfusionMatrix([0, 1])
+	assert matrix.getSamplesCount() == 0 and matrix.getAccuracy() is None
+	np.testing.assert_array_equal(matrix.getPrecisions(), [0, 0])
+	assert matrix.getMicroAverages() == (0, 0, 0)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_added_matrices_count_the_results_of_both(seed):
+	random = np.random.default_rng(seed)
+	predictions, truth = random.integers(0, 3, 100), random.integers(0, 3, 100)
+	whole = ConfusionMatrix([0, 1, 2], None, predictions, truth)
+	parts = [ConfusionMatrix([0, 1, 2], None, predictions[part], truth[part]) for part in np.array_split(np.arange(100), 4)]
+	np.testing.assert_array_equal(sum(parts).getMatrix(), whole.getMatrix())
+	merged = ConfusionMatrix([0, 1, 2])
+	for part in parts:
+		merged += part
+	np.testing.assert_array_equal(merged.getMatrix(), whole.getMatrix())
+	# the parts are left as they were
+	assert sum(part.getSamplesCount() for part in parts) == 100
+	# adding the results one by one counts the same
+	single = ConfusionMatrix([0, 1, 2])
+	for prediction, real in zip(predictions, truth):
+		single.addResult(prediction, real)
+	np.testing.assert_array_equal(single.getMatrix(), whole.getMatrix())
+	assert whole.getAccuracy() == pytest.approx(np.mean(predictions == truth))
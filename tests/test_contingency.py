@@ -0,0 +1,57 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.dataset.trainingset import TrainingSet
+from test_leaveoneout import mixedTrainingSet
+from test_thresholds import entropy
+
+# libraries
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize("seed", range(4))
+def test_contingency_tables_match_counting(seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	algorithm = ID3Algorithm(trainingSet)
+	algorithm(target)
+	columns, values = trainingSet.getColumns(), trainingSet.getFeaturesValues()
+	random = np.random.default_rng(seed)
+	samples = random.permutation(trainingSet.getSampleCount())[:50]
+	nodes = random.integers(0, 3, len(samples))
+	features = [feature for feature in range(len(columns)) if feature != target and not trainingSet.getContinuousFeatures()[feature]]
+	tables, starts = algorithm._contingencyTables(samples, nodes, 3, features)
+	for node in range(3):
+		for feature, start in zip(features, starts):
+			for value in range(len(values[feature])):
+				inCell = samples[(nodes == node) & (columns[feature][samples] == value)]
+				np.testing.assert_array_equal(tables[node, start + value], np.bincount(columns[target][inCell], minlength=len(values[target])))
+
+@pytest.mark.parametrize("seed", range(4))
+def test_gain_ratios_match_their_definition(seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	algorithm = C45Algorithm(trainingSet)
+	algorithm(target)
+	columns = trainingSet.getColumns()
+	samples = np.arange(trainingSet.getSampleCount())
+	tables, starts, _ = algorithm._calculateFeatures(samples, np.zeros(len(samples), dtype=np.int64), np.ones((1, len(columns)-1), dtype=bool))
+	classCounts = np.bincount(columns[target], minlength=tables.shape[2])
+	scores = algorithm._scoreFeatures(tables, starts, classCounts[np.newaxis])[0]
+	for score, table in zip(scores, np.split(tables[0], starts[1:])):
+		parts = table[table.sum(axis=1) > 0]
+		gain = entropy(classCounts) - sum(part.sum()/len(samples) * entropy(part) for part in parts)
+		assert score == pytest.approx(gain / entropy(parts.sum(axis=1)), abs=1e-12)
+
+"""
+The scores of features that split the samples the same way are the same, but the entropies of the parts are added up in the order of the values of each feature, so they can differ in their last bits. The first feature is selected anyway, as when there's an exact tie. The thresholds of a continuous feature are still chosen by their entropies as calculated, so thresholds whose entropies only differ by rounding are chosen as the algorithms did before calculating them from cumulative counts only when they're calculated the same way
+"""
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+def test_tied_features_select_the_first_one(algorithmClass):
+	for seed in range(40):
+		random = np.random.default_rng(seed)
+		samples = 50
+		colour = random.integers(0, 3, samples)
+		target = ((colour == 0) ^ (random.random(samples) < .2)).astype(np.int64)
+		# the same feature, with its values numbered in another order
+		data = np.column_stack([colour, (colour + 1) % 3, random.integers(0, 2, samples), target])
+		tree = algorithmClass(TrainingSet(data, [[0,1,2],[0,1,2],[0,1],[0,1]], np.zeros(4, dtype=bool)))(3)
+		assert tree.getNodes()["feature"][0] == 0, "seed %d"%seed
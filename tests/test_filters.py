@@ -0,0 +1,64 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.dataset.filters import DatasetFilterer
+from core.dataset.trainingset import TrainingSet
+from test_leaveoneout import mixedTrainingSet
+
+# libraries
+import numpy as np
+import pytest
+
+"""
+Creates a training set whose first feature has unknown values, masked or not
+
+@param 	seed 	seed of the random generator
+@param 	mask 	true to mask the unknown values
+@return training set, its target feature and the code of the unknown value
+"""
+def unknownTrainingSet(seed, mask):
+	trainingSet, target = mixedTrainingSet(seed)
+	columns = list(trainingSet.getColumns())
+	values = list(trainingSet.getFeaturesValues())
+	# the unknown value gets the last code of the first feature
+	unknown = len(values[0])
+	values[0] = values[0] + ["?"]
+	random = np.random.default_rng(seed)
+	columns[0] = np.where(random.random(len(columns[0])) < .3, unknown, columns[0])
+	filterer = DatasetFilterer(columns, values)
+	masked = filterer.getUnknownCodes() if mask else None
+	return TrainingSet(None, values, trainingSet.getContinuousFeatures(), columns = columns, masked = masked), target, unknown
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+@pytest.mark.parametrize("seed", range(4))
+def test_masking_unused_codes_keeps_the_tree(algorithmClass, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	# an unknown value no sample has
+	values = [values if continuous else values + ["?"] for values, continuous in zip(trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures())]
+	trainingSet = TrainingSet(None, values, trainingSet.getContinuousFeatures(), columns = trainingSet.getColumns())
+	masked = DatasetFilterer(list(trainingSet.getColumns()), values).getUnknownCodes()
+	maskedSet = TrainingSet(None, values, trainingSet.getContinuousFeatures(), columns = trainingSet.getColumns(), masked = masked)
+	tree, maskedTree = algorithmClass(trainingSet)(target), algorithmClass(maskedSet)(target)
+	for attribute, array in tree.getNodes().items():
+		np.testing.assert_array_equal(array, maskedTree.getNodes()[attribute], attribute)
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+@pytest.mark.parametrize("seed", range(4))
+def test_masked_values_have_no_child(algorithmClass, seed):
+	trainingSet, target, unknown = unknownTrainingSet(seed, True)
+	nodes = algorithmClass(trainingSet)(target).getNodes()
+	split = np.flatnonzero(nodes["feature"] == 0)
+	children = np.concatenate([np.arange(first, first+count) for first, count in zip(nodes["children"][split], nodes["childrenCount"][split])])
+	assert len(split) and not np.any(nodes["value"][children] == unknown)
+	# without masking, the unknown value is one more value
+	nodes = algorithmClass(unknownTrainingSet(seed, False)[0])(target).getNodes()
+	split = np.flatnonzero(nodes["feature"] == 0)
+	assert not len(split) or np.any(nodes["value"][np.concatenate([np.arange(first, first+count) for first, count in zip(nodes["children"][split], nodes["childrenCount"][split])])] == unknown)
+
+def test_removing_unknown_rows_renumbers_codes():
+	columns = [np.array([0, 1, 2, 1]), np.array([1, 0, 0, 2])]
+	filterer = DatasetFilterer(columns, [["?", "a", "b"], ["x", "y", "?"]])
+	filterer.deleteUnknownSamples()
+	columns, values = filterer.getData()
+	assert values == [["a", "b"], ["x"]]
+	assert [column.tolist() for column in columns] == [[0, 1], [0, 0]]
@@ -0,0 +1,57 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.algorithms.forest import RandomForestAlgorithm
+from core.dataset.trainingset import TrainingSet
+import core.tree.forest as forests
+from test_leaveoneout import mixedTrainingSet
+from test_outofcore import assertSameTree
+from test_predict import unseenSamples
+
+# libraries
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+@pytest.mark.parametrize("bins", [None, 4])
+def test_forests_are_the_same_given_their_seed(algorithmClass, bins):
+	trainingSet, target = mixedTrainingSet(0)
+	forest = RandomForestAlgorithm(trainingSet, algorithmClass, 6, bins, None, None, 2, 7)(target)
+	assert forest.getTreesCount() == 6
+	# grown in parallel, or again
+	for other in [RandomForestAlgorithm(trainingSet, algorithmClass, 6, bins, 3, None, 2, 7)(target), RandomForestAlgorithm(trainingSet, algorithmClass, 6, bins, None, None, 2, 7)(target)]:
+		for tree, expected in zip(other.getTrees(), forest.getTrees()):
+			assertSameTree(tree, expected)
+	# another seed grows other trees
+	other = RandomForestAlgorithm(trainingSet, algorithmClass, 6, bins, None, None, 2, 8)(target)
+	assert any(tree.getNodesCount() != expected.getNodesCount() or np.any(tree.getNodes()["feature"] != expected.getNodes()["feature"]) for tree, expected in zip(other.getTrees(), forest.getTrees()))
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+@pytest.mark.parametrize("seed", range(3))
+def test_forest_trees_are_grown_from_bootstrap_resamples(algorithmClass, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	samples, trees = trainingSet.getSampleCount(), 3
+	# scoring every feature at each node, each tree is the tree of its resample
+	forest = RandomForestAlgorithm(trainingSet, algorithmClass, trees, None, None, None, trainingSet.getFeaturesCount() - 1, seed)(target)
+	for tree, treeSeed in zip(forest.getTrees(), np.random.SeedSequence(seed).spawn(trees)):
+		drawn = np.random.default_rng(treeSeed).integers(0, samples, samples)
+		resample = TrainingSet(trainingSet.getSamples(np.sort(drawn)), trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures())
+		assertSameTree(tree, algorithmClass(resample)(target))
+
+@pytest.mark.parametrize("workers, processes", [(1, False), (2, False), (3, False), (3, True)])
+@pytest.mark.parametrize("block", [forests.FOREST_BLOCK, 50])
+@pytest.mark.parametrize("seed", range(3))
+def test_forest_votes_are_the_votes_of_each_tree(monkeypatch, workers, processes, block, seed):
+	# blocks of walks smaller than the samples by the trees, so they are split
+	monkeypatch.setattr(forests, "FOREST_BLOCK", block)
+	trainingSet, target = mixedTrainingSet(seed)
+	forest = RandomForestAlgorithm(trainingSet, C45Algorithm, 8, None, None, None, 1, seed)(target)
+	matrix = unseenSamples(seed)
+	predictions = np.array([tree.predict(matrix) for tree in forest.getTrees()])
+	expected = np.array([np.bincount(sample, minlength=len(forest.getClasses())) for sample in predictions.T])
+	votes = forest.votes(matrix, workers, processes)
+	np.testing.assert_array_equal(votes, expected)
+	assert votes.sum() == forest.getTreesCount() * len(matrix)
+	# the class with more votes, the first one on ties
+	np.testing.assert_array_equal(forest.predict(matrix, workers, processes), expected.argmax(axis=1))
+	assert [forest.predictOne(sample) for sample in matrix] == expected.argmax(axis=1).tolist()
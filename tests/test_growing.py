@@ -0,0 +1,89 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.algorithms.treegrowing import BasicTreeGrowingAlgorithm
+from core.dataset.trainingset import TrainingSet
+from test_leaveoneout import mixedTrainingSet
+from test_thresholds import entropy, bruteForceThresholds
+
+# libraries
+import numpy as np
+import pytest
+import sys
+
+"""
+Scores of a split as each algorithm calculates them: the gain (ID3), the gain ratio (C4.5) or nothing (the dummy algorithm picks the first feature)
+"""
+SCORES = {
+	ID3Algorithm: lambda classCounts, parts: entropy(classCounts) - sum(part.sum()/sum(classCounts) * entropy(part) for part in parts),
+	C45Algorithm: lambda classCounts, parts: SCORES[ID3Algorithm](classCounts, parts) / entropy(parts.sum(axis=1)) if len(parts) > 1 else 0.,
+	BasicTreeGrowingAlgorithm: lambda classCounts, parts: 0.
+}
+
+"""
+Grows a tree recursively, node by node, each node scoring its features one by one, as the tree growing algorithms did before growing trees level by level
+
+@param 	trainingSet 	training set
+@param 	target 			target feature
+@param 	score 			score of a split given the class counts of the node and the class counts of each part
+@param 	samples 		samples of the node
+@param 	features 		features pending for the node
+@return leaf class, or the feature, the threshold (None if not continuous) and the value, samples and subtree of each child
+"""
+def recursiveTree(trainingSet, target, score, samples, features):
+	columns, values, continuous = trainingSet.getColumns(), trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures()
+	classes = len(values[target])
+	classCounts = np.bincount(columns[target][samples], minlength=classes)
+	if not len(features) or np.count_nonzero(classCounts) == 1:
+		return int(classCounts.argmax())
+	splits = []
+	for feature in features:
+		if continuous[feature] and score is not SCORES[BasicTreeGrowingAlgorithm]:
+			entropies, tables = bruteForceThresholds(values[feature], columns[feature][samples], columns[target][samples], classes)
+			best = int(np.argmin(entropies))
+			threshold = (values[feature][best] + values[feature][best+1])/2.
+			codes = (columns[feature][samples] >= threshold).astype(np.int64)
+		else:
+			threshold, codes = None, columns[feature][samples]
+		parts = np.zeros((codes.max()+1, classes), dtype=np.int64)
+		np.add.at(parts, (codes, columns[target][samples]), 1)
+		splits.append((score(classCounts, parts[parts.sum(axis=1) > 0]), feature, threshold, codes))
+	# the first feature among the ones with the maximum score
+	best = max(split[0] for split in splits)
+	_, feature, threshold, codes = next(split for split in splits if split[0] >= best - 1e-12)
+	children = []
+	for code in np.unique(codes):
+		children.append((int(code), int(np.count_nonzero(codes == code)), recursiveTree(trainingSet, target, score, samples[codes == code], [other for other in features if other != feature])))
+	return (feature, threshold, children)
+
+"""
+Converts a tree into the nested tuples returned by recursiveTree
+
+@param 	tree 	decision tree
+@param 	node 	node to convert
+@return leaf class, or the feature, the threshold (None if not continuous) and the value, samples and subtree of each child
+"""
+def nestedTree(tree, node = 0):
+	structure = tree.getNodes()
+	if structure["feature"][node] < 0:
+		return int(structure["leaf"][node])
+	children = range(structure["children"][node], structure["children"][node] + structure["childrenCount"][node])
+	threshold = None if np.isnan(structure["threshold"][node]) else float(structure["threshold"][node])
+	return (int(structure["feature"][node]), threshold, [(int(structure["value"][child]), int(structure["samples"][child]), nestedTree(tree, child)) for child in children])
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm, BasicTreeGrowingAlgorithm])
+@pytest.mark.parametrize("seed", range(4))
+def test_level_wise_growth_matches_recursive_growth(algorithmClass, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	features = [feature for feature in range(trainingSet.getFeaturesCount()) if feature != target]
+	expected = recursiveTree(trainingSet, target, SCORES[algorithmClass], np.arange(trainingSet.getSampleCount()), features)
+	assert nestedTree(algorithmClass(trainingSet)(target)) == expected
+
+def test_level_wise_growth_has_no_depth_limit():
+	# a chain deeper than the recursion limit: each feature separates one more sample from the rest
+	features = sys.getrecursionlimit() + 100
+	data = np.column_stack([np.tri(features + 1, features, -1, dtype=np.int64), np.arange(features + 1) % 2])
+	trainingSet = TrainingSet(data, [[0, 1]] * (features + 1), np.zeros(features + 1, dtype=bool))
+	tree = BasicTreeGrowingAlgorithm(trainingSet)(features)
+	assert tree.getNodesCount() == 2*features + 1
+	np.testing.assert_array_equal(tree.predict(data), data[:, features])
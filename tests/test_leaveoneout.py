@@ -0,0 +1,39 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.dataset.trainingset import TrainingSet
+
+# libraries
+import numpy as np
+import pytest
+
+"""
+Creates a small training set with categorical and continuous features, whose target depends on both of them with some noise, so leaving samples out changes the splits and thresholds of some nodes
+
+@param 	seed 	seed of the random generator
+@return training set and its target feature
+"""
+def mixedTrainingSet(seed):
+	random = np.random.default_rng(seed)
+	samples = 60
+	colour = random.integers(0, 3, samples)
+	size = random.integers(0, 2, samples)
+	weight = random.integers(0, 12, samples)
+	height = random.integers(0, 25, samples) * 2
+	target = ((weight + 3*colour > 10) ^ (random.random(samples) < .15)).astype(np.int64)
+	data = np.column_stack([colour, size, weight, height, target])
+	continuous = np.array([False, False, True, True, False])
+	values = [np.unique(data[:, feature]).tolist() if continuous[feature] else list(range(data[:, feature].max()+1)) for feature in range(data.shape[1])]
+	return TrainingSet(data, values, continuous), data.shape[1] - 1
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+@pytest.mark.parametrize("seed", range(4))
+def test_leave_one_out_matches_retraining(algorithmClass, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	columns, samples = trainingSet.getColumns(), trainingSet.getSampleCount()
+	_, predictions = algorithmClass(trainingSet).leaveOneOut(target)
+	for sample in range(samples):
+		rest = TrainingSet(None, trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures(), samples-1, len(columns),
+			columns = columns, rows = np.delete(np.arange(samples), sample))
+		tree = algorithmClass(rest)(target)
+		assert tree.predict(trainingSet.getSamples(slice(sample, sample+1)))[0] == predictions[sample], "sample %d"%sample
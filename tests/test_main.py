@@ -0,0 +1,75 @@
+# libraries
+import json
+import numpy as np
+import os
+import pytest
+import subprocess
+import sys
+
+"""
+Root folder of the repository, the working folder the software runs from (so the logging configuration is found)
+"""
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+"""
+Imports the main module as when running the software, with the arguments specified and a dataset with two discrete features and a continuous one: colour, size and weight
+
+@param 	monkeypatch 	pytest fixture to restore the working folder and the module variables
+@param 	arguments 		command line arguments
+@return main module
+"""
+def mainWith(monkeypatch, arguments):
+	monkeypatch.chdir(ROOT_FOLDER)
+	import main
+	from core.dataset.textdataset import TextDataset
+	from core.dataset.constants import DATASET_FEATURE_CONT
+	dataset = TextDataset(np.array([["red", "big", "1"], ["blue", "small", "2"]]))
+	dataset.setFeaturesMeaning([["colour", {"red": "red", "blue": "blue"}], ["size", {"big": "big", "small": "small"}], ["weight", {"weight": DATASET_FEATURE_CONT}]])
+	monkeypatch.setattr(main, "args", main.parseArguments(main.DEFAULT_PARSER, arguments))
+	monkeypatch.setattr(main, "wholeDataset", dataset)
+	return main
+
+@pytest.mark.parametrize("classifier, expected", [("0", 0), ("1", 1), ("size", 1)])
+def test_discrete_classifiers_are_selected(monkeypatch, classifier, expected):
+	assert mainWith(monkeypatch, ["-c", classifier]).selectClassifier() == expected
+
+@pytest.mark.parametrize("classifier", ["2", "weight", "3", "shape"])
+def test_continuous_or_missing_classifiers_exit(monkeypatch, classifier):
+	main = mainWith(monkeypatch, ["-c", classifier])
+	with pytest.raises(SystemExit) as exit:
+		main.selectClassifier()
+	assert exit.value.code == 1
+
+@pytest.mark.parametrize("classifier, values, fresh", [(0, None, True), (1, None, False), (0, [["red", "blue", "green"], ["big", "small"], ["1", "2"]], False)])
+def test_stale_cached_trees_are_refused(monkeypatch, tmp_path, classifier, values, fresh):
+	main = mainWith(monkeypatch, [])
+	from core.tree.decisiontree import DecisionTree
+	tree = DecisionTree([-1], [np.nan], [0], [0], [0], [0], [2], main.wholeDataset.getFeaturesValues()[0])
+	tree.save(str(tmp_path), values if values is not None else main.wholeDataset.getFeaturesValues(), 0)
+	monkeypatch.setattr(main, "TREE_CACHE_FOLDER", str(tmp_path))
+	if fresh:
+		assert main.loadCachedTree(classifier).getNodesCount() == 1
+	else:
+		with pytest.raises(SystemExit):
+			main.loadCachedTree(classifier)
+
+@pytest.mark.parametrize("dataset", ["mushroom", "adult"])
+def test_default_classifiers_are_discrete(monkeypatch, dataset):
+	main = mainWith(monkeypatch, ["-d", dataset])
+	for variable in ["wholeDataset", "trainingData", "validationData"]:
+		monkeypatch.setattr(main, variable, None)
+	main.readDataset()
+	classifier = main.selectClassifier()
+	assert classifier == main.TARGET_DEFAULT[dataset]
+	assert not main.wholeDataset.getContinuousFeatures()[classifier]
+
+@pytest.mark.parametrize("arguments", [["-s", "cross-validation", "-k", "3", "-j", "2"], ["-s", "leave1out"], ["-r", "--forest-trees", "3", "-j", "2"]])
+def test_trees_are_validated_after_training(tmp_path, arguments):
+	timings = os.path.join(str(tmp_path), "timings.json")
+	subprocess.run([sys.executable, os.path.join("src", "main.py"), "-d", "mushroom", "--seed", "1", "-l", "warning", "-t", "--timings-file", timings] + arguments,
+		cwd=ROOT_FOLDER, check=True, stdout=subprocess.DEVNULL)
+	with open(timings) as file:
+		phases = json.load(file)["phases"]
+	# validating is a phase of its own, not part of the training time
+	assert [phase["name"] for phase in phases] == ["read", "split", "train", "validate", "render"]
+	assert not phases[2]["phases"]
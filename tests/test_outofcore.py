@@ -0,0 +1,86 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.dataset.constants import DATASET_FEATURE_CONT
+from core.dataset.splitter import DatasetSplitter
+from core.dataset.textdataset import TextDataset
+from core.dataset.trainingset import TrainingSet
+from test_leaveoneout import mixedTrainingSet
+
+# libraries
+import gc
+import numpy as np
+import os
+import pytest
+
+"""
+Creates the text dataset of mixedTrainingSet, with its continuous features marked as continuous
+
+@param 	seed 	seed of the random generator
+@return text dataset and its target feature
+"""
+def mixedTextDataset(seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	dataset = TextDataset(trainingSet.getData().astype(str))
+	dataset.setFeaturesMeaning([["feature %d"%feature, {"value": DATASET_FEATURE_CONT} if continuous else {}] for feature, continuous in enumerate(trainingSet.getContinuousFeatures())])
+	return dataset, target
+
+"""
+Copies the columns of a training set into .npy files of a folder, and creates the same training set memory-mapped from them
+
+@param 	trainingSet 	training set to copy
+@param 	folder 			folder to write the columns into
+@return training set with the columns memory-mapped
+"""
+def mappedTrainingSet(trainingSet, folder):
+	columns = []
+	for feature, column in enumerate(trainingSet.getColumns()):
+		path = os.path.join(str(folder), "column%02d.npy"%feature)
+		np.save(path, column)
+		columns.append(np.load(path, mmap_mode="r"))
+	return TrainingSet(None, trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures(), columns = columns)
+
+"""
+Checks two trees have the same nodes
+
+@param 	tree 		decision tree
+@param 	expected 	decision tree expected
+"""
+def assertSameTree(tree, expected):
+	for attribute, array in expected.getNodes().items():
+		np.testing.assert_array_equal(tree.getNodes()[attribute], array, attribute)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_splitter_columns_are_memory_mapped_from_its_folder(tmp_path, seed):
+	dataset, target = mixedTextDataset(seed)
+	inMemory = DatasetSplitter(dataset, seed).crossValidation(3, target)
+	mapped = DatasetSplitter(dataset, seed, str(tmp_path)).crossValidation(3, target)
+	assert sorted(os.listdir(str(tmp_path))) == ["column%02d.npy"%feature for feature in range(dataset.getFeaturesCount())]
+	for (trainingSet, validationSet), (expectedTraining, expectedValidation) in zip(mapped, inMemory):
+		assert trainingSet.getColumnsFolder() == str(tmp_path) and validationSet.getColumnsFolder() == str(tmp_path)
+		assert expectedTraining.getColumnsFolder() is None
+		np.testing.assert_array_equal(trainingSet.getData(), expectedTraining.getData())
+		assertSameTree(C45Algorithm(trainingSet, 4, None, 1 << 10)(target), C45Algorithm(expectedTraining, 4)(target))
+
+@pytest.mark.parametrize("workers", [None, 2])
+@pytest.mark.parametrize("seed", range(3))
+def test_binned_features_are_memory_mapped_with_the_columns(tmp_path, workers, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	mapped = mappedTrainingSet(trainingSet, tmp_path)
+	binned, edges = mapped.getBinnedFeatures(4)
+	expectedBinned, expectedEdges = trainingSet.getBinnedFeatures(4)
+	assert isinstance(binned, np.memmap) and os.path.dirname(binned.filename) == str(tmp_path)
+	assert binned.flags.f_contiguous
+	np.testing.assert_array_equal(binned, expectedBinned)
+	for featureEdges, expected in zip(edges, expectedEdges):
+		np.testing.assert_array_equal(featureEdges, expected)
+	# the file is removed once the matrix is released
+	path = binned.filename
+	del binned
+	gc.collect()
+	assert not os.path.exists(path)
+	# workers map the binned file instead of copying it
+	tree = ID3Algorithm(mapped, 4, workers, 1 << 10)(target)
+	assertSameTree(tree, ID3Algorithm(trainingSet, 4)(target))
+	gc.collect()
+	assert not any(name.startswith("binned-") for name in os.listdir(str(tmp_path)))
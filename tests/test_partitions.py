@@ -0,0 +1,58 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.algorithms.treegrowing import BasicTreeGrowingAlgorithm
+from core.dataset.trainingset import TrainingSet
+from test_leaveoneout import mixedTrainingSet
+
+# libraries
+import numpy as np
+import pytest
+
+"""
+Walks some samples down a tree, returning the nodes each sample goes through
+
+@param 	tree 	decision tree
+@param 	matrix 	samples (rows) with the value of each feature (columns)
+@return boolean matrix telling whether each sample (rows) reaches each node (columns)
+"""
+def reachedNodes(tree, matrix):
+	structure = tree.getNodes()
+	reached = np.zeros((len(matrix), tree.getNodesCount()), dtype=bool)
+	nodes, samples = np.zeros(len(matrix), dtype=np.int64), np.arange(len(matrix))
+	while len(samples):
+		reached[samples, nodes] = True
+		splitting = structure["feature"][nodes] >= 0
+		samples, nodes = samples[splitting], nodes[splitting]
+		threshold = structure["threshold"][nodes]
+		values = matrix[samples, structure["feature"][nodes]].astype(np.float64)
+		values = np.where(np.isnan(threshold), values, values >= threshold).astype(np.int64)
+		nodes = tree.getChildren(nodes, values)
+	return reached
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm, BasicTreeGrowingAlgorithm])
+@pytest.mark.parametrize("seed", range(4))
+def test_rows_subset_grows_the_tree_of_its_copy(algorithmClass, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	columns, values, continuous = trainingSet.getColumns(), trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures()
+	rows = np.sort(np.random.default_rng(seed).permutation(trainingSet.getSampleCount())[:40])
+	subset = TrainingSet(None, values, continuous, len(rows), len(columns), columns = columns, rows = rows)
+	copy = TrainingSet(None, values, continuous, columns = [column[rows] for column in columns])
+	tree, copyTree = algorithmClass(subset)(target), algorithmClass(copy)(target)
+	for attribute, array in tree.getNodes().items():
+		np.testing.assert_array_equal(array, copyTree.getNodes()[attribute], attribute)
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm, BasicTreeGrowingAlgorithm])
+@pytest.mark.parametrize("seed", range(4))
+def test_nodes_count_the_samples_reaching_them(algorithmClass, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	tree = algorithmClass(trainingSet)(target)
+	matrix = trainingSet.getData()
+	reached = reachedNodes(tree, matrix)
+	structure = tree.getNodes()
+	np.testing.assert_array_equal(structure["samples"], reached.sum(axis=0))
+	# each leaf classifies to the class most of its samples are of
+	classes = len(trainingSet.getFeaturesValues()[target])
+	for leaf in np.flatnonzero(structure["feature"] < 0):
+		counts = np.bincount(matrix[reached[:, leaf], target], minlength=classes)
+		assert structure["leaf"][leaf] == counts.argmax()
@@ -0,0 +1,73 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.algorithms.treegrowing import BasicTreeGrowingAlgorithm
+from core.dataset.validationset import ValidationSet
+import core.tree.decisiontree as decisiontree
+from core.tree.decisiontree import loadTree
+from test_leaveoneout import mixedTrainingSet
+
+# libraries
+import numpy as np
+import os
+import pytest
+
+"""
+Creates samples to classify with the trees grown from mixedTrainingSet, whose categorical values include codes no training sample has (so they go to the default child of their node) and whose continuous values go beyond the training ones
+
+@param 	seed 	seed of the random generator
+@return matrix of samples (rows) with the value of each feature (columns)
+"""
+def unseenSamples(seed):
+	random = np.random.default_rng(seed + 100)
+	samples = 200
+	return np.column_stack([random.integers(0, 5, samples), random.integers(0, 4, samples), random.integers(-3, 15, samples),
+		random.integers(-2, 60, samples), random.integers(0, 2, samples)])
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm, BasicTreeGrowingAlgorithm])
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("lookupTable", [True, False])
+def test_batch_prediction_matches_classifying_one_by_one(monkeypatch, algorithmClass, seed, lookupTable):
+	if not lookupTable:
+		# children are looked up with binary searches
+		monkeypatch.setattr(decisiontree, "LOOKUP_TABLE_RATIO", 0)
+	trainingSet, target = mixedTrainingSet(seed)
+	tree = algorithmClass(trainingSet)(target)
+	assert (tree._table is not None) == lookupTable
+	for matrix in [trainingSet.getData(), unseenSamples(seed)]:
+		expected = np.array([tree.classify(sample) for sample in matrix])
+		np.testing.assert_array_equal(tree.predict(matrix), expected)
+		np.testing.assert_array_equal([tree.predictOne(sample) for sample in matrix], expected)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_validation_set_predictions_are_the_same_compiled(monkeypatch, seed):
+	# blocks smaller than the validation set
+	monkeypatch.setattr("core.dataset.validationset.DATASET_BLOCK_SAMPLES", 7)
+	trainingSet, target = mixedTrainingSet(seed)
+	tree = C45Algorithm(trainingSet)(target)
+	matrix = unseenSamples(seed)
+	validationSet = ValidationSet(matrix, trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures())
+	predictions = validationSet.predict(tree)
+	np.testing.assert_array_equal(predictions, [tree.classify(sample) for sample in matrix])
+	np.testing.assert_array_equal(validationSet.predict(tree, compiled=True), predictions)
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_saved_trees_predict_the_same_once_loaded(tmp_path, algorithmClass, mmap):
+	trainingSet, target = mixedTrainingSet(0)
+	tree = algorithmClass(trainingSet)(target)
+	tree.toSource()
+	tree.save(str(tmp_path), trainingSet.getFeaturesValues(), target)
+	# the saved source is only to read it, the loaded tree generates it again
+	with open(os.path.join(str(tmp_path), "tree.py"), "a") as source:
+		source.write("def predict(sample):\n\treturn -1\n")
+	loaded, vocabularies, savedTarget = loadTree(str(tmp_path), mmap)
+	assert vocabularies == trainingSet.getFeaturesValues() and savedTarget == target
+	assert loaded.getClasses() == tree.getClasses()
+	for attribute, array in tree.getNodes().items():
+		np.testing.assert_array_equal(loaded.getNodes()[attribute], array, attribute)
+	matrix = unseenSamples(0)
+	expected = tree.predict(matrix)
+	np.testing.assert_array_equal(loaded.predict(matrix), expected)
+	np.testing.assert_array_equal([loaded.predictOne(sample) for sample in matrix], expected)
+	assert loaded.toSource() == tree.toSource()
@@ -0,0 +1,102 @@
+# app modules
+from core.dataset.readers import FileDatasetReader
+import core.dataset.readers as readers
+
+# libraries
+import csv
+import locale
+import numpy as np
+import os
+import pytest
+
+"""
+Writes a dataset folder with a training file and a validation file whose samples have values quoted as CSV, some of them with separators, quotes and line ends inside
+
+@param 	folder 	folder to write the files into
+@param 	seed 	seed of the random generator
+@return paths of the training file and the validation file
+"""
+def writeQuotedDataset(folder, seed):
+	random = np.random.default_rng(seed)
+	values = ["red", "blue", "\"dark\nred\"", "\"light, \"\"sky\"\"\nblue\"", "\"a\n\nb\n\"", "?"]
+	files = []
+	for name, samples in [("train.data", 300), ("train.test", 100)]:
+		path = os.path.join(str(folder), name)
+		with open(path, "w") as dataset:
+			for sample in range(samples):
+				row = [values[value] for value in random.integers(0, len(values), 3)] + [str(random.integers(0, 2))]
+				dataset.write(", ".join(row) + ".\n")
+		files.append(path)
+	return files
+
+"""
+Parses the files of a dataset at once, as a whole CSV text each
+
+@param 	files 	paths of the dataset files
+@return samples of the files as rows of values, in order
+"""
+def parseWhole(files):
+	rows = []
+	for path in files:
+		with open(path, "r") as dataset:
+			rows += [[s.strip(". 	") for s in row] for row in csv.reader(dataset, delimiter=",", skipinitialspace=True) if len(row)]
+	return rows
+
+@pytest.mark.parametrize("workers", [None, 2, 3])
+@pytest.mark.parametrize("seed", range(3))
+def test_quoted_values_spanning_lines_are_parsed_whole(monkeypatch, tmp_path, workers, seed):
+	# chunks and parts much smaller than the samples, so values span several of them
+	monkeypatch.setattr(readers, "DATASET_READ_CHUNK", 7)
+	monkeypatch.setattr(readers, "DATASET_ENCODE_ROWS", 16)
+	monkeypatch.setattr(readers, "DATASET_PARSE_PART", 64)
+	rows = parseWhole(writeQuotedDataset(tmp_path, seed))
+	assert any("\n" in value for row in rows for value in row)
+	reader = FileDatasetReader(str(tmp_path), workers)
+	reader.read()
+	assert reader.getTrainingSampleCount() == 300 and len(rows) == 400
+	values = reader.getFeaturesValues()
+	assert values == [sorted(set(column)) for column in zip(*rows)]
+	np.testing.assert_array_equal(np.asarray(reader.getData()), [[values[feature].index(value) for feature, value in enumerate(row)] for row in rows])
+
+"""
+Reads a dataset folder, serially or in parallel
+
+@param 	folder 		dataset folder
+@param 	workers 	number of processes to parse the files with (None to parse them in this process)
+@return reader with the dataset read
+"""
+def readDataset(folder, workers):
+	reader = FileDatasetReader(str(folder), workers)
+	reader.read()
+	return reader
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_parallel_parsing_matches_serial_parsing(monkeypatch, workers):
+	# many more parts than workers, merged in order
+	monkeypatch.setattr(readers, "DATASET_PARSE_PART", 1 << 16)
+	folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "res", "datasets", "adult")
+	serial, parallel = readDataset(folder, None), readDataset(folder, workers)
+	assert parallel.getTrainingSampleCount() == serial.getTrainingSampleCount()
+	assert parallel.getFeaturesValues() == serial.getFeaturesValues()
+	np.testing.assert_array_equal(np.asarray(parallel.getData()), np.asarray(serial.getData()))
+
+@pytest.mark.parametrize("workers", [2, 3])
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_parallel_parsing_decodes_as_text_files(monkeypatch, tmp_path, workers, newline):
+	# parts of a few bytes split the multibyte characters, and the last sample has no line end
+	monkeypatch.setattr(readers, "DATASET_PARSE_PART", 16)
+	monkeypatch.setattr(readers, "DATASET_READ_CHUNK", 5)
+	random = np.random.default_rng(0)
+	values = ["año", "naïve", "ñ", "plain", "日本"]
+	lines = [", ".join(values[value] for value in random.integers(0, len(values), 3)) for sample in range(60)]
+	encoding = locale.getpreferredencoding(False)
+	try:
+		text = newline.join(lines).encode(encoding)
+	except UnicodeEncodeError:
+		pytest.skip("the values can't be written in the encoding of the locale (%s)"%encoding)
+	with open(os.path.join(str(tmp_path), "text.data"), "wb") as dataset:
+		dataset.write(text)
+	serial, parallel = readDataset(tmp_path, None), readDataset(tmp_path, workers)
+	assert serial.getTrainingSampleCount() == 60
+	assert parallel.getFeaturesValues() == serial.getFeaturesValues() == [sorted(set(column)) for column in zip(*[line.split(", ") for line in lines])]
+	np.testing.assert_array_equal(np.asarray(parallel.getData()), np.asarray(serial.getData()))
@@ -0,0 +1,76 @@
+# app modules
+from core.dataset.splitter import DatasetSplitter
+from test_outofcore import mixedTextDataset
+
+# libraries
+import numpy as np
+import pytest
+
+"""
+Returns the rows of the columns the samples of a set are
+
+@param 	dataset 	training set or validation set
+@return rows of its samples
+"""
+def rowsOf(dataset):
+	return dataset.getRowsOf(np.arange(dataset.getSampleCount()))
+
+@pytest.mark.parametrize("stratified", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_holdout_splits_the_samples_once(seed, stratified):
+	dataset, target = mixedTextDataset(seed)
+	classes = dataset.getNumericDataset().getColumn(target)
+	trainingSet, validationSet = DatasetSplitter(dataset, seed).holdout(.7, target if stratified else None)
+	training, validation = rowsOf(trainingSet), rowsOf(validationSet)
+	np.testing.assert_array_equal(np.sort(np.concatenate([training, validation])), np.arange(dataset.getSampleCount()))
+	# the same seed picks the same samples
+	np.testing.assert_array_equal(rowsOf(DatasetSplitter(dataset, seed).holdout(.7, target if stratified else None)[0]), training)
+	if stratified:
+		counts = np.bincount(classes)
+		np.testing.assert_array_equal(np.bincount(classes[training], minlength=len(counts)), (counts * .7).astype(np.int64))
+	else:
+		assert len(training) == int(dataset.getSampleCount() * .7)
+
+@pytest.mark.parametrize("stratified", [False, True])
+@pytest.mark.parametrize("k", [2, 3, 7])
+def test_cross_validation_folds_validate_each_sample_once(k, stratified):
+	dataset, target = mixedTextDataset(k)
+	classes = dataset.getNumericDataset().getColumn(target)
+	folds = DatasetSplitter(dataset, k).crossValidation(k, target if stratified else None)
+	assert len(folds) == k
+	validated = np.concatenate([rowsOf(validationSet) for _, validationSet in folds])
+	np.testing.assert_array_equal(np.sort(validated), np.arange(dataset.getSampleCount()))
+	for trainingSet, validationSet in folds:
+		assert not np.intersect1d(rowsOf(trainingSet), rowsOf(validationSet)).size
+		assert trainingSet.getSampleCount() + validationSet.getSampleCount() == dataset.getSampleCount()
+		# folds of the same size (give or take one), and of each class if stratified
+		sizes = np.bincount(classes[rowsOf(validationSet)], minlength=2) if stratified else validationSet.getSampleCount()
+		expected = np.bincount(classes) / k if stratified else dataset.getSampleCount() / k
+		assert np.all(np.abs(sizes - expected) < 1)
+
+@pytest.mark.parametrize("stratified", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_bootstrap_draws_as_many_samples_as_the_dataset(seed, stratified):
+	dataset, target = mixedTextDataset(seed)
+	classes = dataset.getNumericDataset().getColumn(target)
+	splitter = DatasetSplitter(dataset, seed)
+	trainingSet, validationSet = splitter.bootstrap(target if stratified else None)
+	training, weights = rowsOf(trainingSet), trainingSet.getWeights()
+	assert weights.sum() == dataset.getSampleCount() and np.all(weights > 0)
+	# the samples not drawn are out of bag
+	np.testing.assert_array_equal(np.sort(np.concatenate([training, rowsOf(validationSet)])), np.arange(dataset.getSampleCount()))
+	if stratified:
+		np.testing.assert_array_equal(np.bincount(classes[training], weights, minlength=2), np.bincount(classes))
+	# the same seed draws the same samples
+	again = DatasetSplitter(dataset, seed).bootstrap(target if stratified else None)[0]
+	np.testing.assert_array_equal(rowsOf(again), training)
+	np.testing.assert_array_equal(again.getWeights(), weights)
+
+def test_sets_share_the_numeric_columns():
+	dataset, target = mixedTextDataset(0)
+	splitter = DatasetSplitter(dataset, 0)
+	numeric = splitter.getNumericDataset()
+	sets = [dataset for pair in [splitter.holdout(.5)] + splitter.crossValidation(3) + [splitter.bootstrap(), splitter.leaveOneOut()] for dataset in pair]
+	for split in sets:
+		assert all(column is shared for column, shared in zip(split.getColumns(), numeric.getColumns()))
+		np.testing.assert_array_equal(split.getData(), numeric.getData()[rowsOf(split)])
@@ -0,0 +1,71 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.dataset.trainingset import TrainingSet
+from test_leaveoneout import mixedTrainingSet
+
+# libraries
+import math
+import numpy as np
+import pytest
+
+"""
+Entropy of some class counts, as the tree growing algorithms calculated it before being vectorized
+
+@param 	counts 	count of each class
+@return entropy of the counts
+"""
+def entropy(counts):
+	total = sum(counts)
+	return -sum(count/total * math.log(count/total, 2) for count in counts if count)
+
+"""
+Finds the threshold of a continuous feature for some samples trying the midpoint between every pair of consecutive values one by one, as the tree growing algorithms did before sorting the samples once
+
+@param 	values 		values of the feature, in the order of the feature values
+@param 	data 		value of the feature of each sample
+@param 	target 		class of each sample
+@param 	classes 	number of classes
+@return entropy of each candidate threshold, in order, and their contingency tables
+"""
+def bruteForceThresholds(values, data, target, classes):
+	entropies, tables = [], []
+	for threshold in [(low + high)/2. for low, high in zip(values[:-1], values[1:])]:
+		table = np.zeros((2, classes), dtype=np.int64)
+		np.add.at(table, ((data >= threshold).astype(np.int64), target), 1)
+		entropies.append(sum(part.sum()/len(data) * entropy(part) for part in table if part.sum()))
+		tables.append(table)
+	return entropies, tables
+
+"""
+Creates a training set whose continuous features list their values as the text datasets do, sorted as text (so 10 goes before 2)
+
+@param 	seed 	seed of the random generator
+@return training set and its target feature
+"""
+def textSortedTrainingSet(seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	values = [sorted(values, key=str) if continuous else values for values, continuous in zip(trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures())]
+	return TrainingSet(None, values, trainingSet.getContinuousFeatures(), columns = trainingSet.getColumns()), target
+
+@pytest.mark.parametrize("createTrainingSet", [mixedTrainingSet, textSortedTrainingSet])
+@pytest.mark.parametrize("seed", range(4))
+def test_threshold_search_matches_trying_each_threshold(createTrainingSet, seed):
+	trainingSet, target = createTrainingSet(seed)
+	algorithm = ID3Algorithm(trainingSet)
+	algorithm(target)
+	columns, values = trainingSet.getColumns(), trainingSet.getFeaturesValues()
+	# samples of several nodes at once, in no order
+	random = np.random.default_rng(seed)
+	samples = random.permutation(trainingSet.getSampleCount())[:50]
+	nodes = random.integers(0, 4, len(samples))
+	for feature in np.flatnonzero(trainingSet.getContinuousFeatures()):
+		tables, thresholds = algorithm._contingencyOfContinuousFeature(samples, nodes, 4, feature)
+		for node in range(4):
+			inNode = samples[nodes == node]
+			entropies, bruteTables = bruteForceThresholds(values[feature], columns[feature][inNode], columns[target][inNode], len(values[target]))
+			best = int(np.argmin(entropies))
+			chosen = [(low + high)/2. for low, high in zip(values[feature][:-1], values[feature][1:])].index(thresholds[node])
+			# the same threshold, but among thresholds whose entropies only differ by rounding
+			assert entropies[chosen] == pytest.approx(entropies[best], abs=1e-12)
+			assert chosen == best or abs(entropies[chosen] - entropies[best]) > 0
+			np.testing.assert_array_equal(tables[node], bruteTables[chosen])
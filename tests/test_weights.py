@@ -0,0 +1,25 @@
+# app modules
+from core.algorithms.ID3 import ID3Algorithm
+from core.algorithms.C45 import C45Algorithm
+from core.dataset.trainingset import TrainingSet
+from test_leaveoneout import mixedTrainingSet
+
+# libraries
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize("algorithmClass", [ID3Algorithm, C45Algorithm])
+@pytest.mark.parametrize("bins", [None, 4])
+@pytest.mark.parametrize("seed", range(4))
+def test_weighted_tree_matches_repeated_rows(algorithmClass, bins, seed):
+	trainingSet, target = mixedTrainingSet(seed)
+	columns, samples = trainingSet.getColumns(), trainingSet.getSampleCount()
+	counts = np.bincount(np.random.default_rng(seed).integers(0, samples, samples), minlength=samples)
+	drawn = np.flatnonzero(counts)
+	weighted = TrainingSet(None, trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures(), len(drawn), len(columns),
+		columns = columns, rows = drawn, weights = counts[drawn])
+	repeated = TrainingSet(None, trainingSet.getFeaturesValues(), trainingSet.getContinuousFeatures(), int(counts.sum()), len(columns),
+		columns = columns, rows = np.repeat(drawn, counts[drawn]))
+	weightedTree, repeatedTree = algorithmClass(weighted, bins)(target), algorithmClass(repeated, bins)(target)
+	for attribute, array in weightedTree.getNodes().items():
+		np.testing.assert_array_equal(array, repeatedTree.getNodes()[attribute], attribute)